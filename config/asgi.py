@@ -0,0 +1,15 @@
+"""
+ASGI config for CMS project.
+
+Serves the async generation-status stream (core/generation_stream.py) —
+nginx routes /api/core/events/[<id>/]generation-stream/ here while the rest of
+the API stays on gunicorn (config.wsgi).
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+application = get_asgi_application()
@@ -163,3 +163,91 @@ LOGOUT_REDIRECT_URL = 'login'
 AUTH_USER_MODEL = 'users.User'
 # Email backend for development - prints emails to console
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Background job queue (core/jobs.py) — run workers with `python manage.py run_jobs`
+JOB_QUEUE_POLL_INTERVAL = float(os.environ.get('JOB_QUEUE_POLL_INTERVAL', 2))
+JOB_QUEUE_BATCH_SIZE = int(os.environ.get('JOB_QUEUE_BATCH_SIZE', 5))
+# Jobs left 'running' longer than this (worker crashed) are put back on the queue
+JOB_QUEUE_STALE_AFTER = int(os.environ.get('JOB_QUEUE_STALE_AFTER', 600))
+# Base delay for retry backoff; attempt n waits base * 2**(n-1) seconds
+JOB_QUEUE_RETRY_BACKOFF = int(os.environ.get('JOB_QUEUE_RETRY_BACKOFF', 30))
+# How long an event may stay generation_status='pending' before it is considered failed
+N8N_GENERATION_TIMEOUT = int(os.environ.get('N8N_GENERATION_TIMEOUT', 900))
+# Timeout sweeper (core/generation_sweeper.py): re-sends of an unanswered n8n
+# generation before the event is marked failed, rows per sweep batch, and how
+# often run_jobs workers sweep (0 disables; use sweep_generation_timeouts)
+GENERATION_TIMEOUT_RETRIES = int(os.environ.get('GENERATION_TIMEOUT_RETRIES', 1))
+GENERATION_SWEEP_BATCH_SIZE = int(os.environ.get('GENERATION_SWEEP_BATCH_SIZE', 500))
+GENERATION_SWEEP_INTERVAL = int(os.environ.get('GENERATION_SWEEP_INTERVAL', 60))
+
+# Transactional outbox for outbound n8n triggers (core/outbox.py) —
+# run the dispatcher with `python manage.py dispatch_outbox`
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_MAX_WORKERS = int(os.environ.get('OUTBOX_MAX_WORKERS', 8))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 1))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_RETRY_BACKOFF = int(os.environ.get('OUTBOX_RETRY_BACKOFF', 30))
+OUTBOX_STALE_AFTER = int(os.environ.get('OUTBOX_STALE_AFTER', 300))
+OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', 7))
+
+# Shared outbound HTTP client for n8n / Gemini (core/http.py)
+OUTBOUND_HTTP_TIMEOUT = float(os.environ.get('OUTBOUND_HTTP_TIMEOUT', 30))  # read timeout, seconds
+OUTBOUND_HTTP_CONNECT_TIMEOUT = float(os.environ.get('OUTBOUND_HTTP_CONNECT_TIMEOUT', 5))
+OUTBOUND_HTTP_RETRIES = int(os.environ.get('OUTBOUND_HTTP_RETRIES', 3))
+OUTBOUND_HTTP_BACKOFF = float(os.environ.get('OUTBOUND_HTTP_BACKOFF', 0.3))
+OUTBOUND_HTTP_POOL_HOSTS = int(os.environ.get('OUTBOUND_HTTP_POOL_HOSTS', 10))
+OUTBOUND_HTTP_POOL_SIZE = int(os.environ.get('OUTBOUND_HTTP_POOL_SIZE', 20))
+
+# n8n circuit breaker (core/circuit.py): open after this many consecutive
+# failures, fail fast for COOLDOWN seconds, then let one probe call through
+N8N_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('N8N_CIRCUIT_FAILURE_THRESHOLD', 5))
+N8N_CIRCUIT_COOLDOWN = int(os.environ.get('N8N_CIRCUIT_COOLDOWN', 60))
+N8N_CIRCUIT_PROBE_TIMEOUT = int(os.environ.get('N8N_CIRCUIT_PROBE_TIMEOUT', 90))
+
+# Concurrent calls when several workflows share a trigger (n8n_client.fan_out)
+N8N_FANOUT_MAX_WORKERS = int(os.environ.get('N8N_FANOUT_MAX_WORKERS', 4))
+
+# generate-batch (core/generation.py): events per batched payload for workflows
+# with configuration.batch, and how many n8n requests one job keeps in flight
+N8N_GENERATION_BATCH_SIZE = int(os.environ.get('N8N_GENERATION_BATCH_SIZE', 25))
+N8N_GENERATION_BATCH_CONCURRENCY = int(os.environ.get('N8N_GENERATION_BATCH_CONCURRENCY', 4))
+
+# Rows per bulk INSERT when n8n posts an event batch (core/event_import.py)
+EVENT_IMPORT_CHUNK_SIZE = int(os.environ.get('EVENT_IMPORT_CHUNK_SIZE', 500))
+
+# Row problems reported before import-csv stops collecting (core/csv_import.py)
+CSV_IMPORT_MAX_ERRORS = int(os.environ.get('CSV_IMPORT_MAX_ERRORS', 50))
+
+# Generation status SSE stream (core/generation_stream.py)
+GENERATION_STREAM_HEARTBEAT = int(os.environ.get('GENERATION_STREAM_HEARTBEAT', 15))
+GENERATION_STREAM_MAX_SECONDS = int(os.environ.get('GENERATION_STREAM_MAX_SECONDS', 300))
+GENERATION_STREAM_POLL_INTERVAL = float(os.environ.get('GENERATION_STREAM_POLL_INTERVAL', 2))
+GENERATION_STREAM_MAX_EVENTS = int(os.environ.get('GENERATION_STREAM_MAX_EVENTS', 100))
+
+# Reuse n8n-generated content for identical generation inputs (core/generation_cache.py)
+GENERATION_CACHE_ENABLED = os.environ.get('GENERATION_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+GENERATION_CACHE_TTL = int(os.environ.get('GENERATION_CACHE_TTL', 7 * 24 * 3600))
+GENERATION_CACHE_MAX_ENTRIES = int(os.environ.get('GENERATION_CACHE_MAX_ENTRIES', 5000))
+
+# Recipients per bulk INSERT when an event's audience is notified (core/notifications.py)
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.environ.get('NOTIFICATION_FANOUT_CHUNK_SIZE', 2000))
+
+# Read notifications older than this move to NotificationArchive
+# (`python manage.py archive_notifications`, core/notification_retention.py)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_ARCHIVE_BATCH_SIZE = int(os.environ.get('NOTIFICATION_ARCHIVE_BATCH_SIZE', 1000))
+
+# Upper bound (seconds) on how long a student's enrollment dashboard snapshot is
+# cached; changes invalidate it immediately (enrollment/dashboard.py)
+ENROLLMENT_DASHBOARD_CACHE_TTL = int(os.environ.get('ENROLLMENT_DASHBOARD_CACHE_TTL', 600))
+
+# Waitlisted students promoted per transaction when seats free up (enrollment/waitlist.py)
+WAITLIST_PROMOTION_BATCH_SIZE = int(os.environ.get('WAITLIST_PROMOTION_BATCH_SIZE', 200))
+
+# Subscribable .ics feeds (core/calendar_feed.py)
+CALENDAR_FEED_PAST_DAYS = int(os.environ.get('CALENDAR_FEED_PAST_DAYS', 30))
+CALENDAR_FEED_CACHE_TTL = int(os.environ.get('CALENDAR_FEED_CACHE_TTL', 3600))
+CALENDAR_FEED_TIMEZONE = os.environ.get('CALENDAR_FEED_TIMEZONE', 'Asia/Ho_Chi_Minh')
+
+# Seconds the active-student count (audience of target_all_students events) is cached
+AUDIENCE_ALL_STUDENTS_CACHE_TTL = int(os.environ.get('AUDIENCE_ALL_STUDENTS_CACHE_TTL', 300))
@@ -1,5 +1,7 @@
+from django import forms
 from django.contrib import admin
 from .models import Course, CourseUnit, Unit, SemesterOffering, UnitResource
+from .unit_graph import get_graph
 
 
 class CourseUnitInline(admin.TabularInline):
@@ -25,8 +27,21 @@ class CourseUnitAdmin(admin.ModelAdmin):
     autocomplete_fields = ['course', 'unit']
 
 
+class UnitAdminForm(forms.ModelForm):
+    class Meta:
+        model = Unit
+        fields = '__all__'
+
+    def clean_prerequisites(self):
+        prerequisites = self.cleaned_data['prerequisites']
+        if self.instance.pk and get_graph().would_create_cycle(self.instance.pk, [u.pk for u in prerequisites]):
+            raise forms.ValidationError('These prerequisites would create a prerequisite cycle.')
+        return prerequisites
+
+
 @admin.register(Unit)
 class UnitAdmin(admin.ModelAdmin):
+    form = UnitAdminForm
     list_display = ('code', 'name', 'department', 'credit_points', 'is_active')
     search_fields = ('code', 'name', 'department')
     list_filter = ('is_active', 'department')
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AcademicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'src.backend.academic'
-    verbose_name = 'Academic Management'
\ No newline at end of file
+    verbose_name = 'Academic Management'
+
+    def ready(self):
+        import src.backend.academic.signals  # noqa
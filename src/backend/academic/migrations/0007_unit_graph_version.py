@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0006_intake_and_offering_intake'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnitGraphVersion',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -56,6 +56,10 @@ class Unit(BaseModel):
                 raise ValidationError('A unit cannot be its own prerequisite.')
             if self in self.anti_requisites.all():
                 raise ValidationError('A unit cannot be its own anti-requisite.')
+            from .unit_graph import get_graph
+            graph = get_graph()
+            if graph.in_cycle(self.pk):
+                raise ValidationError('This unit is part of a prerequisite cycle.')
 
 
 
@@ -144,6 +148,31 @@ class SemesterOffering(BaseModel):
     def is_full(self):
         return self.current_enrollment >= self.capacity if self.capacity > 0 else False
 
+    @classmethod
+    def reserve_seat(cls, offering_id):
+        """
+        Take one seat with a single conditional UPDATE; returns False when the
+        offering is full (capacity 0 means unlimited).
+
+        Call it inside the enrollment's transaction: the row lock taken by the
+        UPDATE is held until commit, so concurrent reservations for the same
+        offering queue on it and re-check ``current_enrollment < capacity``
+        against the committed count — the offering can never be oversold.
+        """
+        return bool(
+            cls.objects.filter(pk=offering_id)
+            .filter(models.Q(capacity=0) | models.Q(current_enrollment__lt=models.F('capacity')))
+            .update(current_enrollment=models.F('current_enrollment') + 1)
+        )
+
+    @classmethod
+    def release_seat(cls, offering_id):
+        """Give back a seat taken by ``reserve_seat``."""
+        return bool(
+            cls.objects.filter(pk=offering_id, current_enrollment__gt=0)
+            .update(current_enrollment=models.F('current_enrollment') - 1)
+        )
+
 
 class UnitResource(BaseModel):
     """
@@ -175,4 +204,16 @@ class UnitResource(BaseModel):
         if not self.file and not self.url:
             raise ValidationError('Either a file or URL must be provided.')
         if self.file and self.url:
-            raise ValidationError('Only one of file or URL should be provided, not both.')
\ No newline at end of file
+            raise ValidationError('Only one of file or URL should be provided, not both.')
+
+
+class UnitGraphVersion(models.Model):
+    """
+    Single-row counter behind the compiled prerequisite graph
+    (academic/unit_graph.py); bumped whenever a unit or its requisites change.
+    """
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"unit graph v{self.version}"
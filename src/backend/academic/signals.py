@@ -0,0 +1,38 @@
+from django.core.exceptions import ValidationError
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import unit_graph
+from .models import Unit
+
+
+# ---------------------------------------------------------------------------
+# Compiled requisite graph (academic/unit_graph.py)
+# ---------------------------------------------------------------------------
+
+@receiver(m2m_changed, sender=Unit.prerequisites.through)
+def guard_prerequisite_cycles(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refuse prerequisite links that would make a unit (indirectly) require itself."""
+    if action != 'pre_add' or not pk_set:
+        return
+    graph = unit_graph.get_graph()
+    if reverse:
+        # unit.required_for.add(...): instance becomes a prerequisite of each pk
+        closes_cycle = any(graph.would_create_cycle(pk, [instance.pk]) for pk in pk_set)
+    else:
+        closes_cycle = graph.would_create_cycle(instance.pk, pk_set)
+    if closes_cycle:
+        raise ValidationError(f'Adding these prerequisites to {instance} would create a prerequisite cycle.')
+
+
+@receiver(m2m_changed, sender=Unit.prerequisites.through)
+@receiver(m2m_changed, sender=Unit.anti_requisites.through)
+def invalidate_graph_on_requisites(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        unit_graph.invalidate()
+
+
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+def invalidate_graph_on_unit(sender, instance, **kwargs):
+    unit_graph.invalidate()
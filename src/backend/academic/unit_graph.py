@@ -0,0 +1,211 @@
+"""
+academic/unit_graph.py — Compiled prerequisite / anti-requisite graph.
+
+Enrollment validation, the enrollment dashboard and the MCP
+``recommend_courses`` tool all need "which prerequisites is this student
+missing" and "does this unit clash with one they hold".  Instead of walking
+``Unit.prerequisites`` / ``Unit.anti_requisites`` with fresh queries each
+time, ``get_graph()`` compiles the whole catalogue (three queries) into a
+UnitGraph of plain dicts and frozensets:
+
+  * ``prerequisites[unit]`` — direct prerequisites;
+  * ``closure[unit]``       — every unit reachable through prerequisites;
+  * ``anti[unit]``          — anti-requisites (symmetric);
+  * ``cycles``              — prerequisite cycles (strongly connected
+                              components), which make a unit unreachable.
+
+Questions are then set operations on those structures, e.g.
+``graph.eligible(completed, held)`` for "units student X may take next".
+
+The compiled graph is kept per process and tagged with the
+UnitGraphVersion counter.  The signal receivers in academic/signals.py bump
+the counter whenever a unit or either M2M table changes, so every process
+recompiles on its next ``get_graph()`` — that costs one primary-key lookup
+while nothing has changed.  Code that edits the M2M tables with raw
+``bulk_create`` / ``.update()`` must call ``invalidate()`` itself.
+"""
+import logging
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_compiled = None
+
+
+class UnitGraph:
+    """An immutable snapshot of the unit catalogue's requisite relations."""
+
+    def __init__(self, version, codes, names, prerequisites, anti):
+        self.version = version
+        self.codes = codes                            # id -> code
+        self.names = names                            # id -> name
+        self.ids_by_code = {code: pk for pk, code in codes.items()}
+        self.prerequisites = prerequisites            # id -> frozenset of ids
+        self.anti = anti                              # id -> frozenset of ids
+        self.cycles, self.closure = _strongly_connected(set(codes), prerequisites)
+
+    def label(self, unit_id):
+        """Same text as ``str(unit)``."""
+        return f"{self.codes[unit_id]} - {self.names[unit_id]}"
+
+    def missing_prerequisites(self, unit_id, completed):
+        """Direct prerequisites of ``unit_id`` not in ``completed``, ordered by code."""
+        return sorted(self.prerequisites.get(unit_id, frozenset()) - set(completed), key=self.codes.get)
+
+    def conflicts(self, unit_id, held):
+        """Anti-requisites of ``unit_id`` among ``held``, ordered by code."""
+        return sorted(self.anti.get(unit_id, frozenset()) & set(held), key=self.codes.get)
+
+    def eligible(self, completed, held=(), candidates=None):
+        """
+        Units (ids) whose prerequisites are all in ``completed``, that clash
+        with nothing in ``held`` and are not themselves completed or held.
+        ``candidates`` restricts the answer (default: the whole catalogue).
+        """
+        completed = set(completed)
+        taken = completed | set(held)
+        pool = (set(candidates) if candidates is not None else set(self.codes)) - taken
+        return {
+            unit_id for unit_id in pool
+            if self.prerequisites.get(unit_id, frozenset()) <= completed
+            and not (self.anti.get(unit_id, frozenset()) & taken)
+        }
+
+    def would_create_cycle(self, unit_id, prerequisite_ids):
+        """True if making ``prerequisite_ids`` prerequisites of ``unit_id`` closes a cycle."""
+        return any(
+            prereq == unit_id or unit_id in self.closure.get(prereq, frozenset())
+            for prereq in prerequisite_ids
+        )
+
+    def in_cycle(self, unit_id):
+        return any(unit_id in cycle for cycle in self.cycles)
+
+
+def _strongly_connected(nodes, edges):
+    """
+    Tarjan's algorithm (iterative).  Returns (cyclic components as
+    frozensets, transitive closure per node).  Components come out in
+    reverse topological order, so each closure is built from finished ones.
+    """
+    index, low, on_stack, stack = {}, {}, set(), []
+    closure = {}
+    cycles = []
+    counter = 0
+
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] != index[node]:
+                continue
+            # node is the root of a component — pop it and close over it
+            members = set()
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                members.add(member)
+                if member == node:
+                    break
+            members = frozenset(members)
+            reachable = set()
+            cyclic = len(members) > 1
+            for member in members:
+                for child in edges.get(member, ()):
+                    if child in members:
+                        cyclic = True
+                    else:
+                        reachable.add(child)
+                        reachable |= closure[child]
+            if cyclic:
+                cycles.append(members)
+                reachable |= members
+            reachable = frozenset(reachable)
+            for member in members:
+                closure[member] = reachable
+    return cycles, closure
+
+
+def _version():
+    UnitGraphVersion = apps.get_model('academic', 'UnitGraphVersion')
+    return UnitGraphVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def compile_graph(version=None):
+    """Build a UnitGraph from the database (three queries)."""
+    Unit = apps.get_model('academic', 'Unit')
+    version = _version() if version is None else version
+    codes, names = {}, {}
+    for pk, code, name in Unit.objects.values_list('pk', 'code', 'name'):
+        codes[pk] = code
+        names[pk] = name
+
+    prerequisites = defaultdict(set)
+    for unit_id, prereq_id in Unit.prerequisites.through.objects.values_list('from_unit_id', 'to_unit_id'):
+        prerequisites[unit_id].add(prereq_id)
+    anti = defaultdict(set)
+    for unit_id, other_id in Unit.anti_requisites.through.objects.values_list('from_unit_id', 'to_unit_id'):
+        anti[unit_id].add(other_id)
+        anti[other_id].add(unit_id)
+
+    graph = UnitGraph(
+        version, codes, names,
+        {pk: frozenset(ids) for pk, ids in prerequisites.items()},
+        {pk: frozenset(ids) for pk, ids in anti.items()},
+    )
+    if graph.cycles:
+        logger.warning('Prerequisite cycles in the unit catalogue: %s', [
+            sorted(codes[pk] for pk in cycle) for cycle in graph.cycles
+        ])
+    return graph
+
+
+def get_graph():
+    """The current compiled graph, recompiled if the catalogue changed since it was built."""
+    global _compiled
+    version = _version()
+    graph = _compiled
+    if graph is not None and graph.version == version:
+        return graph
+    with _lock:
+        if _compiled is None or _compiled.version != version:
+            _compiled = compile_graph(version)
+        return _compiled
+
+
+def invalidate():
+    """Bump the catalogue version so every process recompiles its graph."""
+    global _compiled
+    UnitGraphVersion = apps.get_model('academic', 'UnitGraphVersion')
+    if not UnitGraphVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        UnitGraphVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+    _compiled = None
@@ -5,6 +5,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from src.backend.core import circuit, http
+
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 GEMINI_URL = (
     f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash'
@@ -120,9 +122,14 @@ def _get_student_context(user) -> str:
 
     # ── Unread Notifications ─────────────────────────────────────────────
     try:
-        notifs = Notification.objects.filter(recipient=user, unread=True).order_by('-created_at')[:5]
+        from src.backend.core.notifications import unread_count
+        total_unread = unread_count(user)
+        notifs = (
+            Notification.objects.filter(recipient=user, unread=True).order_by('-created_at', '-id')[:5]
+            if total_unread else []
+        )
         if notifs:
-            lines.append("\nUnread notifications:")
+            lines.append(f"\nUnread notifications ({total_unread}):")
             for n in notifs:
                 lines.append(f"  - {n.verb}")
     except Exception:
@@ -165,12 +172,17 @@ def chat(request):
 
     # ── Route 1: n8n workflow with MCP tools ─────────────────────────────────
     wf = _get_n8n_workflow()
-    if wf:
+    # Skip straight to Gemini while the workflow's circuit breaker is open
+    if wf and circuit.allow_request(wf):
         webhook_url = _resolve_webhook_url(wf)
         if webhook_url:
-            from django.utils import timezone as _tz
+            import logging
+            logger = logging.getLogger(__name__)
+            # Only transport errors and 5xx responses count against the
+            # circuit; a 4xx or an unparseable body is n8n answering, so it
+            # records a success and just falls back to Gemini.
             try:
-                resp = http_requests.post(
+                resp = http.post(
                     webhook_url,
                     json={
                         'payload': {
@@ -180,20 +192,29 @@ def chat(request):
                         },
                     },
                     headers={'Content-Type': 'application/json'},
-                    timeout=45,
+                    timeout=http.workflow_timeout(wf, 45),
                 )
-                resp.raise_for_status()
-                data = resp.json()
-                reply = data.get('reply') or data.get('output') or str(data)
-                return Response({'reply': reply, 'source': 'n8n'})
             except http_requests.exceptions.Timeout:
+                circuit.record_failure(wf)
                 return Response(
                     {'error': 'The AI advisor is taking too long to respond. Please try again in a moment.'},
                     status=status.HTTP_504_GATEWAY_TIMEOUT,
                 )
-            except Exception as exc:
-                import logging
-                logging.getLogger(__name__).warning('n8n student.ask failed, falling back to Gemini: %s', exc)
+            except http_requests.exceptions.RequestException as exc:
+                circuit.record_failure(wf)
+                logger.warning('n8n student.ask failed, falling back to Gemini: %s', exc)
+            else:
+                if resp.status_code >= 500:
+                    circuit.record_failure(wf)
+                else:
+                    circuit.record_success(wf)
+                try:
+                    resp.raise_for_status()
+                    data = resp.json()
+                    reply = data.get('reply') or data.get('output') or str(data)
+                    return Response({'reply': reply, 'source': 'n8n'})
+                except Exception as exc:
+                    logger.warning('n8n student.ask failed, falling back to Gemini: %s', exc)
 
     # ── Route 2: Gemini with DB context injected ──────────────────────────────
     if not GEMINI_API_KEY:
@@ -224,7 +245,7 @@ def chat(request):
     }
 
     try:
-        resp = http_requests.post(GEMINI_URL, json=payload, timeout=30)
+        resp = http.post(GEMINI_URL, json=payload, timeout=30)
         if resp.status_code != 200:
             error_detail = resp.json().get('error', {}).get('message', resp.text)
             return Response({'error': f'Gemini API error: {error_detail}'}, status=status.HTTP_502_BAD_GATEWAY)
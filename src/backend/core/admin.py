@@ -70,6 +70,19 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ('recipient', 'verb', 'unread', 'created_at')
 
 
+@admin.register(models.NotificationFanout)
+class NotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = ('event', 'verb', 'status', 'sent', 'total', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+
+@admin.register(models.NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'verb', 'created_at', 'archived_at')
+    search_fields = ('recipient__email', 'verb')
+    raw_id_fields = ('recipient', 'actor')
+
+
 @admin.register(models.Resource)
 class ResourceAdmin(admin.ModelAdmin):
     list_display = ('title', 'unit', 'uploaded_by', 'created_at')
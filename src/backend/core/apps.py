@@ -8,3 +8,5 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import src.backend.core.signals  # noqa — registers attendance signal handlers
+        import src.backend.core.generation  # noqa — registers background job handlers
+        import src.backend.core.notifications  # noqa — registers the event.notify job handler
@@ -0,0 +1,287 @@
+"""
+core/audience.py — Maintenance of the EventAudience index.
+
+An event reaches a student when the student is in ``target_students``, is
+enrolled in one of ``target_offerings``, or is enrolled in an offering that
+belongs to one of ``target_intakes``.  Those pairs are materialised in
+``EventAudience`` and kept current by the signal handlers in core/signals.py:
+
+  * targeting M2M changed on an event     → refresh_event_audience(event)
+  * enrollment created / deleted          → refresh_student_audience(student, offering)
+  * enrollments bulk-created in an offering → add_offering_students(offering, students)
+  * offering moved to a different intake  → refresh_intake_audience(intake ids)
+
+Every refresh is a diff against the rows already stored, so only the pairs
+that actually changed are inserted or deleted.
+
+The same refreshes keep ``EventAudienceStats`` (reached-student count and
+targeted offering / intake ids) current, so readers such as the refine
+payload's audience_context read one row — see ``audience_stats``.
+"""
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 1000
+
+
+def _models():
+    return (
+        apps.get_model('core', 'Event'),
+        apps.get_model('core', 'EventAudience'),
+        apps.get_model('enrollment', 'Enrollment'),
+    )
+
+
+def resolve_event_student_ids(event):
+    """Compute the set of student ids reached by an event's explicit targeting."""
+    _, _, Enrollment = _models()
+
+    student_ids = set(event.target_students.values_list('id', flat=True))
+    student_ids.update(
+        Enrollment.objects.filter(
+            Q(offering__in=event.target_offerings.all()) |
+            Q(offering__intake__in=event.target_intakes.all())
+        ).values_list('student_id', flat=True)
+    )
+    return student_ids
+
+
+def _apply_diff(event_id, current, wanted):
+    _, EventAudience, _ = _models()
+
+    to_add = wanted - current
+    to_remove = current - wanted
+    if to_add:
+        EventAudience.objects.bulk_create(
+            [EventAudience(event_id=event_id, student_id=sid) for sid in to_add],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+    if to_remove:
+        EventAudience.objects.filter(event_id=event_id, student_id__in=to_remove).delete()
+    return len(to_add), len(to_remove)
+
+
+def refresh_event_audience(event, update_stats=True):
+    """
+    Bring the index for one event in line with its targeting.
+
+    Accepts an Event instance or primary key.  Returns (added, removed).
+    """
+    Event, EventAudience, _ = _models()
+
+    if not isinstance(event, Event):
+        event = Event.objects.filter(pk=event).first()
+        if event is None:
+            return 0, 0
+
+    current = set(EventAudience.objects.filter(event=event).values_list('student_id', flat=True))
+    result = _apply_diff(event.pk, current, resolve_event_student_ids(event))
+    if update_stats:
+        # Targeting changed even when the reached set did not (e.g. an empty offering)
+        refresh_audience_stats([event.pk])
+    return result
+
+
+def refresh_events_audience(event_ids):
+    """Refresh several events; returns totals (added, removed)."""
+    event_ids = set(event_ids)
+    added = removed = 0
+    for event_id in event_ids:
+        a, r = refresh_event_audience(event_id, update_stats=False)
+        added += a
+        removed += r
+    refresh_audience_stats(event_ids)
+    return added, removed
+
+
+def refresh_audience_stats(event_ids):
+    """Recompute EventAudienceStats for ``event_ids`` with a few grouped queries."""
+    Event, EventAudience, _ = _models()
+    EventAudienceStats = apps.get_model('core', 'EventAudienceStats')
+
+    event_ids = set(event_ids)
+    if not event_ids:
+        return 0
+    counts = dict(
+        EventAudience.objects.filter(event_id__in=event_ids)
+        .values('event_id').annotate(n=Count('id')).values_list('event_id', 'n')
+    )
+    offering_ids, intake_ids = defaultdict(list), defaultdict(list)
+    for event_id, offering_id in (
+        Event.target_offerings.through.objects.filter(event_id__in=event_ids)
+        .order_by('semesteroffering_id').values_list('event_id', 'semesteroffering_id')
+    ):
+        offering_ids[event_id].append(offering_id)
+    for event_id, intake_id in (
+        Event.target_intakes.through.objects.filter(event_id__in=event_ids)
+        .order_by('intake_id').values_list('event_id', 'intake_id')
+    ):
+        intake_ids[event_id].append(intake_id)
+
+    rows = [
+        EventAudienceStats(
+            event_id=event_id,
+            target_student_count=counts.get(event_id, 0),
+            target_offering_ids=offering_ids[event_id],
+            target_intake_ids=intake_ids[event_id],
+        )
+        for event_id in Event.objects.filter(pk__in=event_ids).values_list('id', flat=True)
+    ]
+    EventAudienceStats.objects.bulk_create(
+        rows, batch_size=BULK_BATCH_SIZE,
+        update_conflicts=True, unique_fields=['event'],
+        update_fields=['target_student_count', 'target_offering_ids', 'target_intake_ids', 'updated_at'],
+    )
+    return len(rows)
+
+
+def active_student_count():
+    """Number of active students (the audience of target_all_students events), cached briefly."""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    return cache.get_or_set(
+        'core:audience:active_student_count',
+        lambda: User.objects.filter(user_type='student', is_active=True).count(),
+        getattr(settings, 'AUDIENCE_ALL_STUDENTS_CACHE_TTL', 300),
+    )
+
+
+def audience_stats(event):
+    """
+    Audience summary for ``event`` read from its EventAudienceStats row:
+    ``{target_student_count, target_offering_ids, target_intake_ids}``.
+
+    Built on first use for events that have no stats row yet.  The count
+    honours ``target_all_students`` like get_targeted_students().
+    """
+    EventAudienceStats = apps.get_model('core', 'EventAudienceStats')
+
+    row = EventAudienceStats.objects.filter(event_id=event.pk).first()
+    if row is None:
+        refresh_audience_stats([event.pk])
+        row = EventAudienceStats.objects.get(event_id=event.pk)
+    return {
+        'target_student_count': (
+            active_student_count() if event.target_all_students else row.target_student_count
+        ),
+        'target_offering_ids': row.target_offering_ids,
+        'target_intake_ids': row.target_intake_ids,
+    }
+
+
+def refresh_student_audience(student_id, offering_id):
+    """
+    Re-evaluate one student against the events that can reach them through
+    ``offering_id`` — i.e. events targeting the offering or its intake.
+
+    Called when an enrollment is created or deleted.  Other events cannot be
+    affected by that change, so they are not touched.
+    """
+    Event, EventAudience, Enrollment = _models()
+    SemesterOffering = apps.get_model('academic', 'SemesterOffering')
+
+    intake_id = SemesterOffering.objects.filter(pk=offering_id).values_list('intake_id', flat=True).first()
+    candidate_q = Q(target_offerings=offering_id)
+    if intake_id:
+        candidate_q |= Q(target_intakes=intake_id)
+    candidates = set(Event.objects.filter(candidate_q).values_list('id', flat=True))
+    if not candidates:
+        return 0, 0
+
+    enrolled = Enrollment.objects.filter(student_id=student_id)
+    reached = set(
+        Event.objects.filter(id__in=candidates).filter(
+            Q(target_students=student_id) |
+            Q(target_offerings__in=enrolled.values('offering_id')) |
+            Q(target_intakes__in=enrolled.values('offering__intake_id'))
+        ).values_list('id', flat=True)
+    )
+    indexed = set(
+        EventAudience.objects.filter(student_id=student_id, event_id__in=candidates)
+        .values_list('event_id', flat=True)
+    )
+
+    to_add = reached - indexed
+    to_remove = indexed - reached
+    if to_add:
+        EventAudience.objects.bulk_create(
+            [EventAudience(event_id=eid, student_id=student_id) for eid in to_add],
+            ignore_conflicts=True,
+        )
+    if to_remove:
+        EventAudience.objects.filter(student_id=student_id, event_id__in=to_remove).delete()
+    refresh_audience_stats(to_add | to_remove)
+    return len(to_add), len(to_remove)
+
+
+def add_offering_students(offering_id, student_ids):
+    """
+    Set-wise ``refresh_student_audience`` for students who just enrolled in
+    ``offering_id`` through bulk writes that skip the Enrollment signals
+    (e.g. waitlist promotion).  Every event targeting the offering or its
+    intake now reaches them; a new enrollment never removes a pair.
+    """
+    Event, EventAudience, _ = _models()
+    SemesterOffering = apps.get_model('academic', 'SemesterOffering')
+
+    student_ids = set(student_ids)
+    if not student_ids:
+        return 0
+    intake_id = SemesterOffering.objects.filter(pk=offering_id).values_list('intake_id', flat=True).first()
+    candidate_q = Q(target_offerings=offering_id)
+    if intake_id:
+        candidate_q |= Q(target_intakes=intake_id)
+    candidates = set(Event.objects.filter(candidate_q).values_list('id', flat=True))
+    if not candidates:
+        return 0
+
+    indexed = set(
+        EventAudience.objects.filter(event_id__in=candidates, student_id__in=student_ids)
+        .values_list('event_id', 'student_id')
+    )
+    to_add = [
+        EventAudience(event_id=event_id, student_id=student_id)
+        for event_id in candidates for student_id in student_ids
+        if (event_id, student_id) not in indexed
+    ]
+    if to_add:
+        EventAudience.objects.bulk_create(to_add, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        refresh_audience_stats({row.event_id for row in to_add})
+    return len(to_add)
+
+
+def refresh_intake_audience(intake_ids):
+    """Refresh every event that targets any of the given intakes."""
+    Event, _, _ = _models()
+
+    intake_ids = [i for i in intake_ids if i]
+    if not intake_ids:
+        return 0, 0
+    event_ids = Event.objects.filter(target_intakes__in=intake_ids).values_list('id', flat=True)
+    return refresh_events_audience(event_ids)
+
+
+def rebuild_all():
+    """Recompute the whole index. Used by the management command and backfills."""
+    Event, _, _ = _models()
+
+    added = removed = 0
+    batch = []
+    for event in Event.objects.only('id').iterator():
+        a, r = refresh_event_audience(event, update_stats=False)
+        added += a
+        removed += r
+        batch.append(event.pk)
+        if len(batch) >= BULK_BATCH_SIZE:
+            refresh_audience_stats(batch)
+            batch = []
+    refresh_audience_stats(batch)
+    logger.info('EventAudience rebuilt: %s added, %s removed', added, removed)
+    return added, removed
@@ -1,3 +1,5 @@
+import copy
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -50,6 +52,91 @@ class SoftDeleteModel(models.Model):
         self.deleted_at = None
         self.save()
 
+class TrackedFieldsMixin:
+    """
+    Remembers the stored value of each field named in ``tracked_fields`` —
+    taken from the row when the instance is loaded (``from_db``) and
+    refreshed after every save — so ``pre_save`` / ``post_save`` receivers
+    can compare old and new values without reading the row again.
+
+    Receivers run inside ``save()``, before the stored values move on, so
+    ``stored_value()`` / ``has_changed()`` there describe the row as it was.
+    Instances that were not loaded with a tracked field (built by hand with
+    a pk, or loaded with ``only()`` / ``defer()``) read the missing values
+    in one query just before they are saved.  List it before the model base
+    class: ``class Enrollment(TrackedFieldsMixin, BaseModel)``.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_stored(
+            name for name in cls.tracked_fields
+            if cls._meta.get_field(name).attname in field_names
+        )
+        return instance
+
+    def _remember_stored(self, names):
+        stored = self.__dict__.setdefault('_stored_values', {})
+        for name in names:
+            attname = self._meta.get_field(name).attname
+            if attname not in self.__dict__:
+                continue  # deferred — reading it would cost a query
+            value = self.__dict__[attname]
+            # JSON fields are mutated in place; keep our own copy to compare against
+            stored[name] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def is_tracked(self, name):
+        """Whether the stored value of ``name`` is known."""
+        return name in self.__dict__.get('_stored_values', {})
+
+    def stored_value(self, name, default=None):
+        """Value of ``name`` in the database row (``default`` for unsaved or untracked fields)."""
+        return self.__dict__.get('_stored_values', {}).get(name, default)
+
+    def set_stored_value(self, name, value):
+        """For code that has just read the row itself, e.g. under ``select_for_update()``."""
+        self.__dict__.setdefault('_stored_values', {})[name] = value
+
+    def has_changed(self, name):
+        """True unless ``name`` is tracked and still equal to its stored value."""
+        if not self.is_tracked(name):
+            return True
+        return getattr(self, self._meta.get_field(name).attname) != self.stored_value(name)
+
+    def changed_fields(self):
+        return {name for name in self.tracked_fields if self.has_changed(name)}
+
+    def _tracked_in(self, fields):
+        """Tracked field names among ``fields`` (names or attnames)."""
+        fields = set(fields)
+        return [
+            name for name in self.tracked_fields
+            if name in fields or self._meta.get_field(name).attname in fields
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        saved = self.tracked_fields if update_fields is None else self._tracked_in(update_fields)
+        missing = {
+            name: self._meta.get_field(name).attname
+            for name in saved if not self.is_tracked(name)
+        }
+        if missing and self.pk is not None:
+            manager = type(self)._base_manager.db_manager(kwargs.get('using') or self._state.db)
+            row = manager.filter(pk=self.pk).values(*missing.values()).first()
+            if row is not None:
+                for name, attname in missing.items():
+                    self.set_stored_value(name, row[attname])
+        super().save(*args, **kwargs)
+        self._remember_stored(saved)
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._remember_stored(self.tracked_fields if fields is None else self._tracked_in(fields))
+
+
 class BaseModel(TimeStampedModel, SoftDeleteModel):
     """
     A base model that combines timestamps, audit trails, and soft deletes.
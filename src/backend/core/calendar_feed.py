@@ -0,0 +1,248 @@
+"""
+core/calendar_feed.py — Per-user iCalendar (.ics) feed of sessions and events.
+
+``GET /api/core/calendar/<token>.ics`` — calendar clients (Google, Outlook,
+Apple) subscribe to this URL and poll it every few minutes, so it carries a
+signed token instead of a JWT; ``GET /api/core/sessions/calendar-feed/``
+hands the logged-in user their URL.  The token signs the user id and their
+CalendarFeedKey version: ``POST /api/core/sessions/calendar-feed/rotate/``
+bumps the version, revoking every URL issued before (e.g. a leaked one).
+
+What is in a feed:
+  * students   — sessions of the offerings they are ENROLLED in, and the
+                 events shown to them by EventViewSet (target_all_students
+                 broadcasts plus their EventAudience rows, never 'staff');
+  * convenors / staff — sessions of units they convene or instruct, and
+                 events they created or that belong to units they convene.
+Only rows starting after today − CALENDAR_FEED_PAST_DAYS are included.
+
+Polls are answered by conditional GET: the ETag / Last-Modified come from a
+few indexed aggregate queries (row count + newest updated_at of every source
+table), so an unchanged feed is a 304 without loading or rendering a row.
+Any insert, edit, soft delete or removal changes the fingerprint.  Rendered
+bodies are cached under the ETag for CALENDAR_FEED_CACHE_TTL seconds.
+"""
+import hashlib
+from datetime import datetime, time, timedelta
+
+import pytz
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_safe
+
+_SALT = 'core.calendar-feed'
+_PRODID = '-//Swinburne VN CMS//Calendar Feed//EN'
+
+
+# ── Tokens ───────────────────────────────────────────────────────────────────
+
+def _feed_version(user):
+    CalendarFeedKey = apps.get_model('core', 'CalendarFeedKey')
+    return CalendarFeedKey.objects.filter(user=user).values_list('version', flat=True).first() or 0
+
+
+def make_token(user):
+    version = _feed_version(user)
+    # Version 0 signs the bare id, as tokens issued before rotation existed did
+    value = f'{user.pk}.{version}' if version else str(user.pk)
+    return signing.Signer(salt=_SALT).sign(value)
+
+
+def user_for_token(token):
+    """Return the active user ``token`` was issued for, or None (bad or rotated token)."""
+    try:
+        value = signing.Signer(salt=_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    user_id, _, version = value.partition('.')
+    version = int(version or 0)
+    current = Q(calendar_feed_key__version=version)
+    if not version:
+        current |= Q(calendar_feed_key__isnull=True)
+    return get_user_model().objects.filter(current, pk=user_id, is_active=True).first()
+
+
+def rotate_token(user):
+    """Revoke ``user``'s feed URLs; returns the new token."""
+    CalendarFeedKey = apps.get_model('core', 'CalendarFeedKey')
+    now = timezone.now()
+    if not CalendarFeedKey.objects.filter(user=user).update(version=F('version') + 1, rotated_at=now):
+        CalendarFeedKey.objects.get_or_create(user=user, defaults={'version': 1, 'rotated_at': now})
+    return make_token(user)
+
+
+def feed_url(request, user):
+    return request.build_absolute_uri(reverse('calendar-feed', kwargs={'token': make_token(user)}))
+
+
+# ── Feed contents ────────────────────────────────────────────────────────────
+
+def _is_student(user):
+    return getattr(user, 'user_type', None) == 'student' and not user.is_staff
+
+
+def _window_start():
+    days = getattr(settings, 'CALENDAR_FEED_PAST_DAYS', 30)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def feed_querysets(user):
+    """Querysets of every row the feed depends on, keyed by source name."""
+    Session = apps.get_model('core', 'Session')
+    Event = apps.get_model('core', 'Event')
+    since = _window_start()
+    events = Event.objects.filter(
+        is_deleted=False, start__gte=timezone.make_aware(datetime.combine(since, time.min)),
+    )
+    sessions = Session.objects.filter(is_deleted=False, date__gte=since)
+
+    if _is_student(user):
+        Enrollment = apps.get_model('enrollment', 'Enrollment')
+        EventAudience = apps.get_model('core', 'EventAudience')
+        enrollments = Enrollment.objects.filter(student=user, status='ENROLLED')
+        audience = EventAudience.objects.filter(student=user)
+        return {
+            'enrollments': enrollments,
+            'audience': audience,
+            'sessions': sessions.filter(offering__in=enrollments.values('offering')),
+            'events': events.filter(
+                Q(target_all_students=True, visibility__in=('public', 'unit')) |
+                Q(pk__in=audience.values('event_id'))
+            ).exclude(visibility='staff'),
+        }
+
+    return {
+        'sessions': sessions.filter(Q(unit__convenor=user) | Q(instructor=user)),
+        'events': events.filter(Q(created_by=user) | Q(related_unit__convenor=user)),
+    }
+
+
+def fingerprint(user):
+    """(etag, last_modified) of ``user``'s feed — aggregates only, no rows loaded."""
+    parts, newest = [], None
+    for name, qs in sorted(feed_querysets(user).items()):
+        if name == 'audience':
+            # No timestamps on EventAudience; re-created rows get new ids
+            agg = qs.aggregate(n=Count('pk'), latest=Max('pk'))
+        else:
+            agg = qs.aggregate(n=Count('pk'), latest=Max('updated_at'))
+            if agg['latest'] and (newest is None or agg['latest'] > newest):
+                newest = agg['latest']
+        parts.append(f"{name}:{agg['n']}:{agg['latest']}")
+    parts.append(f'since:{_window_start()}')
+    digest = hashlib.sha256(f'{user.pk}|{"|".join(parts)}'.encode('utf-8')).hexdigest()[:32]
+    return digest, newest
+
+
+def _fold(line):
+    """RFC 5545 §3.1: lines longer than 75 octets continue with a leading space."""
+    raw = line.encode('utf-8')
+    if len(raw) <= 75:
+        return line
+    chunks, limit = [], 75
+    while raw:
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        chunks.append(raw[:cut].decode('utf-8'))
+        raw, limit = raw[cut:], 74
+    return '\r\n '.join(chunks)
+
+
+def _text(value):
+    return (str(value or '').replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _utc(dt):
+    return dt.astimezone(pytz.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent(uid, stamp, start, end, summary, location='', description=''):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{_utc(stamp or timezone.now())}',
+        f'DTSTART:{_utc(start)}',
+    ]
+    if end and end > start:
+        lines.append(f'DTEND:{_utc(end)}')
+    lines.append(f'SUMMARY:{_text(summary)}')
+    if location:
+        lines.append(f'LOCATION:{_text(location)}')
+    if description:
+        lines.append(f'DESCRIPTION:{_text(description)}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_feed(user):
+    """The full VCALENDAR document for ``user``."""
+    # Session dates/times are campus-local wall clock
+    local_tz = pytz.timezone(getattr(settings, 'CALENDAR_FEED_TIMEZONE', 'Asia/Ho_Chi_Minh'))
+    host = getattr(settings, 'CALENDAR_FEED_UID_DOMAIN', 'cms.swinburne.edu.vn')
+    querysets = feed_querysets(user)
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{_PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_text(user.get_full_name() or user.email)} — timetable',
+        'X-PUBLISHED-TTL:PT15M',
+    ]
+    sessions = querysets['sessions'].select_related('unit').order_by('date', 'start_time', 'id')
+    for s in sessions:
+        start = local_tz.localize(datetime.combine(s.date, s.start_time))
+        end = local_tz.localize(datetime.combine(s.date, s.end_time)) if s.end_time else None
+        lines += _vevent(
+            f'session-{s.pk}@{host}', s.updated_at, start, end,
+            f'{s.unit.code} {s.get_session_type_display()}', s.location,
+        )
+    for e in querysets['events'].order_by('start', 'id'):
+        start = e.start if timezone.is_aware(e.start) else local_tz.localize(e.start)
+        end = e.end and (e.end if timezone.is_aware(e.end) else local_tz.localize(e.end))
+        lines += _vevent(f'event-{e.pk}@{host}', e.updated_at, start, end,
+                         e.title, e.location, e.description)
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+# ── View ─────────────────────────────────────────────────────────────────────
+
+def _feed_state(request, token):
+    """Resolve the token and fingerprint once per request (both condition hooks use it)."""
+    state = getattr(request, '_calendar_feed', None)
+    if state is None:
+        user = user_for_token(token)
+        if user is None:
+            raise Http404('Unknown calendar feed')
+        state = request._calendar_feed = (user, *fingerprint(user))
+    return state
+
+
+@require_safe
+@condition(
+    etag_func=lambda request, token: _feed_state(request, token)[1],
+    last_modified_func=lambda request, token: _feed_state(request, token)[2],
+)
+def calendar_feed(request, token):
+    """The .ics feed; 304 Not Modified when the client's copy is current."""
+    user, etag, _ = _feed_state(request, token)
+    cache_key = f'calendar-feed:{etag}'
+    body = cache.get(cache_key)
+    if body is None:
+        body = render_feed(user)
+        cache.set(cache_key, body, getattr(settings, 'CALENDAR_FEED_CACHE_TTL', 3600))
+    response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="timetable.ics"'
+    response['Cache-Control'] = 'private, no-cache'  # always revalidate; 304s are cheap
+    return response
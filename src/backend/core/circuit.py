@@ -0,0 +1,149 @@
+"""
+core/circuit.py — Per-workflow circuit breaker for n8n webhooks.
+
+State lives on the N8NWorkflow row, so every gunicorn / job / outbox
+process shares it:
+
+  closed     error_count < N8N_CIRCUIT_FAILURE_THRESHOLD; calls go through.
+             ``error_count`` counts *consecutive* failures — any success
+             resets it to 0.
+  open       the threshold was reached less than N8N_CIRCUIT_COOLDOWN
+             seconds ago (``circuit_opened_at``); calls fail fast with
+             CircuitOpenError and callers fall back (mock generators,
+             Gemini, retry later).
+  half_open  the cooldown has elapsed; exactly one caller wins the probe
+             (a conditional UPDATE on ``circuit_probe_at``).  Success closes
+             the circuit, failure re-opens it for another cooldown.
+
+Usage:
+
+    if not circuit.allow_request(wf):
+        raise CircuitOpenError(wf)
+    try:
+        ... call n8n ...
+    except Exception:
+        circuit.record_failure(wf)
+        raise
+    circuit.record_success(wf)
+"""
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a workflow whose circuit is open."""
+
+    def __init__(self, workflow):
+        self.workflow = workflow
+        super().__init__(f'n8n workflow "{workflow.name}" is unavailable (circuit open)')
+
+
+def _workflow_model():
+    return apps.get_model('users', 'N8NWorkflow')
+
+
+def _threshold():
+    return getattr(settings, 'N8N_CIRCUIT_FAILURE_THRESHOLD', 5)
+
+
+def _cooldown():
+    return timezone.timedelta(seconds=getattr(settings, 'N8N_CIRCUIT_COOLDOWN', 60))
+
+
+def _probe_lease():
+    return timezone.timedelta(seconds=getattr(settings, 'N8N_CIRCUIT_PROBE_TIMEOUT', 90))
+
+
+def state(workflow, now=None):
+    """Breaker state of ``workflow`` as last loaded from the database."""
+    if workflow.circuit_opened_at is None:
+        return CLOSED
+    now = now or timezone.now()
+    if now < workflow.circuit_opened_at + _cooldown():
+        return OPEN
+    return HALF_OPEN
+
+
+def is_open(workflow):
+    """True while the workflow is cooling down — callers should not even queue work."""
+    return state(workflow) == OPEN
+
+
+def retry_at(workflow, now=None):
+    """When work refused by the breaker is worth trying again: the end of the cooldown."""
+    now = now or timezone.now()
+    if state(workflow, now) == OPEN:
+        return workflow.circuit_opened_at + _cooldown()
+    # Half-open with the probe taken: its outcome is known within a cooldown
+    return now + _cooldown()
+
+
+def allow_request(workflow):
+    """
+    Whether the caller may call ``workflow`` now.  In half-open state only
+    the caller that wins the probe lease gets True.
+    """
+    now = timezone.now()
+    current = state(workflow, now)
+    if current == CLOSED:
+        return True
+    if current == OPEN:
+        return False
+
+    won = _workflow_model().objects.filter(
+        pk=workflow.pk, circuit_opened_at=workflow.circuit_opened_at,
+    ).filter(
+        Q(circuit_probe_at__isnull=True) | Q(circuit_probe_at__lt=now - _probe_lease())
+    ).update(circuit_probe_at=now)
+    if won:
+        workflow.circuit_probe_at = now
+    return bool(won)
+
+
+def record_success(workflow, when=None):
+    """Close the circuit and reset the consecutive-failure count."""
+    when = when or timezone.now()
+    _workflow_model().objects.filter(pk=workflow.pk).update(
+        error_count=0, circuit_opened_at=None, circuit_probe_at=None, last_run=when,
+    )
+    workflow.error_count = 0
+    workflow.circuit_opened_at = None
+    workflow.circuit_probe_at = None
+    workflow.last_run = when
+
+
+def record_failure(workflow, count=1):
+    """Count ``count`` consecutive failures; open the circuit at the threshold."""
+    N8NWorkflow = _workflow_model()
+    now = timezone.now()
+    N8NWorkflow.objects.filter(pk=workflow.pk).update(error_count=F('error_count') + count)
+    # A failed half-open probe re-opens immediately; otherwise open once the
+    # threshold is crossed (and keep the original opened_at while open).
+    opened = N8NWorkflow.objects.filter(pk=workflow.pk, error_count__gte=_threshold()).filter(
+        Q(circuit_opened_at__isnull=True) | Q(circuit_probe_at__isnull=False)
+    ).update(circuit_opened_at=now, circuit_probe_at=None)
+
+    fresh = N8NWorkflow.objects.filter(pk=workflow.pk).values(
+        'error_count', 'circuit_opened_at', 'circuit_probe_at',
+    ).first()
+    if fresh:
+        workflow.error_count = fresh['error_count']
+        workflow.circuit_opened_at = fresh['circuit_opened_at']
+        workflow.circuit_probe_at = fresh['circuit_probe_at']
+    return bool(opened)
+
+
+def reset(workflow):
+    """Manually close the circuit (staff action)."""
+    _workflow_model().objects.filter(pk=workflow.pk).update(
+        error_count=0, circuit_opened_at=None, circuit_probe_at=None,
+    )
+    workflow.error_count = 0
+    workflow.circuit_opened_at = None
+    workflow.circuit_probe_at = None
@@ -0,0 +1,179 @@
+"""
+core/csv_import.py — Streaming CSV handling for ``EventViewSet.import_csv``.
+
+Uploads are never materialised as a list of rows or a bytes blob:
+
+  * ``validate_csv`` reads the file once, row by row, checking the header
+    and each row's required columns; only the row count and the first
+    CSV_IMPORT_MAX_ERRORS problems are kept.
+  * ``MultipartStream`` forwards the upload to n8n as a multipart body that
+    is generated from the file's chunks while it is being sent (with an
+    exact Content-Length, so n8n sees a normal request).
+  * ``import_file`` is the local alternative: rows are streamed into
+    core/event_import.py in chunks of EVENT_IMPORT_CHUNK_SIZE.
+
+Django spools uploads above FILE_UPLOAD_MAX_MEMORY_SIZE to a temp file, so
+with these helpers worker memory stays flat regardless of the CSV size.
+"""
+import csv
+import io
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .event_import import import_events
+
+# Accepted header layouts: the rich n8n pipeline CSV and the simple
+# Event-field CSV.  Each maps to the columns every row must fill in.
+SHAPES = {
+    'csv': ('Event_Title', 'Event_Date'),
+    'simple': ('title', 'start'),
+}
+
+CsvReport = namedtuple('CsvReport', 'shape row_count errors')
+
+
+class CsvImportError(ValueError):
+    """The upload is not a CSV we can import (encoding, header, empty)."""
+
+
+@contextmanager
+def open_rows(uploaded_file):
+    """
+    Yield a ``csv.DictReader`` streaming over ``uploaded_file``.
+
+    The text wrapper is detached afterwards so the upload stays open (and
+    seekable) for forwarding.
+    """
+    uploaded_file.seek(0)
+    stream = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    try:
+        yield csv.DictReader(stream)
+    except UnicodeDecodeError as exc:
+        raise CsvImportError(f'CSV must be UTF-8 encoded ({exc.reason})')
+    finally:
+        stream.detach()
+
+
+def detect_shape(fieldnames):
+    """Return the SHAPES key matching ``fieldnames`` or raise CsvImportError."""
+    names = {(name or '').strip() for name in fieldnames or ()}
+    if not names:
+        raise CsvImportError('CSV is empty')
+    for shape, required in SHAPES.items():
+        if names.issuperset(required):
+            return shape
+    expected = ' or '.join('+'.join(required) for required in SHAPES.values())
+    raise CsvImportError(f'CSV header must contain {expected}')
+
+
+def clean_row(row, shape):
+    """Strip values; for the simple shape drop blanks so model defaults apply."""
+    cleaned = {
+        (key or '').strip(): (value or '').strip() if isinstance(value, str) else value
+        for key, value in row.items() if key
+    }
+    if shape == 'simple':
+        cleaned = {key: value for key, value in cleaned.items() if value not in ('', None)}
+    return cleaned
+
+
+def validate_csv(uploaded_file, max_errors=None):
+    """One streaming pass over the upload; returns a CsvReport."""
+    max_errors = max_errors or getattr(settings, 'CSV_IMPORT_MAX_ERRORS', 50)
+    errors = []
+    row_count = 0
+    with open_rows(uploaded_file) as reader:
+        shape = detect_shape(reader.fieldnames)
+        required = SHAPES[shape]
+        for row in reader:
+            row_count += 1
+            if len(errors) >= max_errors:
+                continue
+            if None in row:
+                errors.append({'line': reader.line_num, 'error': 'Too many columns'})
+                continue
+            missing = [col for col in required if not (row.get(col) or '').strip()]
+            if missing:
+                errors.append({'line': reader.line_num, 'error': f'Missing {", ".join(missing)}'})
+    if not row_count:
+        raise CsvImportError('CSV is empty')
+    return CsvReport(shape, row_count, errors)
+
+
+def import_file(uploaded_file, created_by=None, chunk_size=None):
+    """
+    Import the upload locally, ``chunk_size`` rows per bulk insert.  Error
+    indexes are row positions in the file (0 = first data row).
+    """
+    chunk_size = chunk_size or getattr(settings, 'EVENT_IMPORT_CHUNK_SIZE', 500)
+    summary = {'created_count': 0, 'error_count': 0, 'created_ids': [], 'errors': []}
+
+    def _flush(chunk, offset):
+        result = import_events(chunk, created_by=created_by, chunk_size=chunk_size)
+        summary['created_count'] += result['created_count']
+        summary['error_count'] += result['error_count']
+        summary['created_ids'].extend(result['created_ids'])
+        for error in result['errors'] or ():
+            summary['errors'].append({**error, 'index': error['index'] + offset})
+
+    with open_rows(uploaded_file) as reader:
+        shape = detect_shape(reader.fieldnames)
+        chunk, offset = [], 0
+        for row in reader:
+            chunk.append(clean_row(row, shape))
+            if len(chunk) >= chunk_size:
+                _flush(chunk, offset)
+                offset += len(chunk)
+                chunk = []
+        if chunk:
+            _flush(chunk, offset)
+
+    summary['errors'] = summary['errors'] or None
+    return summary
+
+
+class MultipartStream:
+    """
+    Iterable ``multipart/form-data`` body: text ``fields`` followed by the
+    upload as ``file_field``.  The file is read chunk by chunk while the
+    body is sent; ``len()`` gives the exact size so requests sends a
+    Content-Length header instead of chunked encoding.  Iterating again
+    (e.g. a connect retry) starts from the top of the file.
+    """
+
+    def __init__(self, uploaded_file, fields=None, file_field='data', chunk_size=64 * 1024):
+        self.file = uploaded_file
+        self.chunk_size = chunk_size
+        self.boundary = '----CMSFormBoundary' + uuid.uuid4().hex
+        head = []
+        for name, value in (fields or {}).items():
+            head.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        filename = getattr(uploaded_file, 'name', None) or 'upload.csv'
+        content_type = getattr(uploaded_file, 'content_type', None) or 'text/csv'
+        head.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self.head = ''.join(head).encode('utf-8')
+        self.tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return len(self.head) + self.file.size + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        self.file.seek(0)
+        yield from self.file.chunks(self.chunk_size)
+        yield self.tail
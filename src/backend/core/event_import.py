@@ -0,0 +1,239 @@
+"""
+core/event_import.py — Set-based bulk import of events posted by n8n.
+
+``EventViewSet.batch_create_from_webhook`` receives whole semester
+calendars (hundreds to thousands of rows) in one call.  Instead of one
+serializer save — INSERT plus M2M writes — per row, the import:
+
+  1. normalises every row (simple or rich CSV shape) and validates it with
+     EventImportRowSerializer, which needs no queries;
+  2. checks every referenced user / offering / intake / unit id with one
+     query per model for the whole batch;
+  3. inserts valid rows with ``bulk_create`` in chunks and writes the M2M
+     targets with bulk through-table inserts;
+  4. refreshes the EventAudience index for events with explicit targets
+     (bulk writes bypass the m2m_changed signals that normally do it).
+
+Rows are independent: invalid rows are reported by index and skipped.
+"""
+from datetime import datetime
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import audience
+from .serializers import EventImportRowSerializer
+
+BULK_CHUNK_SIZE = 500
+
+# M2M field → (related model label, through-table column)
+_TARGET_FIELDS = {
+    'target_students': (None, 'user_id'),  # AUTH_USER_MODEL
+    'target_offerings': ('academic.SemesterOffering', 'semesteroffering_id'),
+    'target_intakes': ('academic.Intake', 'intake_id'),
+}
+# FK field → related model label
+_FK_FIELDS = {
+    'related_unit': 'academic.Unit',
+    'related_offering': 'academic.SemesterOffering',
+}
+
+
+def normalise_row(raw):
+    """Convert either payload shape into a dict for EventImportRowSerializer."""
+    # Detect rich CSV shape by presence of CSV-specific keys
+    is_csv = 'Event_Title' in raw or 'Event_Date' in raw
+
+    if not is_csv:
+        # Simple shape — pass through with minor cleanup
+        row = dict(raw)
+        for fk in _FK_FIELDS:
+            if f'{fk}_id' in row and fk not in row:
+                row[fk] = row.pop(f'{fk}_id')
+        # Intakes may arrive nested ({"id": 3, ...}) as EventSerializer renders them
+        if isinstance(row.get('target_intakes'), list):
+            row['target_intakes'] = [
+                item.get('id') if isinstance(item, dict) else item
+                for item in row['target_intakes']
+            ]
+        return row
+
+    # ── Rich CSV → Event field mapping ────────────────────────────
+    title = raw.get('Event_Title', '').strip()
+
+    # Combine Event_Date + Start_Time → ISO datetime
+    event_date = raw.get('Event_Date', '').strip()
+    start_time = raw.get('Start_Time', '08:00').strip() or '08:00'
+    start_dt = None
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y'):
+        try:
+            d = datetime.strptime(event_date, fmt).date()
+            start_dt = f"{d.isoformat()}T{start_time}:00"
+            break
+        except ValueError:
+            continue
+    if not start_dt:
+        start_dt = f"{event_date}T{start_time}:00"
+
+    location = raw.get('Location', '').strip()
+    if location.lower() in ('n/a', 'na', ''):
+        location = ''
+
+    # Target_Audience → visibility + target_all_students
+    audience_raw = raw.get('Target_Audience', 'students').lower()
+    if 'staff' in audience_raw and 'parent' not in audience_raw:
+        visibility = 'staff'
+        target_all = False
+    else:
+        visibility = 'public'
+        target_all = True
+
+    # Content_Remarks → description (also used as AI generation prompt)
+    content_remarks = raw.get('Content_Remarks', '').strip()
+
+    # Build generation_meta from CSV-specific fields
+    csv_meta = {
+        'notify_rule': raw.get('Notify_Rule', '').strip(),
+        'channels': raw.get('Channels', '').strip(),
+        'target_audience': raw.get('Target_Audience', '').strip(),
+        'dept_filter': raw.get('Dept_Filter', '').strip(),
+        'content_remarks': content_remarks,
+        'assets_url': raw.get('Assets_URL', '').strip(),
+        'source': 'csv_import',
+    }
+
+    return {
+        'title': title,
+        'description': content_remarks,
+        'start': start_dt,
+        'end': None,
+        'location': location,
+        'visibility': visibility,
+        'target_all_students': target_all,
+        'generation_status': 'idle',
+        'generation_meta': {'csv_meta': csv_meta},
+    }
+
+
+def _model(label):
+    if label is None:
+        return get_user_model()
+    return apps.get_model(label)
+
+
+def validate_rows(rows):
+    """
+    Normalise and validate ``rows``.  Returns ``(valid, errors)`` where
+    ``valid`` is a list of ``(index, validated_data)`` and ``errors`` a list
+    of ``{'index': i, 'errors': {...}}``.
+    """
+    candidates, errors = [], []
+    for index, raw in enumerate(rows):
+        if not isinstance(raw, dict):
+            errors.append({'index': index, 'errors': {'non_field_errors': ['Expected an object']}})
+            continue
+        try:
+            data = normalise_row(raw)
+        except Exception as exc:
+            errors.append({'index': index, 'errors': {'non_field_errors': [str(exc)]}})
+            continue
+        serializer = EventImportRowSerializer(data=data)
+        if serializer.is_valid():
+            candidates.append((index, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+
+    # ── Set-wise existence checks: one query per related model ────────────────
+    referenced = {field: set() for field in (*_TARGET_FIELDS, *_FK_FIELDS)}
+    for _, data in candidates:
+        for field in _TARGET_FIELDS:
+            referenced[field].update(data.get(field) or ())
+        for field in _FK_FIELDS:
+            if data.get(field) is not None:
+                referenced[field].add(data[field])
+
+    labels = {**{f: lbl for f, (lbl, _) in _TARGET_FIELDS.items()}, **_FK_FIELDS}
+    existing = {}
+    for field, ids in referenced.items():
+        existing[field] = (
+            set(_model(labels[field]).objects.filter(pk__in=ids).values_list('pk', flat=True))
+            if ids else set()
+        )
+
+    valid = []
+    for index, data in candidates:
+        row_errors = {}
+        for field in _TARGET_FIELDS:
+            missing = sorted(set(data.get(field) or ()) - existing[field])
+            if missing:
+                row_errors[field] = [f'Invalid pk(s) {missing} - object does not exist.']
+        for field in _FK_FIELDS:
+            value = data.get(field)
+            if value is not None and value not in existing[field]:
+                row_errors[field] = [f'Invalid pk "{value}" - object does not exist.']
+        if row_errors:
+            errors.append({'index': index, 'errors': row_errors})
+        else:
+            valid.append((index, data))
+
+    errors.sort(key=lambda e: e['index'])
+    return valid, errors
+
+
+def bulk_create_events(valid_rows, created_by=None, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Insert validated rows in chunks and write their M2M targets in bulk.
+    Returns the new event ids in row order.
+    """
+    Event = apps.get_model('core', 'Event')
+    created_ids = []
+    targeted_ids = []
+
+    with transaction.atomic():
+        for start in range(0, len(valid_rows), chunk_size):
+            chunk = valid_rows[start:start + chunk_size]
+            events, targets = [], []
+            for _, data in chunk:
+                data = dict(data)
+                row_targets = {field: data.pop(field, None) or [] for field in _TARGET_FIELDS}
+                for field in _FK_FIELDS:
+                    if field in data:
+                        data[f'{field}_id'] = data.pop(field)
+                events.append(Event(created_by=created_by, **data))
+                targets.append(row_targets)
+
+            Event.objects.bulk_create(events)
+
+            for field, (_, column) in _TARGET_FIELDS.items():
+                through = getattr(Event, field).through
+                links = [
+                    through(event_id=event.pk, **{column: target_id})
+                    for event, row_targets in zip(events, targets)
+                    for target_id in set(row_targets[field])
+                ]
+                if links:
+                    through.objects.bulk_create(links, batch_size=chunk_size, ignore_conflicts=True)
+
+            for event, row_targets in zip(events, targets):
+                created_ids.append(event.pk)
+                if any(row_targets.values()):
+                    targeted_ids.append(event.pk)
+
+        # bulk_create skips m2m_changed, so maintain the audience index here
+        if targeted_ids:
+            audience.refresh_events_audience(targeted_ids)
+
+    return created_ids
+
+
+def import_events(rows, created_by=None, chunk_size=BULK_CHUNK_SIZE):
+    """Validate and bulk-insert ``rows``; returns a compact summary dict."""
+    valid, errors = validate_rows(rows)
+    created_ids = bulk_create_events(valid, created_by=created_by, chunk_size=chunk_size)
+    return {
+        'created_count': len(created_ids),
+        'error_count': len(errors),
+        'created_ids': created_ids,
+        'errors': errors or None,
+    }
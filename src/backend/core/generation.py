@@ -0,0 +1,463 @@
+"""
+core/generation.py — Event content generation / refinement job handlers.
+
+``EventViewSet.generate_content`` and ``refine_content`` enqueue these jobs
+(see core/jobs.py) instead of calling n8n inside the request; a
+``run_jobs`` worker performs the HTTP round-trip and writes the outcome
+back onto the Event (generated_content, generation_status, …) and the
+N8NExecutionLog.
+
+The mock generators used when no workflow is configured live here too so
+the views and the failure hooks share one implementation.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pytz
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from . import audience, circuit, generation_stream
+from .jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+_VN_TZ = pytz.timezone('Asia/Ho_Chi_Minh')
+
+
+def _to_rfc3339(dt):
+    """Return RFC 3339 string; make naive datetimes VN-local."""
+    if not dt:
+        return None
+    if timezone.is_naive(dt):
+        dt = _VN_TZ.localize(dt)
+    return dt.isoformat()
+
+
+def _models():
+    return (
+        apps.get_model('core', 'Event'),
+        apps.get_model('users', 'N8NWorkflow'),
+        apps.get_model('users', 'N8NExecutionLog'),
+    )
+
+
+def _user(user_id):
+    if not user_id:
+        return None
+    return get_user_model().objects.filter(pk=user_id).first()
+
+
+def _start_log(wf, triggered_by_id, payload):
+    _, _, N8NExecutionLog = _models()
+    return N8NExecutionLog.objects.create(
+        workflow=wf,
+        triggered_by=_user(triggered_by_id),
+        start_time=timezone.now(),
+        status='running',
+        input_data=payload,
+    )
+
+
+def _finish_log(log, status, output=None, error=None):
+    if output is not None:
+        log.output_data = output
+    if error is not None:
+        log.error_details = {'error': error}
+    log.status = status
+    log.end_time = timezone.now()
+    log.save()
+
+
+# ── Generation ───────────────────────────────────────────────────────────────
+
+def default_prompt(event):
+    return f"Create marketing copy for event: {event.title}\n\n{event.description}"
+
+
+def build_generate_payload(event, prompt, triggered_by_id=None):
+    """Flat payload so n8n Code nodes can read payload.title, payload.start, etc."""
+    start = _to_rfc3339(event.start)
+    end = _to_rfc3339(event.end) if event.end else start
+    return {
+        # Top-level flat fields — consumed directly by n8n expressions
+        'event_id':    str(event.id),
+        'title':       event.title,
+        'description': event.description or '',
+        'start':       start,
+        'end':         end,
+        'location':    event.location or '',
+        'prompt':      prompt,
+        # Nested copy kept for backward compat
+        'event': {
+            'id':          event.id,
+            'title':       event.title,
+            'description': event.description or '',
+            'start':       start,
+            'end':         end,
+            'location':    event.location or '',
+        },
+        'triggered_by': triggered_by_id,
+    }
+
+
+def mock_generate(event, prompt):
+    """Local stand-in for the GenAI workflow; saves and returns (content, meta)."""
+    social = f"Join us for {event.title} at {event.location} on {event.start.strftime('%b %d, %Y')}. {event.description[:120]}"
+    email = f"Subject: {event.title}\n\nHello,\n\nWe're excited to invite you to {event.title}. Details:\n{event.description}\n\nWhen: {event.start}\nWhere: {event.location}\n\nBest regards,\nSwinburne VN"
+    article = f"{event.title}\n\n{event.description}\n\nThis event on {event.start.strftime('%A, %d %B %Y')} at {event.location} will cover..."
+    ad = f"{event.title} — {event.location} — {event.start.strftime('%b %d')} — Sign up now!"
+
+    generated = {
+        'social_post': social,
+        'email_newsletter': email,
+        'long_article': article,
+        'recruitment_ad': ad,
+    }
+
+    # Simple validation/meta checks (mocked)
+    meta = {
+        'tone': 'informal',
+        'brand_score': 0.92,
+        'bias_flag': False,
+        'generated_by': 'mock-genai',
+        'prompt_used': prompt,
+    }
+
+    event.generated_content = generated
+    event.generation_meta = meta
+    event.generation_status = 'ready'
+    event.last_generated_at = timezone.now()
+    event.generation_timeout_at = None
+    event.save()
+    return generated, meta
+
+
+def _generate_failed(job, exc):
+    """All attempts failed: fall back to the local mock, as the sync path did."""
+    Event, _, _ = _models()
+    event = Event.objects.filter(pk=job.payload.get('event_id')).first()
+    if event is None:
+        return
+    mock_generate(event, job.payload.get('prompt', ''))
+
+
+@job_handler('event.generate', on_failure=_generate_failed)
+def generate_event_content(job):
+    """
+    Trigger every active ``event.generate`` workflow for the event.  n8n
+    answers asynchronously through generation_callback, so the event stays
+    'pending' here; the job succeeds once at least one workflow accepted it.
+    """
+    from .n8n_client import fan_out
+
+    Event, N8NWorkflow, _ = _models()
+    event = Event.objects.filter(pk=job.payload.get('event_id')).first()
+    if event is None:
+        return {'detail': 'Event no longer exists'}
+
+    workflows = list(N8NWorkflow.objects.filter(is_active=True, trigger_event='event.generate'))
+    if not workflows:
+        generated, meta = mock_generate(event, job.payload.get('prompt', ''))
+        return {'generation_status': 'ready', 'generated_by': meta['generated_by']}
+
+    triggered_by_id = job.payload.get('triggered_by')
+    payload = build_generate_payload(event, job.payload.get('prompt', ''), triggered_by_id)
+
+    # All matching workflows (GCal sync, content generation, …) are called
+    # concurrently; each gets its own N8NExecutionLog row.
+    results = fan_out(workflows, event.id, payload, triggered_by=_user(triggered_by_id))
+
+    triggered, errors, unavailable = [], [], 0
+    for result in results:
+        if result.error is not None:
+            errors.append(result.error)
+            if not result.called:
+                unavailable += 1
+        elif 200 <= result.status_code < 300:
+            triggered.append(result.workflow.id)
+        else:
+            errors.append(f'{result.workflow.name}: HTTP {result.status_code}')
+
+    if not triggered and unavailable == len(workflows):
+        # Every circuit is open — don't burn retries on a dead n8n
+        generated, meta = mock_generate(event, job.payload.get('prompt', ''))
+        return {'generation_status': 'ready', 'generated_by': meta['generated_by'], 'errors': errors}
+    if not triggered:
+        raise RuntimeError('No generation workflow accepted the request: ' + '; '.join(errors))
+
+    event.last_generated_at = timezone.now()
+    event.save(update_fields=['last_generated_at'])
+    return {'generation_status': 'pending', 'workflows': triggered, 'errors': errors}
+
+
+# ── Batch generation ─────────────────────────────────────────────────────────
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _save_progress(job, progress):
+    """Write per-event progress onto the job row while it is still running."""
+    type(job).objects.filter(pk=job.pk).update(result=progress, updated_at=timezone.now())
+
+
+def _generate_batch_failed(job, exc):
+    """All attempts failed: mock the events no workflow accepted."""
+    Event, _, _ = _models()
+    progress = job.result or {'events': {}}
+    sent = {int(eid) for eid, state in progress['events'].items() if state.get('dispatch') == 'sent'}
+    prompt = job.payload.get('prompt')
+    pending = Event.objects.filter(
+        pk__in=[eid for eid in job.payload.get('event_ids', []) if eid not in sent],
+        generation_status='pending',
+    )
+    for event in pending:
+        mock_generate(event, prompt or default_prompt(event))
+        progress['events'][str(event.id)] = {'dispatch': 'mock', 'errors': [str(exc)]}
+    _save_progress(job, progress)
+
+
+@job_handler('event.generate_batch', on_failure=_generate_batch_failed)
+def generate_event_content_batch(job):
+    """
+    ``generate_batch``: trigger the active ``event.generate`` workflows for
+    many events in one job.
+
+    Workflows with ``configuration.batch: true`` get one POST per
+    N8N_GENERATION_BATCH_SIZE events, payload ``{batch, events: [...]}``
+    (each item as ``build_generate_payload``); the others get one POST per
+    event.  At most N8N_GENERATION_BATCH_CONCURRENCY requests are in flight.
+
+    Per-event progress is kept in ``job.result['events']`` and updated as
+    requests complete.  A retry only resends the events no workflow
+    accepted; after the last attempt those fall back to the mock generator.
+    """
+    from .n8n_client import timed_post
+
+    Event, N8NWorkflow, N8NExecutionLog = _models()
+    progress = job.result = job.result or {'events': {}}
+    states = progress['events']
+    todo = [
+        eid for eid in job.payload.get('event_ids', [])
+        if states.get(str(eid), {}).get('dispatch') != 'sent'
+    ]
+    events = list(Event.objects.filter(pk__in=todo).order_by('id'))
+    prompt = job.payload.get('prompt')
+    triggered_by_id = job.payload.get('triggered_by')
+    for eid in set(todo) - {event.id for event in events}:
+        states[str(eid)] = {'dispatch': 'skipped', 'errors': ['Event no longer exists']}
+
+    workflows = list(N8NWorkflow.objects.filter(is_active=True, trigger_event='event.generate'))
+    allowed = [wf for wf in workflows if circuit.allow_request(wf)]
+    if not allowed:
+        # No workflows, or every circuit is open — don't burn retries on a dead n8n
+        for event in events:
+            mock_generate(event, prompt or default_prompt(event))
+            states[str(event.id)] = {'dispatch': 'mock', 'errors': []}
+        progress['mocked'] = len(events)
+        return progress
+
+    payloads = {
+        event.id: build_generate_payload(event, prompt or default_prompt(event), triggered_by_id)
+        for event in events
+    }
+    batch_size = getattr(settings, 'N8N_GENERATION_BATCH_SIZE', 25)
+    units = []  # (workflow, event ids, object id, payload)
+    for wf in allowed:
+        if (wf.configuration or {}).get('batch'):
+            for chunk in _chunks(events, batch_size):
+                ids = [event.id for event in chunk]
+                units.append((wf, ids, f'batch-{job.pk}', {
+                    'batch': True,
+                    'events': [payloads[eid] for eid in ids],
+                    'triggered_by': triggered_by_id,
+                }))
+        else:
+            units.extend((wf, [event.id], event.id, payloads[event.id]) for event in events)
+
+    for event in events:
+        states[str(event.id)] = {'dispatch': 'queued', 'workflows': [], 'errors': []}
+    _save_progress(job, progress)
+
+    triggered_by = _user(triggered_by_id)
+    concurrency = getattr(settings, 'N8N_GENERATION_BATCH_CONCURRENCY', 4)
+    logs, flushed = [], time.monotonic()
+    # Threads only do the HTTP calls; logs, breaker bookkeeping and progress
+    # are handled here as each request completes.
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(units))) as pool:
+        futures = {
+            pool.submit(timed_post, wf, object_id, payload): (wf, ids, payload)
+            for wf, ids, object_id, payload in units
+        }
+        for future in as_completed(futures):
+            wf, ids, payload = futures[future]
+            started, ended, status_code, data, error = future.result()
+            ok = error is None and 200 <= status_code < 300
+            if error is None and status_code < 500:
+                circuit.record_success(wf, when=ended)
+            else:
+                logger.warning('n8n workflow %s failed: %s', wf, error or f'HTTP {status_code}')
+                circuit.record_failure(wf)
+
+            log = N8NExecutionLog(
+                workflow=wf, triggered_by=triggered_by, start_time=started, end_time=ended,
+                input_data=payload, status='completed' if ok else 'failed',
+            )
+            if error is None:
+                log.output_data = {'status_code': status_code, 'response': data}
+            else:
+                log.error_details = {'error': error}
+            logs.append(log)
+
+            for eid in ids:
+                state = states[str(eid)]
+                if ok:
+                    state['dispatch'] = 'sent'
+                    state['workflows'].append(wf.id)
+                else:
+                    state['errors'].append(error or f'{wf.name}: HTTP {status_code}')
+            if time.monotonic() - flushed >= 1:
+                _save_progress(job, progress)
+                flushed = time.monotonic()
+
+    N8NExecutionLog.objects.bulk_create(logs)
+
+    sent = [event.id for event in events if states[str(event.id)]['dispatch'] == 'sent']
+    if sent:
+        Event.objects.filter(pk__in=sent).update(last_generated_at=timezone.now())
+        for eid in sent:
+            generation_stream.publish(eid)
+    failed = [event.id for event in events if states[str(event.id)]['dispatch'] != 'sent']
+    for eid in failed:
+        states[str(eid)]['dispatch'] = 'failed'
+    _save_progress(job, progress)
+    if failed:
+        raise RuntimeError(f'No generation workflow accepted {len(failed)} of {len(events)} events')
+    return progress
+
+
+# ── Refinement ───────────────────────────────────────────────────────────────
+
+def audience_context_for(event):
+    # Read from the cached audience stats (core/audience.py) — no joins per chat turn
+    stats = audience.audience_stats(event)
+    return {
+        'visibility': event.visibility,
+        'target_all_students': event.target_all_students,
+        'target_student_count': stats['target_student_count'],
+        'target_offering_ids': stats['target_offering_ids'],
+        'target_intake_ids': stats['target_intake_ids'],
+    }
+
+
+def mock_refine(current_content, refinement_prompt):
+    """Prefix every content field with the refinement note; returns (content, meta)."""
+    prefix = f'[Refinement note: {refinement_prompt}]\n'
+    content = {
+        key: prefix + (value if isinstance(value, str) else str(value))
+        for key, value in current_content.items()
+    }
+    meta = {
+        'generated_by': 'mock-refine',
+        'refinement_prompt': refinement_prompt,
+    }
+    return content, meta
+
+
+def _refine_failed(job, exc):
+    """Give the event back its pre-refinement status so it can be refined again."""
+    Event, _, _ = _models()
+    restored = Event.objects.filter(pk=job.payload.get('event_id'), generation_status='pending').update(
+        generation_status=job.payload.get('previous_status') or 'failed',
+        generation_timeout_at=None,
+        updated_at=timezone.now(),
+    )
+    if restored:
+        # .update() skips post_save — tell stream subscribers directly
+        generation_stream.publish(job.payload.get('event_id'))
+
+
+@job_handler('event.refine', on_failure=_refine_failed)
+def refine_event_content(job):
+    """
+    Send the current content + staff feedback to the WF-4 refiner and store
+    the refined content.  The n8n webhook answers with "Respond to Webhook",
+    so the response body already carries generated_content / generation_meta.
+    """
+    from .n8n_client import trigger_workflow
+
+    Event, N8NWorkflow, _ = _models()
+    event = Event.objects.filter(pk=job.payload.get('event_id')).first()
+    if event is None:
+        return {'detail': 'Event no longer exists'}
+
+    refinement_prompt = job.payload.get('refinement_prompt', '')
+    current_content = job.payload.get('current_content') or event.generated_content or {}
+    triggered_by_id = job.payload.get('triggered_by')
+
+    wf = N8NWorkflow.objects.filter(trigger_event='event.refine', is_active=True).first()
+    n8n_data = None
+    if wf is not None:
+        payload = {
+            'event_id': str(event.id),
+            'current_content': current_content,
+            'refinement_prompt': refinement_prompt,
+            'audience_context': audience_context_for(event),
+            'chat_history': job.payload.get('chat_history', []),
+            'triggered_by': triggered_by_id,
+        }
+        log = _start_log(wf, triggered_by_id, payload)
+        try:
+            # Groq can take up to ~15s; give plenty of room
+            status_code, n8n_data = trigger_workflow(wf, event.id, payload, timeout=60)
+            if not 200 <= int(status_code) < 300:
+                raise RuntimeError(f'Refinement workflow returned HTTP {status_code}')
+        except circuit.CircuitOpenError as exc:
+            # n8n is known to be down — fall back to the mock refiner below
+            _finish_log(log, 'failed', error=str(exc))
+            n8n_data = None
+        except Exception as exc:
+            _finish_log(log, 'failed', error=str(exc))
+            raise
+        else:
+            _finish_log(log, 'completed', output={'status_code': status_code, 'response': n8n_data})
+
+    if n8n_data is None:
+        generated_content, generation_meta = mock_refine(current_content, refinement_prompt)
+    else:
+        if not isinstance(n8n_data, dict):
+            n8n_data = {'generated_content': n8n_data} if n8n_data else {}
+        # n8n Respond to Webhook node should return:
+        # { generated_content: {...}, generation_meta: {...} }
+        generated_content = n8n_data.get('generated_content') or n8n_data
+        generation_meta = n8n_data.get('generation_meta', {
+            'generated_by': 'n8n-groq-refine',
+            'refinement_prompt': refinement_prompt,
+        })
+        # Normalise if n8n returned a string
+        if isinstance(generated_content, str):
+            try:
+                generated_content = json.loads(generated_content)
+            except ValueError:
+                generated_content = {'social_post': generated_content}
+
+    event.generated_content = generated_content
+    event.generation_meta = generation_meta
+    event.generation_status = 'ready'
+    event.last_generated_at = timezone.now()
+    event.generation_timeout_at = None
+    event.save(update_fields=[
+        'generated_content', 'generation_meta', 'generation_status',
+        'last_generated_at', 'generation_timeout_at', 'updated_at',
+    ])
+    return {
+        'generated_content': generated_content,
+        'generation_meta': generation_meta,
+        'generation_status': 'ready',
+    }
@@ -0,0 +1,145 @@
+"""
+core/generation_cache.py — Content-hash cache for n8n event generation.
+
+Re-importing the same CSV produces events whose generation inputs are
+byte-identical to ones n8n has already written content for.  The cache key
+is a SHA-256 over the canonical JSON of those inputs:
+
+    title, description, location, start, end (RFC 3339), prompt,
+    sorted ids of the active event.generate workflows
+
+so a changed workflow set (or any edited field) is a miss.
+
+  * ``generate_content`` looks the key up first; a hit fills the event's
+    generated_content / generation_meta directly — no job, no outbound call.
+  * On a miss the key is remembered on ``Event.generation_cache_key`` and
+    ``generation_callback`` stores n8n's content under it (mock output is
+    never cached).
+  * ``generate_batch`` does the same for many events, with one lookup
+    query (``lookup_many``).
+
+Entries live for GENERATION_CACHE_TTL seconds; when more than
+GENERATION_CACHE_MAX_ENTRIES exist the least recently used are evicted.
+"""
+import hashlib
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+def _model():
+    return apps.get_model('core', 'GenerationCacheEntry')
+
+
+def _enabled():
+    return getattr(settings, 'GENERATION_CACHE_ENABLED', True)
+
+
+def cache_key(event, prompt, workflow_ids):
+    """Canonical hash of the generation inputs for ``event``."""
+    from .generation import _to_rfc3339
+
+    start = _to_rfc3339(event.start)
+    material = {
+        'title': event.title or '',
+        'description': event.description or '',
+        'location': event.location or '',
+        'start': start,
+        'end': _to_rfc3339(event.end) if event.end else start,
+        'prompt': prompt or '',
+        'workflows': sorted(workflow_ids),
+    }
+    canonical = json.dumps(material, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def lookup(key):
+    """Return the live entry for ``key`` (recording the hit) or None."""
+    if not _enabled() or not key:
+        return None
+    GenerationCacheEntry = _model()
+    now = timezone.now()
+    entry = GenerationCacheEntry.objects.filter(key=key, expires_at__gt=now).first()
+    if entry is None:
+        return None
+    GenerationCacheEntry.objects.filter(pk=entry.pk).update(
+        hit_count=F('hit_count') + 1, last_used_at=now,
+    )
+    return entry
+
+
+def lookup_many(keys):
+    """``lookup`` for many keys at once: {key: entry} for the live ones."""
+    keys = {key for key in keys if key}
+    if not _enabled() or not keys:
+        return {}
+    GenerationCacheEntry = _model()
+    now = timezone.now()
+    entries = {
+        entry.key: entry
+        for entry in GenerationCacheEntry.objects.filter(key__in=keys, expires_at__gt=now)
+    }
+    if entries:
+        GenerationCacheEntry.objects.filter(pk__in=[e.pk for e in entries.values()]).update(
+            hit_count=F('hit_count') + 1, last_used_at=now,
+        )
+    return entries
+
+
+def apply(event, entry):
+    """Fill ``event`` from a cache entry, as a completed generation would."""
+    meta = dict(entry.generation_meta or {})
+    meta['cache_hit'] = True
+    event.generated_content = entry.generated_content
+    event.generation_meta = meta
+    event.generation_status = 'ready'
+    event.last_generated_at = timezone.now()
+    event.generation_timeout_at = None
+    event.generation_cache_key = ''
+    event.save(update_fields=[
+        'generated_content', 'generation_meta', 'generation_status',
+        'last_generated_at', 'generation_timeout_at', 'generation_cache_key', 'updated_at',
+    ])
+    return event
+
+
+def store(key, generated_content, generation_meta=None):
+    """Insert or refresh the entry for ``key`` and evict beyond the size cap."""
+    if not _enabled() or not key or not generated_content:
+        return None
+    GenerationCacheEntry = _model()
+    now = timezone.now()
+    values = {
+        'generated_content': generated_content,
+        'generation_meta': generation_meta or {},
+        'last_used_at': now,
+        'expires_at': now + timezone.timedelta(seconds=getattr(settings, 'GENERATION_CACHE_TTL', 7 * 24 * 3600)),
+    }
+    try:
+        with transaction.atomic():
+            entry, _ = GenerationCacheEntry.objects.update_or_create(key=key, defaults=values)
+    except IntegrityError:
+        # Concurrent callback for the same key inserted first — theirs is as good
+        return GenerationCacheEntry.objects.filter(key=key).first()
+    evict()
+    return entry
+
+
+def evict(max_entries=None):
+    """Delete expired entries and the least recently used beyond ``max_entries``."""
+    GenerationCacheEntry = _model()
+    max_entries = max_entries or getattr(settings, 'GENERATION_CACHE_MAX_ENTRIES', 5000)
+    deleted, _ = GenerationCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+    overflow = GenerationCacheEntry.objects.count() - max_entries
+    if overflow > 0:
+        lru_ids = list(
+            GenerationCacheEntry.objects.order_by('last_used_at', 'id')
+            .values_list('id', flat=True)[:overflow]
+        )
+        evicted, _ = GenerationCacheEntry.objects.filter(id__in=lru_ids).delete()
+        deleted += evicted
+    return deleted
@@ -0,0 +1,297 @@
+"""
+core/generation_stream.py — Push event generation-status changes to staff clients.
+
+``GET /api/core/events/{id}/generation-stream/`` is an async view that
+answers with ``text/event-stream``: the current status immediately, then a
+``status`` message every time the event's generation state changes
+(generation_callback, gcal_sync, refine jobs, mock generation, …).
+
+It is served by the ASGI app (config/asgi.py, the ``stream`` service) so a
+waiting client costs a coroutine, not a gunicorn sync worker.
+
+``GET /api/core/events/generation-stream/?ids=1,2,3`` does the same for
+several events over one connection (messages carry the event ``id``) — the
+staff event list watches all of its pending rows with a single stream.
+
+Delivery:
+  * writers call ``publish(event_id)`` — the Event post_save signal does so
+    whenever a generation field is saved.  After commit this sends
+    ``NOTIFY event_generation`` on PostgreSQL and wakes local subscribers;
+  * each ASGI process runs one ``GenerationHub`` that LISTENs on a single
+    dedicated connection and fans notifications out to its subscribers.
+    On other databases the hub polls all watched events with one query
+    every GENERATION_STREAM_POLL_INTERVAL seconds instead.
+
+Streams end after GENERATION_STREAM_MAX_SECONDS; EventSource (or the
+frontend's fetch reader) reconnects and gets the current state again.
+Served by WSGI instead (``runserver``), where a streaming response would be
+buffered until it ends, the view answers with the current state at once and
+the client reconnects every GENERATION_STREAM_POLL_INTERVAL seconds.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'event_generation'
+
+# Event fields whose change is pushed to subscribers
+GENERATION_FIELDS = frozenset({
+    'generation_status', 'generated_content', 'generation_meta',
+    'last_generated_at', 'gcal_event_id', 'generation_timeout_at',
+})
+
+
+# ── Publishing (sync side) ───────────────────────────────────────────────────
+
+def _send(event_id):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, str(event_id)])
+    hub = _hub
+    if hub is not None:
+        hub.dispatch_threadsafe(event_id)
+
+
+def publish(event_id):
+    """Tell stream subscribers ``event_id`` changed (once the transaction commits)."""
+    transaction.on_commit(lambda: _send(event_id))
+
+
+# ── Hub (one per ASGI event loop) ────────────────────────────────────────────
+
+class GenerationHub:
+    def __init__(self, loop):
+        self.loop = loop
+        self._subscribers = defaultdict(set)
+        self._task = None
+
+    def subscribe(self, event_id, queue):
+        """Put ``event_id`` on ``queue`` whenever it changes (a stream shares one queue)."""
+        self._subscribers[event_id].add(queue)
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, event_id, queue):
+        queues = self._subscribers.get(event_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[event_id]
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()  # nothing to listen for; restarted on next subscribe
+            self._task = None
+
+    def dispatch(self, event_id):
+        for queue in self._subscribers.get(event_id, ()):
+            queue.put_nowait(event_id)  # the stream collapses repeats when it wakes
+
+    def dispatch_threadsafe(self, event_id):
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.dispatch, int(event_id))
+
+    async def _run(self):
+        if connections['default'].vendor == 'postgresql':
+            await self._listen()
+        else:
+            await self._poll()
+
+    async def _listen(self):
+        """LISTEN on one dedicated connection; reconnect on failure."""
+        db = connections['default']
+        while self._subscribers:
+            conn = None
+            try:
+                conn = await sync_to_async(db.get_new_connection, thread_sensitive=False)(
+                    db.get_connection_params(),
+                )
+                conn.autocommit = True
+                conn.cursor().execute(f'LISTEN {CHANNEL}')
+                woke = asyncio.Event()
+                self.loop.add_reader(conn.fileno(), woke.set)
+                try:
+                    while self._subscribers:
+                        try:
+                            await asyncio.wait_for(woke.wait(), timeout=30)
+                        except asyncio.TimeoutError:
+                            pass
+                        woke.clear()
+                        conn.poll()
+                        while conn.notifies:
+                            note = conn.notifies.pop(0)
+                            try:
+                                self.dispatch(int(note.payload))
+                            except ValueError:
+                                continue
+                finally:
+                    self.loop.remove_reader(conn.fileno())
+            except Exception:
+                logger.exception('Generation stream LISTEN failed; retrying')
+                await asyncio.sleep(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    async def _poll(self):
+        """Fallback for databases without LISTEN: one query for all watched events."""
+        Event = apps.get_model('core', 'Event')
+        interval = getattr(settings, 'GENERATION_STREAM_POLL_INTERVAL', 2)
+        since = timezone.now()
+        while self._subscribers:
+            await asyncio.sleep(interval)
+            watched = list(self._subscribers)
+            now = timezone.now()
+            changed = await sync_to_async(lambda: list(
+                Event.objects.filter(pk__in=watched, updated_at__gte=since).values_list('pk', flat=True)
+            ))()
+            since = now
+            for event_id in changed:
+                self.dispatch(event_id)
+
+
+_hub = None
+
+
+def get_hub():
+    global _hub
+    loop = asyncio.get_running_loop()
+    if _hub is None or _hub.loop is not loop:
+        _hub = GenerationHub(loop)
+    return _hub
+
+
+# ── View ─────────────────────────────────────────────────────────────────────
+
+_SNAPSHOT_FIELDS = (
+    'id', 'generation_status', 'generated_content', 'generation_meta',
+    'gcal_event_id', 'last_generated_at', 'generation_timeout_at', 'updated_at',
+)
+
+
+def _snapshots(event_ids):
+    """{event id: current generation state} for the events that still exist."""
+    Event = apps.get_model('core', 'Event')
+    rows = Event.objects.filter(pk__in=event_ids).values(*_SNAPSHOT_FIELDS)
+    return {row['id']: json.loads(json.dumps(row, default=str)) for row in rows}
+
+
+def _authenticate(request):
+    """Run DRF's configured authenticators (JWT / session) on a plain request."""
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    drf_request = Request(request, authenticators=[cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return drf_request.user
+    except Exception:
+        return None
+
+
+def _sse(data, event='status'):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode('utf-8')
+
+
+async def _stream(states):
+    """One stream for every event in ``states`` ({id: state}); messages carry the event id."""
+    hub = get_hub()
+    queue = asyncio.Queue()
+    for event_id in states:
+        hub.subscribe(event_id, queue)
+    heartbeat = getattr(settings, 'GENERATION_STREAM_HEARTBEAT', 15)
+    deadline = hub.loop.time() + getattr(settings, 'GENERATION_STREAM_MAX_SECONDS', 300)
+    try:
+        yield b'retry: 3000\n' + b''.join(_sse(state) for state in states.values())
+        while states:
+            remaining = deadline - hub.loop.time()
+            if remaining <= 0:
+                return
+            try:
+                changed = {await asyncio.wait_for(queue.get(), timeout=min(heartbeat, remaining))}
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            while not queue.empty():
+                changed.add(queue.get_nowait())
+            current = await sync_to_async(_snapshots)(changed)
+            for event_id in sorted(changed):
+                if event_id not in current:
+                    hub.unsubscribe(event_id, queue)
+                    del states[event_id]
+                    yield _sse({'id': event_id}, event='deleted')
+                elif current[event_id] != states[event_id]:
+                    states[event_id] = current[event_id]
+                    yield _sse(current[event_id])
+    finally:
+        for event_id in states:
+            hub.unsubscribe(event_id, queue)
+
+
+def _poll_response(states):
+    """
+    Not served by the ASGI app (e.g. ``runserver`` in development): a
+    streaming response would be buffered until the stream ends, so answer
+    with the current state only and let the client reconnect — i.e. poll —
+    every GENERATION_STREAM_POLL_INTERVAL seconds.
+    """
+    retry = int(getattr(settings, 'GENERATION_STREAM_POLL_INTERVAL', 2) * 1000)
+    body = f'retry: {retry}\n'.encode('utf-8') + b''.join(_sse(state) for state in states.values())
+    response = HttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+async def _respond(request, event_ids):
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not user.is_staff:
+        return JsonResponse({'detail': 'Staff only.'}, status=403)
+
+    states = await sync_to_async(_snapshots)(event_ids)
+    if not states:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    if not isinstance(request, ASGIRequest):
+        return _poll_response(states)
+
+    response = StreamingHttpResponse(_stream(states), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: don't buffer the stream
+    return response
+
+
+# Django refuses async views under ATOMIC_REQUESTS (prod.py); these views
+# only read, and hold no transaction open while they wait.
+@transaction.non_atomic_requests
+async def generation_stream(request, pk):
+    """Staff-only SSE stream of one event's generation state."""
+    return await _respond(request, [pk])
+
+
+@transaction.non_atomic_requests
+async def generation_streams(request):
+    """
+    Staff-only SSE stream for several events, ``?ids=1,2,3`` (at most
+    GENERATION_STREAM_MAX_EVENTS), so a page watches all of its pending
+    events over one connection.
+    """
+    try:
+        event_ids = sorted({int(pk) for pk in request.GET.get('ids', '').split(',') if pk.strip()})
+    except ValueError:
+        return JsonResponse({'detail': 'ids must be a comma-separated list of event ids.'}, status=400)
+    if not event_ids:
+        return JsonResponse({'detail': 'ids is required.'}, status=400)
+    limit = getattr(settings, 'GENERATION_STREAM_MAX_EVENTS', 100)
+    if len(event_ids) > limit:
+        return JsonResponse({'detail': f'At most {limit} events per stream.'}, status=400)
+    return await _respond(request, event_ids)
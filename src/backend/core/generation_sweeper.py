@@ -0,0 +1,108 @@
+"""
+core/generation_sweeper.py — Act on events whose generation timed out.
+
+Every path that sets ``generation_status='pending'`` also sets
+``generation_timeout_at``.  When n8n drops the callback (or a refine job is
+lost) the event would stay pending forever; ``sweep()`` picks up everything
+past its deadline:
+
+  * events still waiting for an n8n generation callback (they carry a
+    ``generation_cache_key``) that have been retried fewer than
+    GENERATION_TIMEOUT_RETRIES times are sent again with their original
+    prompt and requester — one ``event.generate_batch`` job per prompt in
+    the swept batch — with a fresh deadline;
+  * everything else is marked ``generation_status='failed'``.
+
+Expired rows are found through the partial index ``core_event_gen_due_idx``
+on (generation_timeout_at) WHERE generation_status='pending', so a sweep
+reads only due rows however large the events table grows.  Rows are claimed
+with ``SELECT … FOR UPDATE SKIP LOCKED`` in batches of
+GENERATION_SWEEP_BATCH_SIZE and changed with one UPDATE per outcome, so
+several sweepers never act on the same event.
+
+The ``run_jobs`` worker sweeps every GENERATION_SWEEP_INTERVAL seconds;
+``python manage.py sweep_generation_timeouts`` runs it on demand.
+"""
+import logging
+from collections import defaultdict, namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import generation_stream, jobs
+
+logger = logging.getLogger(__name__)
+
+SweepResult = namedtuple('SweepResult', 'expired retried failed')
+
+
+def _claim_due(now, batch_size):
+    Event = apps.get_model('core', 'Event')
+    return list(
+        Event.objects
+        .select_for_update(skip_locked=True)
+        .filter(generation_status='pending', generation_timeout_at__lte=now)
+        .order_by('generation_timeout_at')
+        .values_list('id', 'generation_cache_key', 'generation_retries',
+                     'generation_prompt', 'generation_requested_by_id')[:batch_size]
+    )
+
+
+def sweep(now=None, batch_size=None):
+    """Retry or fail every pending generation past its deadline; returns a SweepResult."""
+    Event = apps.get_model('core', 'Event')
+    now = now or timezone.now()
+    batch_size = batch_size or getattr(settings, 'GENERATION_SWEEP_BATCH_SIZE', 500)
+    max_retries = getattr(settings, 'GENERATION_TIMEOUT_RETRIES', 1)
+    timeout = timezone.timedelta(seconds=getattr(settings, 'N8N_GENERATION_TIMEOUT', 900))
+    expired = retried = failed = 0
+
+    while True:
+        with transaction.atomic():
+            rows = _claim_due(now, batch_size)
+            if not rows:
+                break
+            # Retries resend the original prompt on behalf of the original
+            # requester: one job per (prompt, requester) among the batch
+            retry_groups = defaultdict(list)
+            for pk, key, retries, prompt, requested_by in rows:
+                if key and retries < max_retries:
+                    retry_groups[prompt, requested_by].append(pk)
+            retry_ids = [pk for ids in retry_groups.values() for pk in ids]
+            retry_set = set(retry_ids)
+            fail_ids = [row[0] for row in rows if row[0] not in retry_set]
+
+            if retry_ids:
+                Event.objects.filter(pk__in=retry_ids).update(
+                    generation_retries=F('generation_retries') + 1,
+                    generation_timeout_at=now + timeout,
+                    updated_at=now,
+                )
+                for (prompt, requested_by), ids in retry_groups.items():
+                    jobs.enqueue('event.generate_batch', {
+                        'event_ids': ids, 'prompt': prompt, 'triggered_by': requested_by, 'retry': True,
+                    })
+            if fail_ids:
+                Event.objects.filter(pk__in=fail_ids).update(
+                    generation_status='failed',
+                    generation_timeout_at=None,
+                    generation_cache_key='',
+                    updated_at=now,
+                )
+            # .update() skips post_save — tell stream subscribers directly
+            for row in rows:
+                generation_stream.publish(row[0])
+
+        expired += len(rows)
+        retried += len(retry_ids)
+        failed += len(fail_ids)
+        if len(rows) < batch_size:
+            break
+
+    result = SweepResult(expired, retried, failed)
+    if expired:
+        logger.info('Generation timeout sweep: %s expired, %s retried, %s failed', *result)
+    return result
@@ -0,0 +1,95 @@
+"""
+core/http.py — Shared outbound HTTP client for n8n and Gemini.
+
+All webhook / AI calls go through one process-wide ``requests.Session`` so
+connections are pooled per host and kept alive between calls instead of
+paying a fresh TCP + TLS handshake every time (most noticeable in the
+interactive refine loop).
+
+Retries are delegated to urllib3:
+  * connection failures (the request never reached the server) are retried
+    for every method, POST included;
+  * 502/503/504 responses and read errors are only retried for idempotent
+    methods — a POST that reached n8n is never replayed automatically.
+
+Timeouts are ``(connect, read)`` tuples.  A workflow can override the read
+timeout with ``configuration.timeout`` (seconds), see ``workflow_timeout``.
+"""
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=getattr(settings, 'OUTBOUND_HTTP_RETRIES', 3),
+        connect=getattr(settings, 'OUTBOUND_HTTP_RETRIES', 3),
+        read=getattr(settings, 'OUTBOUND_HTTP_RETRIES', 3),
+        status=getattr(settings, 'OUTBOUND_HTTP_RETRIES', 3),
+        backoff_factor=getattr(settings, 'OUTBOUND_HTTP_BACKOFF', 0.3),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,  # idempotent only
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=getattr(settings, 'OUTBOUND_HTTP_POOL_HOSTS', 10),
+        pool_maxsize=getattr(settings, 'OUTBOUND_HTTP_POOL_SIZE', 20),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reset_session():
+    """Drop the pooled session, e.g. after settings change in tests."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def _timeout(read_timeout):
+    if read_timeout is None:
+        read_timeout = getattr(settings, 'OUTBOUND_HTTP_TIMEOUT', 30)
+    if isinstance(read_timeout, tuple):
+        return read_timeout
+    return (getattr(settings, 'OUTBOUND_HTTP_CONNECT_TIMEOUT', 5), read_timeout)
+
+
+def post(url, timeout=None, **kwargs):
+    """``requests.post`` over the shared session; ``timeout`` is the read timeout."""
+    return get_session().post(url, timeout=_timeout(timeout), **kwargs)
+
+
+def get(url, timeout=None, **kwargs):
+    """``requests.get`` over the shared session; ``timeout`` is the read timeout."""
+    return get_session().get(url, timeout=_timeout(timeout), **kwargs)
+
+
+def workflow_timeout(workflow, default=None):
+    """Read timeout for an N8NWorkflow: ``configuration.timeout`` wins over ``default``."""
+    config = getattr(workflow, 'configuration', None) or {}
+    try:
+        value = float(config.get('timeout'))
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
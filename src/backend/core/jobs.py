@@ -0,0 +1,176 @@
+"""
+core/jobs.py — Database-backed background job queue.
+
+Slow work (n8n / Groq calls) is taken out of the request cycle: the view
+enqueues a BackgroundJob row and returns its id straight away, and one or
+more ``python manage.py run_jobs`` worker processes claim and execute jobs.
+
+Claiming uses ``SELECT … FOR UPDATE SKIP LOCKED`` so any number of workers
+can poll the same table without handing the same job out twice.  Failed
+jobs are retried with exponential backoff up to ``max_attempts``; after the
+last attempt the handler's ``on_failure`` hook runs so it can leave the
+domain object in a sane state.
+
+Register a handler:
+
+    @job_handler('event.refine', on_failure=_refine_failed)
+    def refine_event(job):
+        ...
+        return {'generation_status': 'ready'}   # stored on job.result
+
+Enqueue from a view:
+
+    job = jobs.enqueue('event.refine', {'event_id': event.id}, created_by=request.user)
+"""
+import logging
+import os
+import socket
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# kind → (handler, on_failure)
+_HANDLERS = {}
+
+
+def job_handler(kind, on_failure=None):
+    """Register ``func(job)`` as the handler for jobs of ``kind``."""
+    def decorator(func):
+        _HANDLERS[kind] = (func, on_failure)
+        return func
+    return decorator
+
+
+def _job_model():
+    return apps.get_model('core', 'BackgroundJob')
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(kind, payload=None, created_by=None, max_attempts=None, run_after=None):
+    """Create a queued job and return it.  ``kind`` must have a handler."""
+    if kind not in _HANDLERS:
+        raise ValueError(f'No job handler registered for {kind!r}')
+    BackgroundJob = _job_model()
+    fields = {
+        'kind': kind,
+        'payload': payload or {},
+        'created_by': created_by if getattr(created_by, 'is_authenticated', False) else None,
+    }
+    if max_attempts is not None:
+        fields['max_attempts'] = max_attempts
+    if run_after is not None:
+        fields['run_after'] = run_after
+    return BackgroundJob.objects.create(**fields)
+
+
+def claim_jobs(limit, worker_id=None):
+    """
+    Atomically move up to ``limit`` runnable jobs from queued → running and
+    return them.  Rows locked by another worker are skipped, not waited on.
+    """
+    BackgroundJob = _job_model()
+    worker_id = worker_id or default_worker_id()
+    now = timezone.now()
+
+    with transaction.atomic():
+        ids = list(
+            BackgroundJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='queued', run_after__lte=now)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        BackgroundJob.objects.filter(id__in=ids).update(
+            status='running',
+            locked_at=now,
+            locked_by=worker_id,
+            attempts=F('attempts') + 1,
+        )
+    return list(BackgroundJob.objects.filter(id__in=ids).order_by('run_after', 'id'))
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'JOB_QUEUE_RETRY_BACKOFF', 30)
+    return timezone.timedelta(seconds=base * (2 ** max(attempts - 1, 0)))
+
+
+def run_job(job):
+    """Execute one claimed job and record the outcome on its row."""
+    handler, on_failure = _HANDLERS.get(job.kind, (None, None))
+    if handler is None:
+        job.status = 'failed'
+        job.last_error = f'No job handler registered for {job.kind!r}'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'last_error', 'finished_at', 'updated_at'])
+        return job
+
+    try:
+        result = handler(job)
+    except Exception as exc:
+        logger.exception('Job %s (%s) attempt %s failed', job.pk, job.kind, job.attempts)
+        job.last_error = str(exc)
+        if job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_after = timezone.now() + _retry_delay(job.attempts)
+            job.locked_at = None
+            job.locked_by = ''
+            job.save(update_fields=['status', 'run_after', 'locked_at', 'locked_by',
+                                    'last_error', 'updated_at'])
+            return job
+
+        job.status = 'failed'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'last_error', 'finished_at', 'updated_at'])
+        if on_failure:
+            try:
+                on_failure(job, exc)
+            except Exception:
+                logger.exception('on_failure hook for job %s (%s) raised', job.pk, job.kind)
+        return job
+
+    job.status = 'succeeded'
+    job.result = result
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'finished_at', 'updated_at'])
+    return job
+
+
+def run_pending(limit=None, worker_id=None):
+    """Claim and run one batch of jobs.  Returns the number of jobs run."""
+    limit = limit or getattr(settings, 'JOB_QUEUE_BATCH_SIZE', 5)
+    jobs = claim_jobs(limit, worker_id=worker_id)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def requeue_stale(stale_after=None):
+    """
+    Recover jobs whose worker died mid-run: anything 'running' for longer
+    than ``stale_after`` seconds is queued again, or failed if it has used
+    all its attempts.  Returns (requeued, failed).
+    """
+    BackgroundJob = _job_model()
+    stale_after = stale_after or getattr(settings, 'JOB_QUEUE_STALE_AFTER', 600)
+    now = timezone.now()
+    stale = BackgroundJob.objects.filter(
+        status='running', locked_at__lt=now - timezone.timedelta(seconds=stale_after),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=now, last_error='Worker lost while running job',
+        updated_at=now,
+    )
+    requeued = stale.update(
+        status='queued', run_after=now, locked_at=None, locked_by='', updated_at=now,
+    )
+    return requeued, failed
@@ -0,0 +1,40 @@
+"""
+Move read notifications older than the retention window to NotificationArchive
+(core/notification_retention.py).
+
+Usage:
+    python manage.py archive_notifications                 # NOTIFICATION_RETENTION_DAYS
+    python manage.py archive_notifications --days 30 --batch-size 5000
+    python manage.py archive_notifications --reindex       # rebuild the inbox index afterwards
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from src.backend.core import notification_retention
+
+
+class Command(BaseCommand):
+    help = 'Archive read notifications older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90),
+                            help='Archive read notifications older than this many days.')
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'NOTIFICATION_ARCHIVE_BATCH_SIZE', 1000),
+                            help='Rows moved per transaction.')
+        parser.add_argument('--reindex', action='store_true',
+                            help='REINDEX CONCURRENTLY the inbox index afterwards (PostgreSQL).')
+
+    def handle(self, *args, **options):
+        moved = notification_retention.archive_read(
+            older_than_days=options['days'], batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} read notifications older than {options['days']} days"
+        ))
+        if options['reindex'] and moved:
+            if notification_retention.reindex_inbox():
+                self.stdout.write('Inbox index rebuilt')
+            else:
+                self.stdout.write('Reindex skipped (PostgreSQL only)')
@@ -0,0 +1,68 @@
+"""
+Outbox dispatcher — delivers OutboxMessage rows to n8n (core/outbox.py).
+
+Usage:
+    python manage.py dispatch_outbox                  # poll forever
+    python manage.py dispatch_outbox --once           # drain what is due now, then exit
+    python manage.py dispatch_outbox --batch-size 200 --max-workers 16
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from src.backend.core import outbox
+
+
+class Command(BaseCommand):
+    help = 'Dispatch pending outbox messages to n8n workflows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the outbox is empty instead of polling.')
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'OUTBOX_BATCH_SIZE', 100),
+                            help='Messages claimed per batch.')
+        parser.add_argument('--max-workers', type=int,
+                            default=getattr(settings, 'OUTBOX_MAX_WORKERS', 8),
+                            help='Concurrent webhook calls per batch.')
+        parser.add_argument('--poll-interval', type=float,
+                            default=getattr(settings, 'OUTBOX_POLL_INTERVAL', 1),
+                            help='Seconds to sleep when the outbox is empty.')
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        housekeeping_every = 60.0
+        next_housekeeping = 0.0
+        total = 0
+
+        while not self._stopping:
+            close_old_connections()
+
+            if time.monotonic() >= next_housekeeping:
+                requeued = outbox.requeue_stale()
+                purged = outbox.purge_sent()
+                if requeued or purged:
+                    self.stdout.write(f'Outbox housekeeping: {requeued} requeued, {purged} purged')
+                next_housekeeping = time.monotonic() + housekeeping_every
+
+            claimed = outbox.drain(batch_size=options['batch_size'],
+                                   max_workers=options['max_workers'])
+            total += claimed
+            if claimed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'Outbox dispatcher stopped after {total} messages'))
+
+    def _stop(self, signum, frame):
+        # Finish the batch in hand, then leave the loop
+        self._stopping = True
@@ -0,0 +1,61 @@
+"""
+Import events from a CSV file on disk, streaming it in chunks.
+
+For timetable exports too large to go through the import-csv upload
+(nginx caps request bodies at 20 MB).  Accepts the same two CSV shapes.
+
+Usage:
+    python manage.py import_events_csv timetable.csv
+    python manage.py import_events_csv timetable.csv --chunk-size 1000 --user admin@example.com
+    python manage.py import_events_csv timetable.csv --validate-only
+"""
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from src.backend.core import csv_import
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV of events into the database in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Rows per bulk insert (default: EVENT_IMPORT_CHUNK_SIZE)')
+        parser.add_argument('--user', default=None,
+                            help='Email of the user recorded as created_by')
+        parser.add_argument('--validate-only', action='store_true',
+                            help='Check the header and rows without importing')
+
+    def handle(self, *args, **options):
+        created_by = None
+        if options['user']:
+            created_by = get_user_model().objects.filter(email=options['user']).first()
+            if created_by is None:
+                raise CommandError(f'No user with email {options["user"]}')
+
+        try:
+            with open(options['path'], 'rb') as fh:
+                upload = File(fh, name=options['path'])
+                report = csv_import.validate_csv(upload)
+                for error in report.errors:
+                    self.stderr.write(f'line {error["line"]}: {error["error"]}')
+                if options['validate_only'] or report.errors:
+                    if report.errors:
+                        raise CommandError(f'{len(report.errors)} invalid row(s); nothing imported')
+                    self.stdout.write(self.style.SUCCESS(f'{report.row_count} rows OK'))
+                    return
+                summary = csv_import.import_file(
+                    upload, created_by=created_by, chunk_size=options['chunk_size'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except csv_import.CsvImportError as exc:
+            raise CommandError(str(exc))
+
+        for error in summary['errors'] or ():
+            self.stderr.write(f'row {error["index"]}: {error["errors"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {summary["created_count"]} events ({summary["error_count"]} rows skipped)'
+        ))
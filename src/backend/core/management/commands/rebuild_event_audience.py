@@ -0,0 +1,36 @@
+"""
+Rebuild the EventAudience index from the events' targeting rules.
+
+The index is maintained incrementally by signals; run this after bulk data
+loads that bypass signals (raw SQL, loaddata) or to repair drift.
+
+Usage:
+    python manage.py rebuild_event_audience
+    python manage.py rebuild_event_audience --event 42 --event 43
+"""
+from django.core.management.base import BaseCommand
+
+from src.backend.core import audience
+
+
+class Command(BaseCommand):
+    help = 'Recompute the EventAudience (event, student) index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=int,
+            action='append',
+            dest='event_ids',
+            help='Only refresh these event ids (repeatable). Default: all events.',
+        )
+
+    def handle(self, *args, **options):
+        event_ids = options.get('event_ids')
+        if event_ids:
+            added, removed = audience.refresh_events_audience(event_ids)
+        else:
+            added, removed = audience.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'EventAudience refreshed: {added} rows added, {removed} rows removed'
+        ))
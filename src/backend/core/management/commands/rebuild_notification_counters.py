@@ -0,0 +1,22 @@
+"""
+Recount the per-user unread notification counters (NotificationCounter).
+
+The counters are maintained by signals and by the fan-out; run this after
+bulk loads or raw SQL that bypass them, or to repair drift.
+
+Usage:
+    python manage.py rebuild_notification_counters
+"""
+from django.core.management.base import BaseCommand
+
+from src.backend.core import notifications
+
+
+class Command(BaseCommand):
+    help = 'Recompute unread notification counters from the Notification table'
+
+    def handle(self, *args, **options):
+        written = notifications.rebuild_unread_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Notification counters rebuilt: {written} users with unread notifications'
+        ))
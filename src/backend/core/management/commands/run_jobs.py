@@ -0,0 +1,82 @@
+"""
+Background job worker — claims and runs BackgroundJob rows (core/jobs.py).
+
+Run one or more of these next to the web workers; they coordinate through
+the database, so scaling out is just starting another process.  Workers
+also sweep timed-out pending generations (core/generation_sweeper.py).
+
+Usage:
+    python manage.py run_jobs                 # poll forever
+    python manage.py run_jobs --once          # drain what is runnable now, then exit
+    python manage.py run_jobs --batch-size 10 --poll-interval 1
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from src.backend.core import generation_sweeper, jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (n8n generation / refinement, …)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no runnable jobs are left instead of polling.')
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'JOB_QUEUE_BATCH_SIZE', 5),
+                            help='Jobs claimed per round-trip.')
+        parser.add_argument('--poll-interval', type=float,
+                            default=getattr(settings, 'JOB_QUEUE_POLL_INTERVAL', 2),
+                            help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        worker_id = jobs.default_worker_id()
+        batch_size = options['batch_size']
+        poll_interval = options['poll_interval']
+        stale_check_every = max(getattr(settings, 'JOB_QUEUE_STALE_AFTER', 600) / 4, poll_interval)
+        next_stale_check = 0.0
+        sweep_every = getattr(settings, 'GENERATION_SWEEP_INTERVAL', 60)
+        next_sweep = 0.0
+        total = 0
+
+        self.stdout.write(f'Job worker {worker_id} started')
+        while not self._stopping:
+            close_old_connections()
+
+            if time.monotonic() >= next_stale_check:
+                requeued, failed = jobs.requeue_stale()
+                if requeued or failed:
+                    self.stdout.write(f'Recovered stale jobs: {requeued} requeued, {failed} failed')
+                next_stale_check = time.monotonic() + stale_check_every
+
+            if sweep_every and time.monotonic() >= next_sweep:
+                swept = generation_sweeper.sweep()
+                if swept.expired:
+                    self.stdout.write(
+                        f'Generation timeouts: {swept.expired} expired, '
+                        f'{swept.retried} retried, {swept.failed} failed'
+                    )
+                next_sweep = time.monotonic() + sweep_every
+
+            ran = jobs.run_pending(limit=batch_size, worker_id=worker_id)
+            total += ran
+            if ran:
+                continue
+            if options['once']:
+                break
+            time.sleep(poll_interval)
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'Job worker {worker_id} stopped after {total} jobs'))
+
+    def _stop(self, signum, frame):
+        # Finish the job in hand, then leave the loop
+        self._stopping = True
@@ -0,0 +1,59 @@
+"""
+Generation timeout sweeper — retries or fails events left pending past
+generation_timeout_at (core/generation_sweeper.py).
+
+run_jobs workers already sweep every GENERATION_SWEEP_INTERVAL seconds;
+use this for a one-off sweep or a dedicated loop.
+
+Usage:
+    python manage.py sweep_generation_timeouts            # sweep once, print counts
+    python manage.py sweep_generation_timeouts --loop --interval 30
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from src.backend.core import generation_sweeper
+
+
+class Command(BaseCommand):
+    help = 'Retry or fail event generations that passed generation_timeout_at'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep sweeping every --interval seconds.')
+        parser.add_argument('--interval', type=float,
+                            default=getattr(settings, 'GENERATION_SWEEP_INTERVAL', 60) or 60,
+                            help='Seconds between sweeps with --loop.')
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'GENERATION_SWEEP_BATCH_SIZE', 500),
+                            help='Events claimed per batch.')
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        totals = [0, 0, 0]
+        while not self._stopping:
+            close_old_connections()
+            swept = generation_sweeper.sweep(batch_size=options['batch_size'])
+            totals = [t + n for t, n in zip(totals, swept)]
+            if swept.expired:
+                self.stdout.write(
+                    f'{swept.expired} expired: {swept.retried} retried, {swept.failed} failed'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(
+            'Swept {} timed-out generations ({} retried, {} failed)'.format(*totals)
+        ))
+
+    def _stop(self, signum, frame):
+        self._stopping = True
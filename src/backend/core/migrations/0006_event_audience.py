@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_event_audience(apps, schema_editor):
+    """Populate the index for events that already have explicit targets."""
+    Event = apps.get_model('core', 'Event')
+    EventAudience = apps.get_model('core', 'EventAudience')
+    Enrollment = apps.get_model('enrollment', 'Enrollment')
+
+    for event in Event.objects.all().iterator():
+        student_ids = set(event.target_students.values_list('id', flat=True))
+        student_ids.update(
+            Enrollment.objects.filter(
+                models.Q(offering__in=event.target_offerings.all()) |
+                models.Q(offering__intake__in=event.target_intakes.all())
+            ).values_list('student_id', flat=True)
+        )
+        EventAudience.objects.bulk_create(
+            [EventAudience(event_id=event.pk, student_id=sid) for sid in student_ids],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0005_gcal_event_id_and_timeout'),
+        ('enrollment', '0003_enrollment_created_by_enrollment_deleted_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventAudience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audience', to='core.event')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_audience', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'event'], name='core_evaud_student_event_idx')],
+                'unique_together': {('event', 'student')},
+            },
+        ),
+        migrations.RunPython(backfill_event_audience, migrations.RunPython.noop),
+    ]
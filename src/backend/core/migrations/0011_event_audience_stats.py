@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_generation_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventAudienceStats',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='audience_stats', serialize=False, to='core.event')),
+                ('target_student_count', models.PositiveIntegerField(default=0)),
+                ('target_offering_ids', models.JSONField(blank=True, default=list)),
+                ('target_intake_ids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_event_audience_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='generation_retries',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('generation_status', 'pending')), fields=['generation_timeout_at'], name='core_event_gen_due_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0015_notification_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='generation_prompt',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='generation_requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
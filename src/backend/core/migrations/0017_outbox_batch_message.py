@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_event_generation_prompt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='object_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_n8n_workflow_circuit'),
+        ('core', '0017_outbox_batch_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeedKey',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calendar_feed_key', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('rotated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -4,7 +4,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
-from .base_models import BaseModel
+from .base_models import BaseModel, TrackedFieldsMixin
 
 User = settings.AUTH_USER_MODEL
 
@@ -15,7 +15,13 @@ class UnitAwareModel(BaseModel):
         abstract = True
 
 
-class Event(UnitAwareModel):
+class Event(TrackedFieldsMixin, UnitAwareModel):
+    # Same as generation_stream.GENERATION_FIELDS: saving a change publishes it
+    tracked_fields = (
+        'generation_status', 'generated_content', 'generation_meta',
+        'last_generated_at', 'gcal_event_id', 'generation_timeout_at',
+    )
+
     VISIBILITY_CHOICES = (
         ('public', 'Public'),
         ('unit', 'Unit only'),
@@ -42,6 +48,15 @@ class Event(UnitAwareModel):
     related_unit = models.ForeignKey('academic.Unit', null=True, blank=True, on_delete=models.SET_NULL)
     related_offering = models.ForeignKey('academic.SemesterOffering', null=True, blank=True, on_delete=models.SET_NULL)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order for EventViewSet (core/pagination.py)
+            models.Index(fields=['-start', '-id'], name='core_event_start_id_idx'),
+            # Due queue of the generation timeout sweeper (core/generation_sweeper.py)
+            models.Index(fields=['generation_timeout_at'], name='core_event_gen_due_idx',
+                         condition=models.Q(generation_status='pending')),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.start})"
 
@@ -65,26 +80,77 @@ class Event(UnitAwareModel):
         null=True, blank=True,
         help_text='If generation_status stays pending past this datetime, treat as failed'
     )
+    # Key of the in-flight n8n generation in the content cache (core/generation_cache.py);
+    # generation_callback stores the result under it.
+    generation_cache_key = models.CharField(max_length=64, blank=True, default='')
+    # Times the timeout sweeper re-sent a generation n8n never answered
+    generation_retries = models.PositiveSmallIntegerField(default=0)
+    # Prompt and requester of the in-flight generation, so a sweeper retry
+    # sends the same request (and fills the same cache entry)
+    generation_prompt = models.TextField(blank=True, default='')
+    generation_requested_by = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+    )
 
     def get_targeted_students(self):
-        """Return queryset of students targeted by this event."""
+        """
+        Return queryset of students targeted by this event.
+
+        Explicit targets (students, offerings, intakes) are read from the
+        maintained EventAudience index — see core/audience.py.
+        """
         UserModel = get_user_model()
-        
+
         if self.target_all_students:
             return UserModel.objects.filter(user_type='student', is_active=True)
 
-        qs = UserModel.objects.none()
-        if self.target_students.exists():
-            qs = qs | self.target_students.all()
-        if self.target_offerings.exists():
-            qs = qs | UserModel.objects.filter(enrollments__offering__in=self.target_offerings.all())
-        if self.target_intakes.exists():
-            qs = qs | UserModel.objects.filter(
-                enrollments__offering__intake__in=self.target_intakes.all()
-            )
-        return qs.distinct()
+        return UserModel.objects.filter(event_audience__event=self)
+
+
+class EventAudience(models.Model):
+    """
+    Materialised (event, student) pairs reached through an event's explicit
+    targeting: target_students, target_offerings and target_intakes.
 
+    Maintained incrementally by the signal handlers in core/signals.py, so
+    "events for this student" is a single indexed lookup instead of a
+    DISTINCT over four joins. ``target_all_students`` is not materialised —
+    callers check that flag directly.
 
+    Rebuild from scratch with: python manage.py rebuild_event_audience
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='audience')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_audience')
+
+    class Meta:
+        unique_together = ('event', 'student')
+        indexes = [
+            models.Index(fields=['student', 'event'], name='core_evaud_student_event_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} → event {self.event_id}"
+
+
+
+class EventAudienceStats(models.Model):
+    """
+    Per-event audience summary of the explicit targeting — reached-student
+    count plus the targeted offering / intake ids — so the refine payload's
+    audience_context is a primary-key read instead of a DISTINCT count.
+
+    Refreshed by core/audience.py whenever the event's targeting or the
+    EventAudience rows for it change; built lazily for events without a row.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True,
+                                 related_name='audience_stats')
+    target_student_count = models.PositiveIntegerField(default=0)
+    target_offering_ids = models.JSONField(default=list, blank=True)
+    target_intake_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Event {self.event_id}: {self.target_student_count} students"
 
 
 class Session(BaseModel):
@@ -107,7 +173,9 @@ class Session(BaseModel):
         return f"{self.unit} {self.session_type} @ {self.date} {self.start_time}"
 
 
-class AttendanceRecord(BaseModel):
+class AttendanceRecord(TrackedFieldsMixin, BaseModel):
+    tracked_fields = ('status',)
+
     STATUS = (
         ('present', 'Present'),
         ('absent', 'Absent'),
@@ -127,7 +195,9 @@ class AttendanceRecord(BaseModel):
         return f"{self.student} - {self.session} : {self.status}"
 
 
-class Ticket(BaseModel):
+class Ticket(TrackedFieldsMixin, BaseModel):
+    tracked_fields = ('status', 'assigned_to')
+
     PRIORITY_CHOICES = (('low', 'Low'), ('medium', 'Medium'), ('high', 'High'))
     STATUS_CHOICES = (('open', 'Open'), ('in_progress', 'In Progress'), ('closed', 'Closed'))
 
@@ -142,6 +212,11 @@ class Ticket(BaseModel):
     related_unit = models.ForeignKey('academic.Unit', null=True, blank=True, on_delete=models.SET_NULL)
     related_offering = models.ForeignKey('academic.SemesterOffering', null=True, blank=True, on_delete=models.SET_NULL)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='core_ticket_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"[{self.status}] {self.title}"
 
@@ -175,7 +250,10 @@ class FormSubmission(BaseModel):
         return f"Submission {self.pk} for {self.form.name}"
 
 
-class Notification(BaseModel):
+class Notification(TrackedFieldsMixin, BaseModel):
+    # Whether the stored row counts towards NotificationCounter — compared on save/delete
+    tracked_fields = ('unread', 'is_deleted')
+
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     actor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='notifications_sent')
     verb = models.CharField(max_length=200)
@@ -184,9 +262,110 @@ class Notification(BaseModel):
     target = GenericForeignKey('target_content_type', 'target_object_id')
     unread = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Inbox query: recipient's notifications, newest first (keyset paginated)
+            models.Index(fields=['recipient', '-created_at', '-id'], name='core_notif_rcpt_created_idx'),
+        ]
+
     def __str__(self):
         return f"Notification to {self.recipient}: {self.verb}"
 
+    def counts_as_unread(self):
+        return self.unread and not self.is_deleted
+
+    def counted_as_unread(self):
+        """``counts_as_unread()`` of the stored row (False before the first save)."""
+        return bool(self.stored_value('unread', False) and not self.stored_value('is_deleted', False))
+
+
+class NotificationArchive(models.Model):
+    """
+    Read notifications moved out of the live Notification table once older
+    than NOTIFICATION_RETENTION_DAYS (core/notification_retention.py), so
+    the inbox table and its index only hold recent rows.
+    """
+    original_id = models.PositiveBigIntegerField(unique=True)
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    actor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    verb = models.CharField(max_length=200)
+    target_content_type = models.ForeignKey(ContentType, null=True, blank=True, on_delete=models.SET_NULL)
+    target_object_id = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id'], name='core_notifarc_rcpt_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived notification to {self.recipient_id}: {self.verb}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Denormalised number of unread (and not deleted) notifications per user,
+    so the inbox badge is a primary-key read instead of a COUNT.
+
+    Kept in step by the Notification save/delete signals, the fan-out's
+    bulk inserts and mark-all-read (core/notifications.py).  Recount with:
+    python manage.py rebuild_notification_counters
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class CalendarFeedKey(models.Model):
+    """
+    Version of a user's calendar feed token (core/calendar_feed.py).  The
+    token signs (user id, version); rotating bumps the version, so every URL
+    handed out before stops working.  No row means version 0.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='calendar_feed_key')
+    version = models.PositiveIntegerField(default=0)
+    rotated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id}: v{self.version}"
+
+
+class NotificationFanout(models.Model):
+    """
+    Progress of delivering one notification to an event's whole audience
+    (core/notifications.py).  ``cursor`` is the highest recipient id already
+    written, so an interrupted fan-out resumes where it stopped without
+    notifying anyone twice; one row per (event, verb).
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='notification_fanouts')
+    verb = models.CharField(max_length=200)
+    actor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    cursor = models.PositiveBigIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('event', 'verb')
+
+    def __str__(self):
+        return f"Fan-out of event {self.event_id} [{self.status}] {self.sent}/{self.total}"
+
 
 class Resource(BaseModel):
     title = models.CharField(max_length=255)
@@ -215,3 +394,104 @@ class MediaAsset(BaseModel):
 
     def __str__(self):
         return f"MediaAsset {self.pk}"
+
+
+class BackgroundJob(BaseModel):
+    """
+    Durable unit of background work, claimed and executed by
+    ``python manage.py run_jobs`` worker processes (see core/jobs.py).
+
+    Requests enqueue a job and return its id immediately; clients follow
+    progress through /api/core/jobs/{id}/ (and, for event generation, the
+    event's own generation_status).
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now,
+                                     help_text='Not claimed before this time (used for retry backoff)')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # Claim query: oldest runnable queued job first
+            models.Index(fields=['run_after', 'id'], name='core_job_queued_idx',
+                         condition=models.Q(status='queued')),
+            models.Index(fields=['kind', 'status'], name='core_job_kind_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} [{self.kind}] {self.status}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Transactional outbox for outbound n8n triggers.
+
+    Signal handlers insert a row in the same transaction as the model change
+    that caused it (``attendance.marked``, ``enrollment.confirmed``, …); the
+    ``dispatch_outbox`` process drains pending rows in batches and calls the
+    matching workflows with bounded concurrency — see core/outbox.py.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    topic = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    # A batch message (outbox.emit_batch) covers all of these; object_id is the first
+    object_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    # Workflow ids that already accepted this message, so retries don't re-send
+    delivered_to = models.JSONField(default=list, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['available_at', 'id'], name='core_outbox_pending_idx',
+                         condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f"{self.topic}:{self.object_id} [{self.status}]"
+
+
+class GenerationCacheEntry(models.Model):
+    """
+    Generated content keyed by a hash of the generation inputs (title,
+    description, location, dates, prompt, workflow ids) so identical
+    requests — e.g. a re-imported CSV — reuse it instead of calling n8n.
+    Entries expire after GENERATION_CACHE_TTL and the least recently used
+    are evicted beyond GENERATION_CACHE_MAX_ENTRIES; see core/generation_cache.py.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    generated_content = models.JSONField(default=dict)
+    generation_meta = models.JSONField(default=dict, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]}… ({self.hit_count} hits)"
@@ -1,8 +1,11 @@
 import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 from django.conf import settings
-from django.db.models import F
 from django.utils import timezone
-import requests
+
+from . import circuit, http
 
 logger = logging.getLogger(__name__)
 
@@ -31,16 +34,15 @@ def _resolve_webhook_url(config: dict) -> str:
     return url
 
 
-def trigger_workflow(workflow, event_id, payload):
-    """Trigger an n8n workflow using a webhook URL stored on the workflow.configuration.
+def post_workflow(workflow, event_id, payload, timeout=None):
+    """POST ``payload`` to the workflow's webhook — HTTP only, no database access.
 
-    - workflow: N8NWorkflow instance (expected to have `configuration` JSON with `webhook_url`)
-    - event_id: id of the Django Event being processed
-    - payload: dict payload to POST to the workflow
+    Goes through the pooled session in core/http.py.  ``configuration.timeout``
+    on the workflow overrides ``timeout``; both fall back to
+    OUTBOUND_HTTP_TIMEOUT.
 
-    The active URL is chosen by ``_resolve_webhook_url``:
-      - ``use_test_url: true``  in configuration → uses ``webhook_url_test``
-      - ``use_test_url: false`` (default)         → uses ``webhook_url``
+    Safe to call from worker threads; callers that run in threads record
+    last_run / error_count themselves (see core/outbox.py).
 
     Returns: (status_code, response_json or text)
     """
@@ -68,21 +70,130 @@ def trigger_workflow(workflow, event_id, payload):
         workflow, webhook_url, config.get('use_test_url', False),
     )
 
+    resp = http.post(webhook_url, json=json_payload, headers=headers,
+                     timeout=http.workflow_timeout(workflow, timeout))
     try:
-        resp = requests.post(webhook_url, json=json_payload, headers=headers, timeout=30)
-        try:
-            data = resp.json()
-        except Exception:
-            data = resp.text
+        data = resp.json()
+    except Exception:
+        data = resp.text
+    return resp.status_code, data
 
-        # Update last_run on success
-        workflow.last_run = timezone.now()
-        workflow.save(update_fields=['last_run'])
 
-        return resp.status_code, data
-    except Exception as exc:
+def trigger_workflow(workflow, event_id, payload, timeout=None):
+    """Trigger an n8n workflow using a webhook URL stored on the workflow.configuration.
+
+    - workflow: N8NWorkflow instance (expected to have `configuration` JSON with `webhook_url`)
+    - event_id: id of the Django Event being processed
+    - payload: dict payload to POST to the workflow
+    - timeout: seconds to wait for n8n to answer (``configuration.timeout`` wins)
+
+    The active URL is chosen by ``_resolve_webhook_url``:
+      - ``use_test_url: true``  in configuration → uses ``webhook_url_test``
+      - ``use_test_url: false`` (default)         → uses ``webhook_url``
+
+    Calls are guarded by the workflow's circuit breaker (core/circuit.py):
+    while the circuit is open this raises ``CircuitOpenError`` immediately
+    instead of waiting for a dead n8n to time out.  Transport errors and
+    5xx responses count as failures.
+
+    Returns: (status_code, response_json or text)
+    """
+    if not circuit.allow_request(workflow):
+        raise circuit.CircuitOpenError(workflow)
+
+    try:
+        status_code, data = post_workflow(workflow, event_id, payload, timeout=timeout)
+    except Exception:
         logger.exception('Error triggering n8n workflow %s', workflow)
-        # Increment error_count on failure
-        workflow.error_count = F('error_count') + 1
-        workflow.save(update_fields=['error_count'])
+        circuit.record_failure(workflow)
         raise
+
+    if isinstance(status_code, int) and status_code >= 500:
+        circuit.record_failure(workflow)
+    else:
+        circuit.record_success(workflow)
+    return status_code, data
+
+
+# ---------------------------------------------------------------------------
+# Concurrent fan-out to every workflow registered for a trigger
+# ---------------------------------------------------------------------------
+
+# ``called`` is False when the workflow's circuit was open and no request was sent
+WorkflowResult = namedtuple('WorkflowResult', 'workflow called status_code response error log')
+
+
+def timed_post(workflow, object_id, payload, timeout=None):
+    """
+    ``post_workflow`` that never raises and reports its own timing — the
+    unit of work handed to fan-out thread pools (no database access).
+
+    Returns: (started, ended, status_code, response, error)
+    """
+    started = timezone.now()
+    try:
+        status_code, data = post_workflow(workflow, object_id, payload, timeout=timeout)
+        error = None
+    except Exception as exc:
+        status_code, data, error = None, None, str(exc)
+    return started, timezone.now(), status_code, data, error
+
+
+def fan_out(workflows, object_id, payload, triggered_by=None, timeout=None, max_workers=None):
+    """
+    Trigger every workflow in ``workflows`` concurrently and return one
+    ``WorkflowResult`` per workflow, in order.
+
+    Latency is that of the slowest workflow rather than the sum of all of
+    them.  Threads only do the HTTP calls; circuit-breaker checks, the
+    N8NExecutionLog rows (one bulk insert) and breaker bookkeeping happen
+    on the calling thread.  Workflows whose circuit is open are not called
+    and come back with a CircuitOpenError message in ``error``.
+    """
+    from django.apps import apps
+    N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
+
+    workflows = list(workflows)
+    max_workers = max_workers or getattr(settings, 'N8N_FANOUT_MAX_WORKERS', 4)
+
+    allowed = [wf for wf in workflows if circuit.allow_request(wf)]
+    outcomes = {}
+    if allowed:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(allowed))) as pool:
+            futures = {
+                wf.pk: pool.submit(timed_post, wf, object_id, payload, timeout)
+                for wf in allowed
+            }
+            outcomes = {pk: future.result() for pk, future in futures.items()}
+
+    now = timezone.now()
+    results, logs = [], []
+    for wf in workflows:
+        if wf.pk in outcomes:
+            started, ended, status_code, data, error = outcomes[wf.pk]
+        else:
+            started = ended = now
+            status_code, data, error = None, None, str(circuit.CircuitOpenError(wf))
+
+        log = N8NExecutionLog(
+            workflow=wf, triggered_by=triggered_by, start_time=started, end_time=ended,
+            input_data=payload,
+        )
+        if error is None:
+            log.status = 'completed' if 200 <= status_code < 300 else 'failed'
+            log.output_data = {'status_code': status_code, 'response': data}
+        else:
+            log.status = 'failed'
+            log.error_details = {'error': error}
+        logs.append(log)
+        results.append(WorkflowResult(wf, wf.pk in outcomes, status_code, data, error, log))
+
+        if wf.pk in outcomes:
+            if error is not None or status_code >= 500:
+                logger.warning('n8n workflow %s failed: %s', wf, error or f'HTTP {status_code}')
+                circuit.record_failure(wf)
+            else:
+                circuit.record_success(wf, when=ended)
+
+    N8NExecutionLog.objects.bulk_create(logs)
+    return results
@@ -0,0 +1,197 @@
+"""
+core/notifications.py — Publish-time notification fan-out and unread counters.
+
+``confirm_content`` and ``bulk_publish`` call ``publish_event``; it records a
+NotificationFanout row and enqueues an ``event.notify`` job (core/jobs.py).
+The job walks the audience in recipient-id order:
+
+  * ``target_all_students`` → every active student (users primary key);
+  * otherwise             → the event's EventAudience rows (core/audience.py),
+                            read through their (event, student) unique index.
+
+Each chunk of NOTIFICATION_FANOUT_CHUNK_SIZE recipients is one bulk INSERT
+plus the cursor update, in one transaction under a row lock on the fan-out,
+so a crashed or retried job resumes after the last committed chunk and
+nobody is notified twice.  ~20k students is a handful of statements.
+
+Each (event, verb) is fanned out once; publishing the event again does not
+re-notify.  'staff' events are never fanned out to students.
+
+Unread counters: NotificationCounter holds each user's number of unread,
+not-deleted notifications.  The Notification save/delete signals
+(core/signals.py) call ``adjust_unread`` when a row starts or stops
+counting, the fan-out bumps a whole chunk with one UPDATE, and
+``mark_all_read`` is one UPDATE plus a counter reset.
+"""
+import logging
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import jobs
+from .jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_VERB = 'New event published'
+
+
+def _fanout_model():
+    return apps.get_model('core', 'NotificationFanout')
+
+
+def _counter_model():
+    return apps.get_model('core', 'NotificationCounter')
+
+
+# ── Unread counters ──────────────────────────────────────────────────────────
+
+def adjust_unread(user_ids, delta=1):
+    """Add ``delta`` to the unread counter of every user in ``user_ids`` (repeats add up)."""
+    NotificationCounter = _counter_model()
+    by_delta = {}
+    for user_id, times in Counter(user_ids).items():
+        by_delta.setdefault(times * delta, []).append(user_id)
+    for amount, ids in by_delta.items():
+        updated = NotificationCounter.objects.filter(user_id__in=ids).update(
+            unread=Greatest(F('unread') + amount, 0),
+        )
+        if updated < len(ids) and amount > 0:
+            # First notification for some of them — create the missing rows
+            NotificationCounter.objects.bulk_create(
+                [NotificationCounter(user_id=user_id, unread=0) for user_id in ids],
+                ignore_conflicts=True,
+            )
+            NotificationCounter.objects.filter(user_id__in=ids, unread=0).update(unread=amount)
+
+
+def unread_count(user):
+    return _counter_model().objects.filter(user_id=user.pk).values_list('unread', flat=True).first() or 0
+
+
+def mark_all_read(user):
+    """Mark every unread notification of ``user`` read; returns how many changed."""
+    Notification = apps.get_model('core', 'Notification')
+    now = timezone.now()
+    with transaction.atomic():
+        # Only the rows this UPDATE changed come off the counter: one committed
+        # meanwhile (not seen by the UPDATE) keeps its +1
+        counted = Notification.objects.filter(recipient=user, unread=True, is_deleted=False).update(
+            unread=False, updated_at=now,
+        )
+        deleted = Notification.objects.filter(recipient=user, unread=True, is_deleted=True).update(
+            unread=False, updated_at=now,
+        )
+        if counted:
+            _counter_model().objects.filter(user_id=user.pk).update(unread=Greatest(F('unread') - counted, 0))
+    return counted + deleted
+
+
+def rebuild_unread_counts():
+    """Recount every user's counter from the Notification table; returns rows written."""
+    Notification = apps.get_model('core', 'Notification')
+    NotificationCounter = _counter_model()
+    counts = (
+        Notification.objects.filter(unread=True, is_deleted=False)
+        .values('recipient_id').annotate(n=models.Count('id'))
+    )
+    rows = [NotificationCounter(user_id=row['recipient_id'], unread=row['n']) for row in counts]
+    with transaction.atomic():
+        NotificationCounter.objects.update(unread=0)
+        NotificationCounter.objects.bulk_create(
+            rows, batch_size=1000,
+            update_conflicts=True, unique_fields=['user'], update_fields=['unread'],
+        )
+    return len(rows)
+
+
+# ── Publish fan-out ──────────────────────────────────────────────────────────
+
+def audience_ids(event):
+    """(queryset of recipient ids, field to order and page by) for ``event``."""
+    if event.target_all_students:
+        students = get_user_model().objects.filter(user_type='student', is_active=True)
+        return students.values_list('pk', flat=True), 'pk'
+    EventAudience = apps.get_model('core', 'EventAudience')
+    return EventAudience.objects.filter(event=event).values_list('student_id', flat=True), 'student_id'
+
+
+def publish_event(event, actor=None, verb=PUBLISHED_VERB):
+    """Start (or resume) the fan-out of ``verb`` for ``event``; returns the NotificationFanout or None."""
+    if event.visibility == 'staff':
+        return None
+    NotificationFanout = _fanout_model()
+    fanout, created = NotificationFanout.objects.get_or_create(
+        event=event, verb=verb,
+        defaults={'actor': actor if getattr(actor, 'is_authenticated', False) else None},
+    )
+    if created or fanout.status == 'failed':
+        NotificationFanout.objects.filter(pk=fanout.pk).update(status='pending')
+        fanout.status = 'pending'
+        jobs.enqueue('event.notify', {'fanout_id': fanout.pk}, created_by=actor)
+    return fanout
+
+
+def _fanout_failed(job, exc):
+    _fanout_model().objects.filter(pk=job.payload.get('fanout_id')).exclude(status='done').update(status='failed')
+
+
+@job_handler('event.notify', on_failure=_fanout_failed)
+def fan_out_notification(job):
+    """Write the fan-out's Notification rows chunk by chunk from its cursor."""
+    NotificationFanout = _fanout_model()
+    Notification = apps.get_model('core', 'Notification')
+
+    fanout = NotificationFanout.objects.select_related('event').filter(pk=job.payload.get('fanout_id')).first()
+    if fanout is None:
+        return {'detail': 'Fan-out no longer exists'}
+    if fanout.status == 'done':
+        return {'fanout_id': fanout.pk, 'sent': fanout.sent, 'total': fanout.total}
+
+    event = fanout.event
+    recipients, key = audience_ids(event)
+    content_type = ContentType.objects.get_for_model(event)
+    chunk_size = getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 2000)
+
+    NotificationFanout.objects.filter(pk=fanout.pk).update(
+        status='running',
+        total=fanout.sent + recipients.filter(**{f'{key}__gt': fanout.cursor}).count(),
+        started_at=fanout.started_at or timezone.now(),
+    )
+
+    while True:
+        with transaction.atomic():
+            # Lock the fan-out so a second run of the same job waits, then
+            # continues from the cursor this one committed
+            locked = NotificationFanout.objects.select_for_update().get(pk=fanout.pk)
+            ids = list(recipients.filter(**{f'{key}__gt': locked.cursor}).order_by(key)[:chunk_size])
+            if not ids:
+                break
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        recipient_id=recipient_id, actor_id=locked.actor_id, verb=locked.verb,
+                        target_content_type=content_type, target_object_id=event.pk,
+                    )
+                    for recipient_id in ids
+                ],
+                batch_size=chunk_size,
+            )
+            adjust_unread(ids)
+            locked.cursor = ids[-1]
+            locked.sent += len(ids)
+            locked.save(update_fields=['cursor', 'sent'])
+
+    fanout.refresh_from_db()
+    fanout.status = 'done'
+    fanout.finished_at = timezone.now()
+    fanout.save(update_fields=['status', 'finished_at'])
+    logger.info('Fan-out %s for event %s: %s notifications', fanout.pk, event.pk, fanout.sent)
+    return {'fanout_id': fanout.pk, 'sent': fanout.sent, 'total': fanout.total}
@@ -0,0 +1,269 @@
+"""
+core/outbox.py — Transactional outbox for outbound n8n triggers.
+
+Signal handlers call ``emit(topic, object_id)``, which only inserts an
+OutboxMessage row — inside the request's transaction when one is open, so
+the trigger is recorded if and only if the model change commits.  The
+``dispatch_outbox`` process drains pending rows:
+
+  1. claim a batch (``SELECT … FOR UPDATE SKIP LOCKED``, safe with several
+     dispatchers running)
+  2. load the active workflows for the batch's topics and build every
+     payload with one query per topic (see ``payload_builder``)
+  3. POST to n8n from a bounded thread pool — the threads do HTTP only
+  4. back on the main thread, bulk-write execution logs, update each
+     workflow's circuit breaker (core/circuit.py) and the message outcomes
+
+Workflows whose circuit is open are not called; their messages get the
+claimed attempt back and wait until the circuit's cooldown ends, so an n8n
+outage does not exhaust OUTBOX_MAX_ATTEMPTS.
+
+``emit_batch(topic, object_ids)`` records one message for many objects
+(set-wise changes such as bulk enrollment approval).  Workflows configured
+with ``configuration.batch: true`` receive it as a single POST,
+``{batch: true, topic, items: [payload, …]}``; the others get one POST per
+object, as if each had been emitted on its own.
+
+Delivery is at-least-once per workflow: ``delivered_to`` records which
+workflows accepted a message so a retry only re-sends to the ones that
+failed.
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import circuit
+from .n8n_client import timed_post
+
+logger = logging.getLogger(__name__)
+
+# topic → func(object_ids) -> {object_id: payload}
+_PAYLOAD_BUILDERS = {}
+
+
+def payload_builder(topic):
+    """Register ``func(object_ids) -> {object_id: payload}`` for ``topic``."""
+    def decorator(func):
+        _PAYLOAD_BUILDERS[topic] = func
+        return func
+    return decorator
+
+
+def _models():
+    return (
+        apps.get_model('core', 'OutboxMessage'),
+        apps.get_model('users', 'N8NWorkflow'),
+        apps.get_model('users', 'N8NExecutionLog'),
+    )
+
+
+def emit(topic, object_id):
+    """Record that ``topic`` happened for ``object_id``; dispatched later."""
+    OutboxMessage, _, _ = _models()
+    return OutboxMessage.objects.create(topic=topic, object_id=object_id)
+
+
+def emit_batch(topic, object_ids):
+    """Record ``topic`` for many objects as one message (bulk changes that skip signals)."""
+    OutboxMessage, _, _ = _models()
+    object_ids = list(object_ids)
+    if not object_ids:
+        return None
+    return OutboxMessage.objects.create(topic=topic, object_id=object_ids[0], object_ids=object_ids)
+
+
+def _message_object_ids(msg):
+    return msg.object_ids or [msg.object_id]
+
+
+def claim(batch_size):
+    """Move up to ``batch_size`` due messages from pending → processing."""
+    OutboxMessage, _, _ = _models()
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('available_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        OutboxMessage.objects.filter(id__in=ids).update(
+            status='processing', locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(OutboxMessage.objects.filter(id__in=ids).order_by('id'))
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'OUTBOX_RETRY_BACKOFF', 30)
+    return timezone.timedelta(seconds=base * (2 ** max(attempts - 1, 0)))
+
+
+def drain(batch_size=None, max_workers=None):
+    """
+    Dispatch one batch of pending messages.  Returns the number of messages
+    claimed (0 means the outbox is empty).
+    """
+    OutboxMessage, N8NWorkflow, N8NExecutionLog = _models()
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 100)
+    max_workers = max_workers or getattr(settings, 'OUTBOX_MAX_WORKERS', 8)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+    messages = claim(batch_size)
+    if not messages:
+        return 0
+
+    by_topic = defaultdict(list)
+    for msg in messages:
+        by_topic[msg.topic].append(msg)
+
+    workflows = defaultdict(list)
+    # Calls each workflow may take this batch: unlimited when its circuit is
+    # closed, a single probe when half-open, none while open.
+    allowance = {}
+    for wf in N8NWorkflow.objects.filter(trigger_event__in=list(by_topic), is_active=True):
+        workflows[wf.trigger_event].append(wf)
+        if circuit.state(wf) == circuit.CLOSED:
+            allowance[wf.id] = None
+        else:
+            allowance[wf.id] = 1 if circuit.allow_request(wf) else 0
+
+    # ── Build the work list ──────────────────────────────────────────────────
+    tasks = []
+    errors = defaultdict(list)
+    # Messages held back by an open circuit: not a failed send, so they get
+    # their attempt back and wait for the circuit instead of the backoff.
+    deferred = {}
+    for topic, topic_messages in by_topic.items():
+        if not workflows[topic]:
+            continue
+        builder = _PAYLOAD_BUILDERS.get(topic)
+        if builder is None:
+            for msg in topic_messages:
+                errors[msg.id].append(f'No payload builder for topic {topic!r}')
+            continue
+        payloads = builder([oid for msg in topic_messages for oid in _message_object_ids(msg)])
+        for msg in topic_messages:
+            items = [(oid, payloads[oid]) for oid in _message_object_ids(msg) if oid in payloads]
+            if not items:
+                continue  # objects deleted since — nothing to send
+            for wf in workflows[topic]:
+                if wf.id in msg.delivered_to:
+                    continue
+                if allowance[wf.id] == 0:
+                    reopens = circuit.retry_at(wf)
+                    deferred[msg.id] = max(deferred.get(msg.id, reopens), reopens)
+                    continue
+                if allowance[wf.id] is not None:
+                    allowance[wf.id] -= 1
+                if not msg.object_ids:
+                    tasks.append((msg, wf, msg.object_id, items[0][1]))
+                elif (wf.configuration or {}).get('batch'):
+                    tasks.append((msg, wf, f'batch-{msg.id}', {
+                        'batch': True, 'topic': topic, 'items': [payload for _, payload in items],
+                    }))
+                else:
+                    tasks.extend((msg, wf, oid, payload) for oid, payload in items)
+
+    # ── HTTP fan-out (threads do network I/O only) ──────────────────────────
+    results = []
+    if tasks:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            futures = [
+                pool.submit(timed_post, wf, object_id, payload) for _, wf, object_id, payload in tasks
+            ]
+            results = [future.result() for future in futures]
+
+    # ── Record outcomes ──────────────────────────────────────────────────────
+    logs = []
+    wf_by_id = {}
+    wf_ok, wf_failed = set(), defaultdict(int)
+    # (message, workflow) pairs with a failed POST — a batch message sent item
+    # by item is delivered to a workflow only if every item was accepted
+    undelivered = set()
+    for (msg, wf, object_id, payload), (started, ended, status_code, resp, error) in zip(tasks, results):
+        ok = error is None and 200 <= status_code < 300
+        log = N8NExecutionLog(
+            workflow=wf, triggered_by=None, start_time=started, end_time=ended,
+            status='completed' if ok else 'failed', input_data=payload,
+        )
+        if error is None:
+            log.output_data = {'status_code': status_code, 'response': resp}
+        else:
+            log.error_details = {'error': error}
+        logs.append(log)
+
+        wf_by_id[wf.id] = wf
+        if error is None and status_code < 500:
+            wf_ok.add(wf.id)
+        else:
+            wf_failed[wf.id] += 1
+        if not ok:
+            undelivered.add((msg.id, wf.id))
+            errors[msg.id].append(f'{wf.name}: {error or f"HTTP {status_code}"}')
+    for msg, wf, _, _ in tasks:
+        if (msg.id, wf.id) not in undelivered and wf.id not in msg.delivered_to:
+            msg.delivered_to = msg.delivered_to + [wf.id]
+
+    now = timezone.now()
+    if logs:
+        N8NExecutionLog.objects.bulk_create(logs)
+    # Breaker bookkeeping: any failure in the batch counts against the
+    # workflow, otherwise a success closes its circuit.
+    for wf_id, wf in wf_by_id.items():
+        if wf_failed[wf_id]:
+            circuit.record_failure(wf, count=wf_failed[wf_id])
+        elif wf_id in wf_ok:
+            circuit.record_success(wf, when=now)
+
+    for msg in messages:
+        msg.locked_at = None
+        if not errors[msg.id] and msg.id in deferred:
+            msg.status = 'pending'
+            msg.attempts -= 1
+            msg.available_at = deferred[msg.id]
+            msg.last_error = 'circuit open'
+            continue
+        if not errors[msg.id]:
+            msg.status = 'sent'
+            msg.sent_at = now
+            msg.last_error = ''
+            continue
+        msg.last_error = '; '.join(errors[msg.id])
+        if msg.attempts < max_attempts:
+            msg.status = 'pending'
+            msg.available_at = now + _retry_delay(msg.attempts)
+        else:
+            msg.status = 'failed'
+            logger.error('Outbox message %s (%s) failed: %s', msg.id, msg.topic, msg.last_error)
+    OutboxMessage.objects.bulk_update(
+        messages, ['status', 'attempts', 'available_at', 'delivered_to', 'last_error', 'locked_at', 'sent_at'],
+    )
+    return len(messages)
+
+
+def requeue_stale(stale_after=None):
+    """Return messages stuck in 'processing' (dispatcher died) to the queue."""
+    OutboxMessage, _, _ = _models()
+    stale_after = stale_after or getattr(settings, 'OUTBOX_STALE_AFTER', 300)
+    cutoff = timezone.now() - timezone.timedelta(seconds=stale_after)
+    return OutboxMessage.objects.filter(status='processing', locked_at__lt=cutoff).update(
+        status='pending', locked_at=None, available_at=timezone.now(),
+    )
+
+
+def purge_sent(older_than_days=None):
+    """Delete delivered messages older than the retention window."""
+    OutboxMessage, _, _ = _models()
+    days = older_than_days or getattr(settings, 'OUTBOX_RETENTION_DAYS', 7)
+    cutoff = timezone.now() - timezone.timedelta(days=days)
+    deleted, _ = OutboxMessage.objects.filter(status='sent', sent_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,182 @@
+"""
+core/pagination.py — Keyset (cursor) pagination for the large, append-heavy
+lists: events, notifications, tickets and n8n execution logs.
+
+Each page is fetched with a composite ``WHERE (key, id) < (last_key, last_id)``
+predicate over an index on the same columns, so page 500 costs the same as
+page 1.  DRF's built-in CursorPagination only keys on the first ordering
+field and falls back to OFFSET for ties; here the primary key is part of the
+cursor, which keeps pages stable when many rows share the same timestamp.
+
+Rows whose key is NULL (legacy rows without ``created_at``) sort as if the
+key were the largest value — first on the newest-first lists — ordered by
+id, and the cursor carries the NULL so paging continues past them.
+
+Pages are forward-only:
+    GET /api/core/events/?page_size=50
+    → { "next": "...?cursor=<opaque>", "previous": null, "results": [...] }
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``ordering = (key, tie_breaker)``.
+
+    Both fields must sort in the same direction; the tie-breaker should be
+    unique (the primary key).  Subclasses only set ``ordering``.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        key_field, tie_field = (f.lstrip('-') for f in self.ordering)
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if descending else 'gt'
+        nullable = queryset.model._meta.get_field(key_field).null
+
+        queryset = queryset.order_by(*self._order_by(key_field, tie_field, descending))
+        position = self.decode_cursor(request, queryset.model, key_field, tie_field, nullable)
+        if position is not None:
+            key_value, tie_value = position
+            if key_value is None:
+                # The rest of the NULL-key rows, then — descending — every keyed row
+                after = Q(**{f'{key_field}__isnull': True, f'{tie_field}__{lookup}': tie_value})
+                if descending:
+                    after |= Q(**{f'{key_field}__isnull': False})
+            else:
+                after = (
+                    Q(**{f'{key_field}__{lookup}': key_value}) |
+                    Q(**{key_field: key_value, f'{tie_field}__{lookup}': tie_value})
+                )
+                if nullable and not descending:
+                    after |= Q(**{f'{key_field}__isnull': True})
+            queryset = queryset.filter(after)
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        self.next_position = None
+        if self.has_next and rows:
+            last = rows[-1]
+            self.next_position = (getattr(last, key_field), getattr(last, tie_field))
+        return rows
+
+    @staticmethod
+    def _order_by(key_field, tie_field, descending):
+        # NULL keys sort as the largest value on every backend — first when
+        # descending — which is where PostgreSQL's (key, id) indexes keep them.
+        if descending:
+            return F(key_field).desc(nulls_first=True), F(tie_field).desc()
+        return F(key_field).asc(nulls_last=True), F(tie_field).asc()
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except (TypeError, ValueError):
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    # ── Cursor encoding ──────────────────────────────────────────────────────
+
+    def encode_cursor(self, position):
+        # Full-precision isoformat: DjangoJSONEncoder drops microseconds,
+        # which would make the keyset comparison skip rows.
+        payload = json.dumps([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ])
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model, key_field, tie_field, nullable=False):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            key_value, tie_value = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            key_value = model._meta.get_field(key_field).to_python(key_value)
+            tie_value = model._meta.get_field(tie_field).to_python(tie_value)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        if tie_value is None or (key_value is None and not nullable):
+            raise NotFound(self.invalid_cursor_message)
+        return key_value, tie_value
+
+    # ── Response ─────────────────────────────────────────────────────────────
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned in "next"',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Results per page (max {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class EventStartPagination(KeysetPagination):
+    """Events, newest start first."""
+    ordering = ('-start', '-id')
+
+
+class CreatedAtPagination(KeysetPagination):
+    """Notifications, tickets and other ``created_at`` feeds."""
+    ordering = ('-created_at', '-id')
+
+
+class StartTimePagination(KeysetPagination):
+    """n8n execution logs, most recent run first."""
+    ordering = ('-start_time', '-id')
@@ -30,6 +30,29 @@ class EventSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'deleted_at', 'is_deleted',
         ]
 
+class EventImportRowSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk event import (core/event_import.py).
+
+    Relations are plain id lists so validating a row never touches the
+    database; the ids are checked set-wise for the whole batch instead.
+    """
+    target_students = serializers.ListField(child=serializers.IntegerField(), required=False)
+    target_offerings = serializers.ListField(child=serializers.IntegerField(), required=False)
+    target_intakes = serializers.ListField(child=serializers.IntegerField(), required=False)
+    related_unit = serializers.IntegerField(required=False, allow_null=True)
+    related_offering = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = models.Event
+        fields = [
+            'title', 'description', 'start', 'end', 'location', 'visibility',
+            'target_all_students', 'target_students', 'target_offerings', 'target_intakes',
+            'related_unit', 'related_offering',
+            'generated_content', 'generation_status', 'generation_meta',
+        ]
+
+
 class SessionSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Session
@@ -99,3 +122,37 @@ class MediaAssetSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.MediaAsset
         fields = '__all__'
+
+
+class NotificationArchiveSerializer(serializers.ModelSerializer):
+    unread = serializers.BooleanField(default=False, read_only=True)
+
+    class Meta:
+        model = models.NotificationArchive
+        fields = ('id', 'original_id', 'recipient', 'actor', 'verb', 'target_content_type',
+                  'target_object_id', 'unread', 'created_at', 'archived_at')
+        read_only_fields = fields
+
+
+class NotificationFanoutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.NotificationFanout
+        fields = ('id', 'event', 'verb', 'status', 'total', 'sent', 'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.BackgroundJob
+        fields = (
+            'id', 'kind', 'status', 'attempts', 'max_attempts', 'run_after',
+            'created_at', 'finished_at', 'result', 'last_error',
+        )
+        read_only_fields = fields
+
+
+class GenerateBatchSerializer(serializers.Serializer):
+    """The id and number fields of a ``generate-batch`` request body (see EventViewSet.generate_batch)."""
+    event_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    unit_id = serializers.IntegerField(required=False, allow_null=True)
+    days = serializers.IntegerField(required=False, allow_null=True, min_value=0)
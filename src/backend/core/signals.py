@@ -1,51 +1,44 @@
 """
-core/signals.py — Outbound n8n triggers for attendance events.
+core/signals.py — Outbound n8n triggers for attendance events, and
+maintenance of the EventAudience index.
 
-When an AttendanceRecord is saved with status='present', all active n8n workflows
-registered with trigger_event='attendance.marked' are called in a background thread.
+When an AttendanceRecord is saved with status='present', an
+``attendance.marked`` outbox message is recorded; the dispatch_outbox process
+calls the registered n8n workflows (see core/outbox.py).
+
+Saving an Event's generation fields wakes the SSE subscribers of
+core/generation_stream.py.
+
+Notification saves and deletes keep the per-user unread counters
+(NotificationCounter, core/notifications.py) in step.
 """
 
-import threading
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
 from django.dispatch import receiver
-from django.utils import timezone
 
-from .models import AttendanceRecord
+from . import audience, generation_stream, notifications, outbox
+from .models import AttendanceRecord, Event, Notification
 
 logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# Background dispatcher (runs in a daemon thread so it never blocks the request)
+# attendance.marked outbox payloads
 # ---------------------------------------------------------------------------
 
-def _dispatch_n8n_attendance(instance_pk):
-    """
-    Fire attendance.marked n8n workflows.
-    Fetches a fresh copy of the record to avoid lazy-load issues across threads.
-    """
-    try:
-        from django.apps import apps
-        N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
-        N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
-        from src.backend.core.n8n_client import trigger_workflow
-
-        workflows = N8NWorkflow.objects.filter(
-            trigger_event='attendance.marked', is_active=True
-        )
-        if not workflows.exists():
-            return
-
-        # Fetch fresh instance (avoid cross-thread model state issues)
-        record = AttendanceRecord.objects.select_related(
-            'student', 'session', 'session__unit', 'session__offering'
-        ).get(pk=instance_pk)
+@outbox.payload_builder('attendance.marked')
+def _attendance_payloads(record_ids):
+    """Build attendance.marked payloads for a batch of records in one query."""
+    records = AttendanceRecord.objects.select_related(
+        'student', 'session', 'session__unit', 'session__offering'
+    ).filter(pk__in=record_ids)
 
+    payloads = {}
+    for record in records:
         session = record.session
-
-        payload = {
+        payloads[record.pk] = {
             'student_id': record.student_id,
             'student_email': record.student.email,
             'student_name': record.student.get_full_name(),
@@ -56,28 +49,7 @@ def _dispatch_n8n_attendance(instance_pk):
             'unit_name': session.unit.name,
             'event_date': session.date.isoformat(),
         }
-
-        for wf in workflows:
-            log = N8NExecutionLog.objects.create(
-                workflow=wf,
-                triggered_by=None,
-                start_time=timezone.now(),
-                status='running',
-                input_data=payload,
-            )
-            try:
-                sc, resp = trigger_workflow(wf, record.pk, payload)
-                log.status = 'completed' if 200 <= sc < 300 else 'failed'
-                log.output_data = {'status_code': sc, 'response': resp}
-            except Exception as exc:
-                log.status = 'failed'
-                log.error_details = {'error': str(exc)}
-            finally:
-                log.end_time = timezone.now()
-                log.save()
-
-    except Exception:
-        logger.exception('_dispatch_n8n_attendance error for pk=%s', instance_pk)
+    return payloads
 
 
 # ---------------------------------------------------------------------------
@@ -87,12 +59,111 @@ def _dispatch_n8n_attendance(instance_pk):
 @receiver(post_save, sender=AttendanceRecord)
 def attendance_post_save(sender, instance, **kwargs):
     """
-    After an attendance record is saved, if status is 'present' fire any
-    registered n8n workflows for attendance.marked in a background thread.
+    After an attendance record is saved as 'present' (created so, or changed
+    to it) queue an attendance.marked message for the registered n8n workflows.
     """
-    if instance.status == 'present':
-        threading.Thread(
-            target=_dispatch_n8n_attendance,
-            args=(instance.pk,),
-            daemon=True,
-        ).start()
+    if instance.status == 'present' and instance.has_changed('status'):
+        outbox.emit('attendance.marked', instance.pk)
+
+
+# ---------------------------------------------------------------------------
+# EventAudience index maintenance (see core/audience.py)
+# ---------------------------------------------------------------------------
+
+def _event_targeting_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh the audience of every event whose targeting M2M changed."""
+    if action == 'pre_clear' and reverse:
+        # Reverse clear (e.g. user.targeted_events.clear()) does not report
+        # which events were affected — remember them before the rows go.
+        instance._audience_cleared_event_ids = list(
+            sender.objects.filter(**{_TARGETING_REVERSE_FIELDS[sender]: instance.pk})
+            .values_list('event_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        audience.refresh_event_audience(instance)
+    elif action == 'post_clear':
+        audience.refresh_events_audience(getattr(instance, '_audience_cleared_event_ids', []))
+    else:
+        audience.refresh_events_audience(pk_set or [])
+
+
+# through model → column holding the non-event side of the relation
+_TARGETING_REVERSE_FIELDS = {
+    Event.target_students.through: 'user_id',
+    Event.target_offerings.through: 'semesteroffering_id',
+    Event.target_intakes.through: 'intake_id',
+}
+
+for _through in _TARGETING_REVERSE_FIELDS:
+    m2m_changed.connect(_event_targeting_changed, sender=_through,
+                        dispatch_uid=f'event_audience_{_through._meta.model_name}')
+
+
+@receiver(post_save, sender='enrollment.Enrollment')
+def enrollment_audience_post_save(sender, instance, created, **kwargs):
+    """A new enrollment can bring the student into offering/intake-targeted events."""
+    if created:
+        audience.refresh_student_audience(instance.student_id, instance.offering_id)
+
+
+@receiver(post_delete, sender='enrollment.Enrollment')
+def enrollment_audience_post_delete(sender, instance, **kwargs):
+    audience.refresh_student_audience(instance.student_id, instance.offering_id)
+
+
+@receiver(pre_save, sender='academic.SemesterOffering')
+def offering_audience_pre_save(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored intake so post_save can tell whether it moved."""
+    if not instance.pk or (update_fields is not None and 'intake' not in update_fields):
+        instance._audience_old_intake_id = instance.intake_id
+        return
+    instance._audience_old_intake_id = (
+        sender.objects.filter(pk=instance.pk).values_list('intake_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender='academic.SemesterOffering')
+def offering_audience_post_save(sender, instance, created, **kwargs):
+    old_intake_id = getattr(instance, '_audience_old_intake_id', None)
+    if not created and old_intake_id != instance.intake_id:
+        audience.refresh_intake_audience([old_intake_id, instance.intake_id])
+
+
+# ---------------------------------------------------------------------------
+# Generation status push (see core/generation_stream.py)
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=Event)
+def event_generation_post_save(sender, instance, created, update_fields=None, **kwargs):
+    """Wake generation-stream subscribers when a generation field is saved."""
+    if created:
+        return
+    changed = instance.changed_fields()  # tracked_fields are the generation fields
+    if update_fields is not None:
+        changed &= generation_stream.GENERATION_FIELDS.intersection(update_fields)
+    if changed:
+        generation_stream.publish(instance.pk)
+
+
+# ---------------------------------------------------------------------------
+# Unread notification counters (see core/notifications.py)
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=Notification)
+def notification_counter_post_save(sender, instance, created, **kwargs):
+    """+1 / −1 when the row starts or stops counting as unread."""
+    was_counted = False if created else instance.counted_as_unread()
+    counted = instance.counts_as_unread()
+    if counted != was_counted:
+        notifications.adjust_unread([instance.recipient_id], 1 if counted else -1)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_counter_post_delete(sender, instance, **kwargs):
+    counted = instance.counted_as_unread() if instance.is_tracked('unread') else instance.counts_as_unread()
+    if counted:
+        notifications.adjust_unread([instance.recipient_id], -1)
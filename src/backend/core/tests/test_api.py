@@ -39,7 +39,7 @@ class CoreAPIPermissionTests(APITestCase):
         url = reverse('event-list')
         resp = self.client.get(url)
         assert resp.status_code == status.HTTP_200_OK
-        titles = [r['title'] for r in resp.data]
+        titles = [r['title'] for r in resp.data['results']]
         assert 'Existing Event' in titles
 
     def test_event_create_by_convenor_allowed(self):
@@ -0,0 +1,106 @@
+"""
+Tests for the per-user iCalendar feed (core/calendar_feed.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_calendar_feed
+"""
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from src.backend.academic.models import SemesterOffering, Unit
+from src.backend.core.calendar_feed import make_token
+from src.backend.core.models import Event, Session
+from src.backend.enrollment.models import Enrollment
+
+User = get_user_model()
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='cal_staff', email='cal_staff@test.com', password='pw', is_staff=True,
+        )
+        self.student = User.objects.create_user(
+            username='cal_student', email='cal_student@test.com', password='pw', user_type='student',
+        )
+        unit = Unit.objects.create(code='CAL101', name='Calendars', credit_points=12)
+        self.offering = SemesterOffering.objects.create(
+            unit=unit, year=2025, semester='S1',
+            enrollment_start=timezone.now() - timezone.timedelta(days=1),
+            enrollment_end=timezone.now() + timezone.timedelta(days=30),
+        )
+        Enrollment.objects.create(student=self.student, offering=self.offering, status='ENROLLED')
+        self.session = Session.objects.create(
+            unit=unit, offering=self.offering, session_type='lecture',
+            date=timezone.localdate() + datetime.timedelta(days=2),
+            start_time=datetime.time(9, 0), end_time=datetime.time(11, 0), location='Room 1; Level 2',
+        )
+        self.event = Event.objects.create(
+            title='Careers Fair', start=timezone.now() + timezone.timedelta(days=3),
+            target_all_students=True, created_by=self.staff,
+        )
+        Event.objects.create(title='Staff only', start=timezone.now() + timezone.timedelta(days=3),
+                             visibility='staff', target_all_students=True, created_by=self.staff)
+        self.url = reverse('calendar-feed', kwargs={'token': make_token(self.student)})
+
+    def test_feed_contains_sessions_and_targeted_events(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'text/calendar; charset=utf-8')
+        body = resp.content.decode('utf-8')
+        self.assertIn(f'UID:session-{self.session.pk}@', body)
+        self.assertIn('SUMMARY:CAL101 Lecture', body)
+        self.assertIn('LOCATION:Room 1\\; Level 2', body)
+        # 09:00 in Ho Chi Minh City is 02:00 UTC
+        self.assertIn(f'DTSTART:{self.session.date:%Y%m%d}T020000Z', body)
+        self.assertIn('SUMMARY:Careers Fair', body)
+        self.assertNotIn('Staff only', body)
+
+    def test_bad_token_is_404(self):
+        resp = self.client.get(reverse('calendar-feed', kwargs={'token': f'{self.student.pk}:forged'}))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_conditional_get_until_a_row_changes(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(5):  # user + four aggregates, no rows loaded
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        self.event.title = 'Careers Fair (moved)'
+        self.event.save()
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('Careers Fair (moved)', resp.content.decode('utf-8'))
+
+        # Dropping the unit removes its sessions from the feed
+        etag = resp['ETag']
+        Enrollment.objects.filter(student=self.student).update(status='WITHDRAWN')
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('CAL101', resp.content.decode('utf-8'))
+
+    def test_feed_url_action(self):
+        api = APIClient()
+        api.force_authenticate(user=self.student)
+        resp = api.get(reverse('session-calendar-feed'))
+        self.assertTrue(resp.data['url'].endswith(self.url))
+
+    def test_rotating_revokes_issued_urls(self):
+        api = APIClient()
+        api.force_authenticate(user=self.student)
+        resp = api.post(reverse('session-calendar-feed-rotate'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        new_url = resp.data['url']
+        self.assertNotEqual(new_url, self.url)
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+        self.assertTrue(api.get(reverse('session-calendar-feed')).data['url'].endswith(new_url.split('/api')[-1]))
+
+        api.post(reverse('session-calendar-feed-rotate'))
+        self.assertEqual(self.client.get(new_url).status_code, 404)
@@ -0,0 +1,137 @@
+"""
+Tests for the per-workflow n8n circuit breaker (core/circuit.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_circuit
+"""
+from unittest.mock import patch
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core import circuit
+from src.backend.core.models import Event
+from src.backend.core.n8n_client import trigger_workflow
+
+User = get_user_model()
+N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+
+
+@override_settings(N8N_CIRCUIT_FAILURE_THRESHOLD=3, N8N_CIRCUIT_COOLDOWN=60)
+class CircuitBreakerTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='cb_staff', email='cb_staff@test.com', password='pw', is_staff=True,
+        )
+        self.wf = N8NWorkflow.objects.create(
+            name='Refiner', trigger_event='event.refine',
+            configuration={'webhook_url': 'http://n8n-test/webhook/event-refine'}, is_active=True,
+        )
+
+    def _fail(self, times):
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.side_effect = ConnectionError('n8n down')
+            for _ in range(times):
+                with self.assertRaises(ConnectionError):
+                    trigger_workflow(self.wf, 1, {})
+        return mock_http
+
+    def _cool_down(self):
+        N8NWorkflow.objects.filter(pk=self.wf.pk).update(
+            circuit_opened_at=timezone.now() - timezone.timedelta(seconds=61),
+        )
+        self.wf.refresh_from_db()
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        self._fail(3)
+        self.wf.refresh_from_db()
+        self.assertEqual(circuit.state(self.wf), circuit.OPEN)
+
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            with self.assertRaises(circuit.CircuitOpenError):
+                trigger_workflow(self.wf, 1, {})
+            mock_http.post.assert_not_called()
+
+    def test_success_resets_consecutive_failures(self):
+        self._fail(2)
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.return_value.status_code = 200
+            trigger_workflow(self.wf, 1, {})
+        self._fail(2)
+        self.wf.refresh_from_db()
+        self.assertEqual((self.wf.error_count, circuit.state(self.wf)), (2, circuit.CLOSED))
+
+    def test_half_open_allows_one_probe(self):
+        self._fail(3)
+        self._cool_down()
+        self.assertEqual(circuit.state(self.wf), circuit.HALF_OPEN)
+
+        other = N8NWorkflow.objects.get(pk=self.wf.pk)
+        self.assertTrue(circuit.allow_request(self.wf))
+        self.assertFalse(circuit.allow_request(other))
+
+    def test_probe_outcome_closes_or_reopens(self):
+        self._fail(3)
+        self._cool_down()
+        self._fail(1)
+        self.wf.refresh_from_db()
+        self.assertEqual(circuit.state(self.wf), circuit.OPEN)
+
+        self._cool_down()
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.return_value.status_code = 200
+            trigger_workflow(self.wf, 1, {})
+        self.wf.refresh_from_db()
+        self.assertEqual((circuit.state(self.wf), self.wf.error_count), (circuit.CLOSED, 0))
+
+    def test_refine_falls_back_to_mock_while_open(self):
+        self._fail(3)
+        event = Event.objects.create(
+            title='CB', start=timezone.now(), created_by=self.staff,
+            generated_content={'social_post': 'Hi'},
+        )
+        self.client.force_authenticate(user=self.staff)
+        resp = self.client.post(
+            reverse('event-refine-content', kwargs={'pk': event.pk}),
+            {'refinement_prompt': 'shorter'}, format='json',
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['generation_meta']['generated_by'], 'mock-refine')
+
+    def test_state_visible_and_resettable_via_api(self):
+        self._fail(3)
+        self.client.force_authenticate(user=self.staff)
+        detail = reverse('n8n-workflow-detail', kwargs={'pk': self.wf.pk})
+        self.assertEqual(self.client.get(detail).data['circuit_state'], 'open')
+
+        resp = self.client.post(reverse('n8n-workflow-reset-circuit', kwargs={'pk': self.wf.pk}))
+        self.assertEqual((resp.data['circuit_state'], resp.data['error_count']), ('closed', 0))
+
+    def test_askai_only_counts_transport_errors_and_5xx(self):
+        N8NWorkflow.objects.create(
+            name='Ask', trigger_event='student.ask',
+            configuration={'webhook_url': 'http://n8n-test/webhook/ask'}, is_active=True,
+        )
+        ask = N8NWorkflow.objects.get(trigger_event='student.ask')
+        self.client.force_authenticate(user=self.staff)
+        url = reverse('askai-chat')
+
+        with patch('src.backend.askai.views.http') as mock_http:
+            mock_http.post.return_value.status_code = 422
+            mock_http.post.return_value.raise_for_status.side_effect = ValueError('bad payload')
+            for _ in range(3):
+                self.client.post(url, {'message': 'hi'}, format='json')
+        ask.refresh_from_db()
+        self.assertEqual((ask.error_count, circuit.state(ask)), (0, circuit.CLOSED))
+
+        with patch('src.backend.askai.views.http') as mock_http:
+            mock_http.post.return_value.status_code = 503
+            mock_http.post.return_value.raise_for_status.side_effect = ValueError('unavailable')
+            for _ in range(3):
+                self.client.post(url, {'message': 'hi'}, format='json')
+        ask.refresh_from_db()
+        self.assertEqual(circuit.state(ask), circuit.OPEN)
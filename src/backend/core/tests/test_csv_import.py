@@ -0,0 +1,78 @@
+"""
+Tests for the streaming CSV import (core/csv_import.py + EventViewSet.import_csv).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_csv_import
+"""
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from src.backend.core.csv_import import MultipartStream
+from src.backend.core.models import Event
+
+User = get_user_model()
+
+RICH_CSV = (
+    'Event_Title,Event_Date,Start_Time,Location,Target_Audience,Content_Remarks\r\n'
+    'Fee Deadline,2025-12-12,07:00,Academic Department,Students,Tone: formal\r\n'
+    'Staff Meeting,2025-12-13,09:00,N/A,Staff,\r\n'
+)
+
+
+def _upload(text, name='schedule.csv'):
+    return SimpleUploadedFile(name, text.encode('utf-8'), content_type='text/csv')
+
+
+class ImportCsvTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='csv_staff', email='csv_staff@test.com', password='pw', is_staff=True,
+        )
+        self.url = reverse('event-import-csv')
+        self.client.force_authenticate(user=self.staff)
+
+    def test_bad_header_and_rows_are_rejected(self):
+        resp = self.client.post(self.url, {'data': _upload('foo,bar\r\n1,2\r\n')}, format='multipart')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('header', resp.data['error'])
+
+        resp = self.client.post(self.url, {'data': _upload('title,start\r\nOK,2025-01-01T08:00\r\n,\r\n')},
+                                format='multipart')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data['row_errors'], [{'line': 3, 'error': 'Missing title, start'}])
+
+    @override_settings(EVENT_IMPORT_CHUNK_SIZE=1)
+    def test_local_mode_imports_in_chunks(self):
+        resp = self.client.post(self.url + '?mode=local', {'data': _upload(RICH_CSV)}, format='multipart')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data['created_count'], 2)
+        self.assertEqual(
+            list(Event.objects.order_by('id').values_list('title', 'visibility')),
+            [('Fee Deadline', 'public'), ('Staff Meeting', 'staff')],
+        )
+
+    @override_settings(N8N_IMPORT_WEBHOOK='http://n8n-test/webhook/import')
+    def test_upload_is_forwarded_as_streamed_multipart(self):
+        sent = {}
+
+        def post(url, data=None, headers=None, **kwargs):
+            # The upload is closed once the request ends — consume it here
+            sent.update(body=data, bytes=b''.join(data), content_type=headers['Content-Type'])
+            resp = MagicMock(status_code=200, content=b'{}')
+            resp.json.return_value = {'ok': True}
+            return resp
+
+        with patch('src.backend.core.http.post', side_effect=post):
+            resp = self.client.post(self.url, {'data': _upload(RICH_CSV)}, format='multipart')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('2 rows', resp.data['message'])
+        self.assertIsInstance(sent['body'], MultipartStream)
+        self.assertEqual(len(sent['bytes']), len(sent['body']))
+        self.assertIn(RICH_CSV.encode('utf-8'), sent['bytes'])
+        self.assertIn(sent['body'].boundary, sent['content_type'])
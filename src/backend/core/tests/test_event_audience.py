@@ -0,0 +1,154 @@
+"""
+Tests for the EventAudience index (core/audience.py + core/signals.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_event_audience
+"""
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.academic.models import Unit, SemesterOffering, Intake
+from src.backend.core import audience
+from src.backend.core.models import Event, EventAudience
+from src.backend.enrollment.models import Enrollment
+
+User = get_user_model()
+
+
+def _make_offering(code, intake=None):
+    unit = Unit.objects.create(code=code, name=f'Unit {code}', credit_points=12)
+    return SemesterOffering.objects.create(
+        unit=unit, year=2025, semester='S1', intake=intake,
+        enrollment_start=timezone.now() - timezone.timedelta(days=1),
+        enrollment_end=timezone.now() + timezone.timedelta(days=30),
+    )
+
+
+class EventAudienceIndexTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='aud_staff', email='aud_staff@test.com', password='pw', is_staff=True,
+        )
+        self.alice = User.objects.create_user(
+            username='alice', email='alice@test.com', password='pw', user_type='student',
+        )
+        self.bob = User.objects.create_user(
+            username='bob', email='bob@test.com', password='pw', user_type='student',
+        )
+        self.intake = Intake.objects.create(semester='S1', year=2025)
+        self.offering = _make_offering('AUD101', intake=self.intake)
+        self.event = Event.objects.create(
+            title='Targeted', start=timezone.now(), created_by=self.staff,
+        )
+
+    def _audience(self, event=None):
+        return set(EventAudience.objects.filter(event=event or self.event)
+                   .values_list('student_id', flat=True))
+
+    def test_direct_target_add_and_remove(self):
+        self.event.target_students.add(self.alice)
+        self.assertEqual(self._audience(), {self.alice.id})
+
+        self.event.target_students.remove(self.alice)
+        self.assertEqual(self._audience(), set())
+
+    def test_offering_target_follows_enrollments(self):
+        Enrollment.objects.create(student=self.alice, offering=self.offering)
+        self.event.target_offerings.add(self.offering)
+        self.assertEqual(self._audience(), {self.alice.id})
+
+        # Enrolling after the event was targeted is picked up incrementally
+        Enrollment.objects.create(student=self.bob, offering=self.offering)
+        self.assertEqual(self._audience(), {self.alice.id, self.bob.id})
+
+        Enrollment.objects.filter(student=self.bob).delete()
+        self.assertEqual(self._audience(), {self.alice.id})
+
+    def test_student_kept_when_still_reached_another_way(self):
+        Enrollment.objects.create(student=self.alice, offering=self.offering)
+        self.event.target_students.add(self.alice)
+        self.event.target_offerings.add(self.offering)
+
+        self.event.target_students.clear()
+        self.assertEqual(self._audience(), {self.alice.id})
+
+    def test_intake_target_and_offering_intake_change(self):
+        Enrollment.objects.create(student=self.alice, offering=self.offering)
+        self.event.target_intakes.add(self.intake)
+        self.assertEqual(self._audience(), {self.alice.id})
+
+        other = Intake.objects.create(semester='S2', year=2025)
+        self.offering.intake = other
+        self.offering.save()
+        self.assertEqual(self._audience(), set())
+
+    def test_reverse_clear_refreshes_events(self):
+        self.event.target_students.add(self.alice)
+        self.alice.targeted_events.clear()
+        self.assertEqual(self._audience(), set())
+
+    def test_get_targeted_students_uses_index(self):
+        self.event.target_students.add(self.alice)
+        self.assertEqual(list(self.event.get_targeted_students()), [self.alice])
+
+    def test_rebuild_repairs_drift(self):
+        self.event.target_students.add(self.alice)
+        EventAudience.objects.all().delete()
+        audience.rebuild_all()
+        self.assertEqual(self._audience(), {self.alice.id})
+
+    def test_student_list_only_returns_reached_events(self):
+        Enrollment.objects.create(student=self.alice, offering=self.offering)
+        self.event.target_offerings.add(self.offering)
+        Event.objects.create(title='Not for alice', start=timezone.now(), created_by=self.staff)
+        broadcast = Event.objects.create(
+            title='Broadcast', start=timezone.now(), created_by=self.staff,
+            target_all_students=True,
+        )
+
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.get(reverse('event-list'))
+        ids = {row['id'] for row in resp.data['results']}
+        self.assertEqual(ids, {self.event.id, broadcast.id})
+
+
+class EventAudienceStatsTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='stats_staff', email='stats_staff@test.com', password='pw', is_staff=True,
+        )
+        self.alice = User.objects.create_user(
+            username='stats_alice', email='stats_alice@test.com', password='pw', user_type='student',
+        )
+        self.intake = Intake.objects.create(semester='S1', year=2025)
+        self.offering = _make_offering('STA101', intake=self.intake)
+        self.event = Event.objects.create(title='Stats', start=timezone.now(), created_by=self.staff)
+
+    def test_stats_follow_targeting_and_enrollments(self):
+        self.event.target_offerings.add(self.offering)
+        self.event.target_intakes.add(self.intake)
+        stats = audience.audience_stats(self.event)
+        self.assertEqual(stats, {
+            'target_student_count': 0,
+            'target_offering_ids': [self.offering.id],
+            'target_intake_ids': [self.intake.id],
+        })
+
+        Enrollment.objects.create(student=self.alice, offering=self.offering)
+        self.assertEqual(audience.audience_stats(self.event)['target_student_count'], 1)
+
+        self.event.target_offerings.clear()
+        self.event.target_intakes.clear()
+        self.assertEqual(audience.audience_stats(self.event), {
+            'target_student_count': 0, 'target_offering_ids': [], 'target_intake_ids': [],
+        })
+
+    def test_refine_audience_context_is_a_single_read(self):
+        from src.backend.core.generation import audience_context_for
+
+        self.event.target_students.add(self.alice)
+        with self.assertNumQueries(1):
+            context = audience_context_for(self.event)
+        self.assertEqual(context['target_student_count'], 1)
@@ -0,0 +1,92 @@
+"""
+Tests for the bulk event import behind batch-create-webhook (core/event_import.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_event_import
+"""
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.academic.models import Unit, SemesterOffering, Intake
+from src.backend.core.models import Event, EventAudience
+from src.backend.enrollment.models import Enrollment
+
+User = get_user_model()
+
+
+class BatchCreateWebhookTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='imp_staff', email='imp_staff@test.com', password='pw', is_staff=True,
+        )
+        self.alice = User.objects.create_user(
+            username='imp_alice', email='imp_alice@test.com', password='pw', user_type='student',
+        )
+        self.intake = Intake.objects.create(semester='S1', year=2025)
+        unit = Unit.objects.create(code='IMP101', name='Import Unit', credit_points=12)
+        self.offering = SemesterOffering.objects.create(
+            unit=unit, year=2025, semester='S1', intake=self.intake,
+            enrollment_start=timezone.now() - timezone.timedelta(days=1),
+            enrollment_end=timezone.now() + timezone.timedelta(days=30),
+        )
+        self.url = reverse('event-batch-create-from-webhook')
+        self.client.force_authenticate(user=self.staff)
+
+    def _post(self, events):
+        return self.client.post(self.url, {'events': events}, format='json')
+
+    def test_mixed_shapes_are_bulk_created(self):
+        resp = self._post([
+            {'title': 'Simple', 'start': '2025-11-26T08:00:00', 'visibility': 'public',
+             'related_offering_id': self.offering.id},
+            {'Event_Title': 'Fee Deadline', 'Event_Date': '12/12/2025', 'Start_Time': '07:00',
+             'Target_Audience': 'Staff', 'Location': 'N/A', 'Content_Remarks': 'Tone: formal'},
+        ])
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.data['created_count'], resp.data['error_count']), (2, 0))
+
+        simple, csv_row = Event.objects.filter(pk__in=resp.data['created_ids']).order_by('id')
+        self.assertEqual((simple.related_offering_id, simple.created_by_id),
+                         (self.offering.id, self.staff.id))
+        self.assertEqual((csv_row.visibility, csv_row.location), ('staff', ''))
+        self.assertEqual(csv_row.generation_meta['csv_meta']['source'], 'csv_import')
+
+    def test_invalid_rows_are_reported_by_index(self):
+        resp = self._post([
+            {'title': 'Good', 'start': '2025-11-26T08:00:00'},
+            {'title': 'No start'},
+            {'title': 'Ghost student', 'start': '2025-11-26T08:00:00', 'target_students': [999999]},
+        ])
+        self.assertEqual((resp.data['created_count'], resp.data['error_count']), (1, 2))
+        self.assertEqual([e['index'] for e in resp.data['errors']], [1, 2])
+        self.assertIn('target_students', resp.data['errors'][1]['errors'])
+
+    def test_targets_and_audience_index_are_written(self):
+        Enrollment.objects.create(student=self.alice, offering=self.offering)
+        resp = self._post([
+            {'title': 'By intake', 'start': '2025-11-26T08:00:00',
+             'target_intakes': [{'id': self.intake.id}]},
+            {'title': 'By student', 'start': '2025-11-27T08:00:00',
+             'target_students': [self.alice.id]},
+        ])
+        by_intake, by_student = Event.objects.filter(pk__in=resp.data['created_ids']).order_by('id')
+        self.assertEqual(list(by_intake.target_intakes.all()), [self.intake])
+        self.assertEqual(list(by_student.target_students.all()), [self.alice])
+        for event in (by_intake, by_student):
+            self.assertTrue(EventAudience.objects.filter(event=event, student=self.alice).exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        # Kept under SQLite's bind-parameter limit so one INSERT covers the batch
+        rows = [{'title': f'E{i}', 'start': '2025-11-26T08:00:00'} for i in range(30)]
+        with self.assertNumQueries(self._queries_for(rows[:2])):
+            resp = self._post(rows)
+        self.assertEqual(resp.data['created_count'], 30)
+
+    def _queries_for(self, rows):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            self._post(rows)
+        return len(ctx.captured_queries)
@@ -0,0 +1,70 @@
+"""
+Tests for concurrent workflow fan-out (n8n_client.fan_out).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_fanout
+"""
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+from django.apps import apps
+from django.test import TestCase
+
+from src.backend.core.n8n_client import fan_out
+
+N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
+
+
+class FanOutTests(TestCase):
+    def setUp(self):
+        self.workflows = [
+            N8NWorkflow.objects.create(
+                name=name, trigger_event='event.generate',
+                configuration={'webhook_url': f'http://n8n-test/webhook/{name}'}, is_active=True,
+            )
+            for name in ('gcal', 'content', 'social')
+        ]
+
+    def test_workflows_are_called_concurrently(self):
+        barrier = threading.Barrier(len(self.workflows), timeout=5)
+
+        def post(url, **kwargs):
+            # Only passes if all three calls are in flight at the same time
+            barrier.wait()
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.json.return_value = {'url': url}
+            return resp
+
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.side_effect = post
+            started = time.monotonic()
+            results = fan_out(self.workflows, 7, {'event_id': '7'})
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual([r.workflow for r in results], self.workflows)
+        self.assertTrue(all(r.called and r.status_code == 200 for r in results))
+        self.assertEqual(
+            N8NExecutionLog.objects.filter(status='completed').count(), len(self.workflows),
+        )
+
+    def test_failures_are_logged_per_workflow(self):
+        def post(url, **kwargs):
+            if url.endswith('/gcal'):
+                raise ConnectionError('gcal down')
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.json.return_value = {}
+            return resp
+
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.side_effect = post
+            results = fan_out(self.workflows, 7, {})
+
+        self.assertEqual(results[0].error, 'gcal down')
+        log = N8NExecutionLog.objects.get(workflow=self.workflows[0])
+        self.assertEqual((log.status, log.error_details), ('failed', {'error': 'gcal down'}))
+        self.workflows[0].refresh_from_db()
+        self.assertEqual(self.workflows[0].error_count, 1)
@@ -0,0 +1,119 @@
+"""
+Tests for batch content generation (EventViewSet.generate_batch and the
+``event.generate_batch`` job in core/generation.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_generate_batch
+"""
+from unittest.mock import MagicMock, patch
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core import generation_cache, jobs
+from src.backend.core.generation import default_prompt
+from src.backend.core.models import BackgroundJob, Event
+
+User = get_user_model()
+N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
+
+
+def _response(status_code=200):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = {}
+    return resp
+
+
+@override_settings(N8N_GENERATION_BATCH_SIZE=2)
+class GenerateBatchTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='gb_staff', email='gb_staff@test.com', password='pw', is_staff=True,
+        )
+        self.events = [
+            Event.objects.create(title=f'Imported {i}', start=timezone.now(), created_by=self.staff)
+            for i in range(4)
+        ]
+        self.url = reverse('event-generate-batch')
+        self.client.force_authenticate(user=self.staff)
+
+    def _workflow(self, name, **config):
+        return N8NWorkflow.objects.create(
+            name=name, trigger_event='event.generate', is_active=True,
+            configuration={'webhook_url': f'http://n8n-test/webhook/{name}', **config},
+        )
+
+    def _progress(self, job_id):
+        return self.client.get(reverse('event-generate-batch-progress', kwargs={'job_id': job_id})).data
+
+    def test_batched_payloads_and_cache_hits(self):
+        wf = self._workflow('batch', batch=True)
+        cached = self.events[0]
+        generation_cache.store(generation_cache.cache_key(cached, default_prompt(cached), [wf.id]),
+                               {'social_post': 'From cache'})
+
+        resp = self.client.post(self.url, {'status': ['idle']}, format='json')
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual((resp.data['cached_count'], resp.data['queued_count']), (1, 3))
+        self.assertEqual(
+            sorted(Event.objects.values_list('generation_status', flat=True)),
+            ['pending', 'pending', 'pending', 'ready'],
+        )
+
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.return_value = _response()
+            self.assertEqual(jobs.run_pending(), 1)
+
+        # 3 events in batches of 2 → two requests instead of three
+        self.assertEqual(mock_http.post.call_count, 2)
+        sizes = sorted(len(c.kwargs['json']['payload']['events']) for c in mock_http.post.call_args_list)
+        self.assertEqual(sizes, [1, 2])
+        self.assertEqual(N8NExecutionLog.objects.filter(workflow=wf).count(), 2)
+
+        progress = self._progress(resp.data['job_id'])
+        self.assertEqual(progress['status'], 'succeeded')
+        self.assertEqual(progress['counts'], {'ready': 1, 'pending': 3})
+        dispatch = {row['id']: row['dispatch'] for row in progress['events']}
+        self.assertEqual(dispatch[cached.id], 'cached')
+        self.assertEqual({dispatch[e.id] for e in self.events[1:]}, {'sent'})
+
+    def test_retry_resends_only_rejected_events(self):
+        self._workflow('single')
+        first, second = self.events[:2]
+        job_id = self.client.post(self.url, {'event_ids': [first.id, second.id]}, format='json').data['job_id']
+
+        def post(url, json=None, **kwargs):
+            return _response(500 if json['event_id'] == str(second.id) else 200)
+
+        with patch('src.backend.core.n8n_client.http') as mock_http:
+            mock_http.post.side_effect = post
+            jobs.run_pending()
+            self.assertEqual(BackgroundJob.objects.get(pk=job_id).status, 'queued')
+            dispatch = {row['id']: row['dispatch'] for row in self._progress(job_id)['events']}
+            self.assertEqual(dispatch, {first.id: 'sent', second.id: 'failed'})
+
+            mock_http.post.reset_mock(side_effect=True)
+            mock_http.post.return_value = _response()
+            BackgroundJob.objects.filter(pk=job_id).update(run_after=timezone.now())
+            jobs.run_pending()
+
+        self.assertEqual(mock_http.post.call_count, 1)
+        self.assertEqual(mock_http.post.call_args.kwargs['json']['event_id'], str(second.id))
+        self.assertEqual(BackgroundJob.objects.get(pk=job_id).status, 'succeeded')
+
+    def test_without_workflows_events_are_mocked(self):
+        job_id = self.client.post(self.url, {}, format='json').data['job_id']
+        jobs.run_pending()
+        self.assertEqual(set(Event.objects.values_list('generation_status', flat=True)), {'ready'})
+        self.assertEqual(self._progress(job_id)['counts'], {'ready': 4})
+
+    def test_rejects_malformed_ids_and_days(self):
+        for body in ({'event_ids': ['x']}, {'event_ids': 3}, {'days': 'week'}, {'unit_id': 'abc'}):
+            self.assertEqual(self.client.post(self.url, body, format='json').status_code, 400, body)
+        self.assertFalse(BackgroundJob.objects.exists())
@@ -0,0 +1,92 @@
+"""
+Tests for the generated-content cache (core/generation_cache.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_generation_cache
+"""
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core import generation_cache
+from src.backend.core.models import BackgroundJob, Event, GenerationCacheEntry
+
+User = get_user_model()
+N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+
+START = timezone.make_aware(timezone.datetime(2025, 11, 26, 8, 0))
+
+
+@override_settings(N8N_WEBHOOK_SECRET='s3cret')
+class GenerationCacheTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='gc_staff', email='gc_staff@test.com', password='pw', is_staff=True,
+        )
+        self.workflow = N8NWorkflow.objects.create(
+            name='Generator', trigger_event='event.generate',
+            configuration={'webhook_url': 'http://n8n-test/webhook/generate'}, is_active=True,
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def _event(self, **kwargs):
+        fields = dict(title='Open Day', description='Campus tour', location='Hall A', start=START)
+        fields.update(kwargs)
+        return Event.objects.create(created_by=self.staff, **fields)
+
+    def _generate(self, event, **body):
+        return self.client.post(
+            reverse('event-generate-content', kwargs={'pk': event.pk}),
+            {'prompt': 'Write it', **body}, format='json',
+        )
+
+    def _callback(self, event, content):
+        return self.client.post(
+            reverse('event-generation-callback', kwargs={'pk': event.pk}),
+            {'generated_content': content, 'generation_meta': {'generated_by': 'n8n'}},
+            format='json', HTTP_X_N8N_SECRET='s3cret',
+        )
+
+    def test_identical_inputs_reuse_n8n_content(self):
+        first = self._event()
+        self.assertEqual(self._generate(first).status_code, 202)
+        self._callback(first, {'social_post': 'Come to Open Day'})
+        self.assertEqual(GenerationCacheEntry.objects.count(), 1)
+
+        # Same inputs on a re-imported event — served from cache, nothing queued
+        again = self._event()
+        resp = self._generate(again)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.data['cache_hit'])
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        again.refresh_from_db()
+        self.assertEqual((again.generation_status, again.generated_content),
+                         ('ready', {'social_post': 'Come to Open Day'}))
+
+    def test_changed_input_or_force_misses(self):
+        first = self._event()
+        self._generate(first)
+        self._callback(first, {'social_post': 'Hi'})
+
+        self.assertEqual(self._generate(self._event(location='Hall B')).status_code, 202)
+        self.assertEqual(self._generate(self._event(), force=True).status_code, 202)
+
+    def test_key_covers_workflow_set(self):
+        event = self._event()
+        key = generation_cache.cache_key(event, 'p', [self.workflow.id])
+        self.assertEqual(key, generation_cache.cache_key(event, 'p', [self.workflow.id]))
+        self.assertNotEqual(key, generation_cache.cache_key(event, 'p', [self.workflow.id, 99]))
+
+    @override_settings(GENERATION_CACHE_MAX_ENTRIES=2)
+    def test_expired_and_least_recently_used_are_evicted(self):
+        generation_cache.store('a', {'x': 1})
+        generation_cache.store('b', {'x': 2})
+        generation_cache.lookup('a')  # 'b' is now least recently used
+        generation_cache.store('c', {'x': 3})
+        self.assertEqual(set(GenerationCacheEntry.objects.values_list('key', flat=True)), {'a', 'c'})
+
+        GenerationCacheEntry.objects.filter(key='a').update(expires_at=timezone.now())
+        self.assertIsNone(generation_cache.lookup('a'))
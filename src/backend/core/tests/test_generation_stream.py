@@ -0,0 +1,103 @@
+"""
+Tests for the generation-status SSE stream (core/generation_stream.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_generation_stream
+"""
+import asyncio
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from src.backend.core.models import Event
+
+User = get_user_model()
+
+
+@override_settings(GENERATION_STREAM_POLL_INTERVAL=60, GENERATION_STREAM_HEARTBEAT=60)
+class GenerationStreamTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='sse_staff', email='sse_staff@test.com', password='pw', is_staff=True,
+        )
+        self.student = User.objects.create_user(
+            username='sse_student', email='sse_student@test.com', password='pw',
+        )
+        self.event = Event.objects.create(
+            title='Streamed', start=timezone.now(), created_by=self.staff, generation_status='pending',
+        )
+        self.url = reverse('event-generation-stream', kwargs={'pk': self.event.pk})
+
+    def _auth(self, user):
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    def _callback(self):
+        # As generation_callback does; on_commit runs the publish
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.generated_content = {'social_post': 'Hi'}
+            self.event.generation_status = 'ready'
+            self.event.save(update_fields=['generated_content', 'generation_status'])
+
+    async def test_requires_staff(self):
+        resp = await self.async_client.get(self.url)
+        self.assertEqual(resp.status_code, 401)
+        resp = await self.async_client.get(self.url, headers=self._auth(self.student))
+        self.assertEqual(resp.status_code, 403)
+
+    async def test_pushes_status_change(self):
+        resp = await self.async_client.get(self.url, headers=self._auth(self.staff))
+        self.assertEqual(resp['Content-Type'], 'text/event-stream')
+        stream = resp.streaming_content
+
+        first = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        self.assertIn(b'"generation_status": "pending"', first)
+
+        await sync_to_async(self._callback)()
+        pushed = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        self.assertIn(b'event: status', pushed)
+        self.assertIn(b'"generation_status": "ready"', pushed)
+        await stream.aclose()
+
+    async def test_one_stream_for_several_events(self):
+        other = await sync_to_async(Event.objects.create)(
+            title='Also streamed', start=timezone.now(), created_by=self.staff, generation_status='pending',
+        )
+        url = reverse('event-generation-streams') + f'?ids={self.event.pk},{other.pk}'
+        resp = await self.async_client.get(url, headers=self._auth(self.staff))
+        stream = resp.streaming_content
+
+        first = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        self.assertEqual(first.count(b'event: status'), 2)
+
+        await sync_to_async(self._callback)()
+        pushed = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        self.assertIn(f'"id": {self.event.pk}'.encode(), pushed)
+        self.assertIn(b'"generation_status": "ready"', pushed)
+        await stream.aclose()
+
+    def test_wsgi_answers_current_state_for_polling(self):
+        resp = self.client.get(self.url, headers=self._auth(self.staff))
+        self.assertFalse(resp.streaming)
+        self.assertIn(b'retry: ', resp.content)
+        self.assertIn(b'"generation_status": "pending"', resp.content)
+
+        resp = self.client.get(reverse('event-generation-streams') + '?ids=x', headers=self._auth(self.staff))
+        self.assertEqual(resp.status_code, 400)
+
+    async def test_streams_with_atomic_requests(self):
+        # prod.py sets ATOMIC_REQUESTS; the connection reads it from its own
+        # settings_dict, which override_settings(DATABASES=...) doesn't reach.
+        with patch.dict(connection.settings_dict, {'ATOMIC_REQUESTS': True}):
+            resp = await self.async_client.get(self.url, headers=self._auth(self.staff))
+            self.assertEqual(resp.status_code, 200)
+            await resp.streaming_content.aclose()
+            url = reverse('event-generation-streams') + f'?ids={self.event.pk}'
+            resp = await self.async_client.get(url, headers=self._auth(self.staff))
+            self.assertEqual(resp.status_code, 200)
+            await resp.streaming_content.aclose()
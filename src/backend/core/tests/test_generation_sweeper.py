@@ -0,0 +1,81 @@
+"""
+Tests for the generation timeout sweeper (core/generation_sweeper.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_generation_sweeper
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from src.backend.core import generation_sweeper
+from src.backend.core.models import BackgroundJob, Event
+
+User = get_user_model()
+
+
+@override_settings(GENERATION_TIMEOUT_RETRIES=1)
+class GenerationSweeperTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='sweep_staff', email='sweep_staff@test.com', password='pw', is_staff=True,
+        )
+        self.past = timezone.now() - timezone.timedelta(minutes=1)
+
+    def _event(self, **kwargs):
+        fields = dict(title='Swept', start=timezone.now(), created_by=self.staff,
+                      generation_status='pending', generation_timeout_at=self.past)
+        fields.update(kwargs)
+        return Event.objects.create(**fields)
+
+    def test_awaiting_callback_is_retried_once_then_failed(self):
+        event = self._event(generation_cache_key='k' * 64)
+
+        self.assertEqual(generation_sweeper.sweep(), (1, 1, 0))
+        event.refresh_from_db()
+        self.assertEqual((event.generation_status, event.generation_retries), ('pending', 1))
+        self.assertGreater(event.generation_timeout_at, timezone.now())
+        job = BackgroundJob.objects.get()
+        self.assertEqual((job.kind, job.payload['event_ids']), ('event.generate_batch', [event.id]))
+
+        # n8n stays silent past the new deadline too
+        Event.objects.filter(pk=event.pk).update(generation_timeout_at=self.past)
+        self.assertEqual(generation_sweeper.sweep(), (1, 0, 1))
+        event.refresh_from_db()
+        self.assertEqual((event.generation_status, event.generation_timeout_at), ('failed', None))
+
+    def test_retry_resends_original_prompt_and_requester(self):
+        custom = self._event(generation_cache_key='a' * 64, generation_prompt='Write a haiku',
+                             generation_requested_by=self.staff)
+        default = self._event(generation_cache_key='b' * 64)
+
+        self.assertEqual(generation_sweeper.sweep(), (2, 2, 0))
+        payloads = sorted(
+            (job.payload['event_ids'], job.payload['prompt'], job.payload['triggered_by'])
+            for job in BackgroundJob.objects.all()
+        )
+        self.assertEqual(payloads, [
+            ([custom.id], 'Write a haiku', self.staff.id),
+            ([default.id], '', None),
+        ])
+
+    def test_only_due_pending_rows_are_swept(self):
+        stuck_refine = self._event()
+        not_due = self._event(generation_timeout_at=timezone.now() + timezone.timedelta(minutes=5))
+        ready = self._event(generation_status='ready')
+
+        self.assertEqual(generation_sweeper.sweep(), (1, 0, 1))
+        statuses = dict(Event.objects.values_list('id', 'generation_status'))
+        self.assertEqual(statuses, {stuck_refine.id: 'failed', not_due.id: 'pending', ready.id: 'ready'})
+        self.assertFalse(BackgroundJob.objects.exists())
+
+    def test_command_sweeps_in_batches(self):
+        for _ in range(3):
+            self._event()
+        out = StringIO()
+        call_command('sweep_generation_timeouts', '--batch-size', '2', stdout=out)
+        self.assertIn('Swept 3 timed-out generations (0 retried, 3 failed)', out.getvalue())
+        self.assertFalse(Event.objects.filter(generation_status='pending').exists())
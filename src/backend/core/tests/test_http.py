@@ -0,0 +1,42 @@
+"""
+Tests for the shared outbound HTTP client (core/http.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_http
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from src.backend.core import http
+
+
+class SharedHttpClientTests(SimpleTestCase):
+    def setUp(self):
+        http.reset_session()
+        self.addCleanup(http.reset_session)
+
+    def test_session_is_shared(self):
+        self.assertIs(http.get_session(), http.get_session())
+
+    @override_settings(OUTBOUND_HTTP_RETRIES=4)
+    def test_post_is_not_retried_on_gateway_errors(self):
+        retry = http.get_session().get_adapter('https://n8n.example/').max_retries
+        self.assertEqual(retry.total, 4)
+        self.assertIn(502, retry.status_forcelist)
+        # Status / read retries only apply to idempotent methods
+        self.assertNotIn('POST', retry.allowed_methods)
+        self.assertIn('GET', retry.allowed_methods)
+
+    @override_settings(OUTBOUND_HTTP_TIMEOUT=30, OUTBOUND_HTTP_CONNECT_TIMEOUT=5)
+    def test_timeouts(self):
+        with patch.object(http.get_session(), 'post') as post:
+            http.post('http://n8n.example/hook', json={})
+            http.post('http://n8n.example/hook', json={}, timeout=60)
+        self.assertEqual([c.kwargs['timeout'] for c in post.call_args_list], [(5, 30), (5, 60)])
+
+    def test_workflow_timeout_override(self):
+        wf = SimpleNamespace(configuration={'timeout': '12'})
+        self.assertEqual(http.workflow_timeout(wf, 60), 12.0)
+        self.assertEqual(http.workflow_timeout(SimpleNamespace(configuration={}), 60), 60)
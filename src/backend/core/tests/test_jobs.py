@@ -0,0 +1,143 @@
+"""
+Tests for the background job queue (core/jobs.py) and the generation /
+refinement handlers (core/generation.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_jobs
+"""
+from unittest.mock import patch, MagicMock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core import jobs
+from src.backend.core.models import BackgroundJob, Event
+
+User = get_user_model()
+N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+
+
+def _ok_response(body=None, status_code=200):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = body or {}
+    return resp
+
+
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='job_staff', email='job_staff@test.com', password='pw', is_staff=True,
+        )
+        self.event = Event.objects.create(
+            title='Queued', start=timezone.now(), created_by=self.staff,
+            generated_content={'social_post': 'Original'}, generation_status='ready',
+        )
+        self.refiner = N8NWorkflow.objects.create(
+            name='Refiner', trigger_event='event.refine',
+            configuration={'webhook_url': 'http://n8n-test/webhook/event-refine'}, is_active=True,
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def _refine(self, prompt='shorter please'):
+        return self.client.post(
+            reverse('event-refine-content', kwargs={'pk': self.event.pk}),
+            {'refinement_prompt': prompt}, format='json',
+        )
+
+    def test_refine_enqueues_without_calling_n8n(self):
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            resp = self._refine()
+            mock_req.post.assert_not_called()
+
+        self.assertEqual(resp.status_code, 202)
+        job = BackgroundJob.objects.get(pk=resp.data['job_id'])
+        self.assertEqual((job.kind, job.status), ('event.refine', 'queued'))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.generation_status, 'pending')
+        self.assertIsNotNone(self.event.generation_timeout_at)
+
+    def test_worker_stores_refined_content(self):
+        job_id = self._refine().data['job_id']
+        refined = {'generated_content': {'social_post': 'Refined'}, 'generation_meta': {'tone': 'crisp'}}
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.return_value = _ok_response(refined)
+            self.assertEqual(jobs.run_pending(), 1)
+
+        job = BackgroundJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result['generated_content'], {'social_post': 'Refined'})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.generation_status, 'ready')
+        self.assertEqual(self.event.generated_content, {'social_post': 'Refined'})
+
+        status_resp = self.client.get(reverse('job-detail', kwargs={'pk': job_id}))
+        self.assertEqual(status_resp.data['status'], 'succeeded')
+
+    def test_failures_retry_then_restore_status(self):
+        job_id = self._refine().data['job_id']
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.side_effect = ConnectionError('n8n down')
+            for attempt in range(1, 4):
+                # Make the backed-off job runnable again
+                BackgroundJob.objects.filter(pk=job_id).update(run_after=timezone.now())
+                self.assertEqual(jobs.run_pending(), 1)
+                job = BackgroundJob.objects.get(pk=job_id)
+                self.assertEqual(job.attempts, attempt)
+
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('n8n down', job.last_error)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.generation_status, 'ready')
+        self.assertEqual(self.event.generated_content, {'social_post': 'Original'})
+
+    def test_retry_is_backed_off(self):
+        self._refine()
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.side_effect = ConnectionError('n8n down')
+            self.assertEqual(jobs.run_pending(), 1)
+            # Not runnable again until run_after has passed
+            self.assertEqual(jobs.run_pending(), 0)
+
+    def test_stale_running_job_is_requeued(self):
+        job = jobs.enqueue('event.refine', {'event_id': self.event.id})
+        jobs.claim_jobs(1, worker_id='dead-worker')
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timezone.timedelta(hours=1),
+        )
+
+        self.assertEqual(jobs.requeue_stale(stale_after=60), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+
+    def test_users_only_see_their_own_jobs(self):
+        other = User.objects.create_user(username='other', email='other@test.com', password='pw')
+        jobs.enqueue('event.refine', {'event_id': self.event.id}, created_by=self.staff)
+
+        self.client.force_authenticate(user=other)
+        resp = self.client.get(reverse('job-list'))
+        self.assertEqual(resp.data['results'], [])
+
+    def test_generate_enqueues_when_workflow_active(self):
+        N8NWorkflow.objects.create(
+            name='Generator', trigger_event='event.generate',
+            configuration={'webhook_url': 'http://n8n-test/webhook/generate'}, is_active=True,
+        )
+        resp = self.client.post(reverse('event-generate-content', kwargs={'pk': self.event.pk}))
+        self.assertEqual(resp.status_code, 202)
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.return_value = _ok_response()
+            jobs.run_pending()
+            payload = mock_req.post.call_args.kwargs['json']['payload']
+
+        self.assertEqual(payload['event_id'], str(self.event.id))
+        self.assertEqual(BackgroundJob.objects.get(pk=resp.data['job_id']).status, 'succeeded')
+        self.event.refresh_from_db()
+        # n8n answers through generation_callback; until then the event stays pending
+        self.assertEqual(self.event.generation_status, 'pending')
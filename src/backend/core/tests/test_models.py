@@ -88,8 +88,8 @@ class CoreAPITest(APITestCase):
         url = reverse('event-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'API Test Event')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], 'API Test Event')
 
     def test_create_ticket(self):
         """Test that students can create tickets"""
@@ -0,0 +1,70 @@
+"""
+Tests for the per-user unread notification counters (NotificationCounter).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_notification_counters
+"""
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from src.backend.core import notifications
+from src.backend.core.models import Notification, NotificationCounter
+
+User = get_user_model()
+
+
+class NotificationCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='badge_user', email='badge_user@test.com', password='pw',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _notify(self, **kwargs):
+        return Notification.objects.create(recipient=self.user, verb='Hello', **kwargs)
+
+    def _badge(self):
+        return self.client.get(reverse('notification-unread-count')).data['unread']
+
+    def test_counter_follows_create_read_and_delete(self):
+        first, second, third = self._notify(), self._notify(), self._notify()
+        self._notify(unread=False)
+        self.assertEqual(self._badge(), 3)
+
+        resp = self.client.patch(reverse('notification-detail', kwargs={'pk': first.pk}),
+                                 {'unread': False}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._badge(), 2)
+
+        second.delete()  # soft delete
+        Notification.objects.filter(pk=third.pk).delete()
+        self.assertEqual(self._badge(), 0)
+
+    def test_badge_is_a_single_query(self):
+        self._notify()
+        with self.assertNumQueries(1):
+            notifications.unread_count(self.user)
+
+    def test_mark_all_read(self):
+        for _ in range(3):
+            self._notify()
+        resp = self.client.post(reverse('notification-mark-all-read'))
+        self.assertEqual(resp.data['marked_read'], 3)
+        self.assertEqual(self._badge(), 0)
+        self.assertFalse(Notification.objects.filter(unread=True).exists())
+
+    def test_mark_all_read_keeps_concurrent_increments(self):
+        for _ in range(3):
+            self._notify()
+        # +1 from a notification whose row the mark-all UPDATE cannot see yet
+        notifications.adjust_unread([self.user.pk])
+        self.assertEqual(notifications.mark_all_read(self.user), 3)
+        self.assertEqual(self._badge(), 1)
+
+    def test_rebuild_repairs_drift(self):
+        self._notify()
+        self._notify()
+        NotificationCounter.objects.filter(user=self.user).update(unread=7)
+        notifications.rebuild_unread_counts()
+        self.assertEqual(self._badge(), 2)
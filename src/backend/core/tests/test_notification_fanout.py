@@ -0,0 +1,88 @@
+"""
+Tests for the publish-time notification fan-out (core/notifications.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_notification_fanout
+"""
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core import jobs, notifications
+from src.backend.core.models import BackgroundJob, Event, Notification, NotificationFanout
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_FANOUT_CHUNK_SIZE=10)
+class NotificationFanoutTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='fan_staff', email='fan_staff@test.com', password='pw', is_staff=True,
+            user_type='staff',
+        )
+        User.objects.bulk_create([
+            User(username=f'fan_s{i}', email=f'fan_s{i}@test.com', user_type='student')
+            for i in range(25)
+        ])
+        self.students = list(User.objects.filter(user_type='student').order_by('pk'))
+        self.event = Event.objects.create(
+            title='Open Day', start=timezone.now(), created_by=self.staff, target_all_students=True,
+            generated_content={'social_post': 'Come along'}, visibility='staff',
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def _confirm(self, visibility='public'):
+        return self.client.post(reverse('event-confirm-content', kwargs={'pk': self.event.pk}),
+                                {'visibility': visibility}, format='json')
+
+    def test_confirm_notifies_every_student_once(self):
+        resp = self._confirm()
+        self.assertIsNotNone(resp.data['notification_fanout_id'])
+
+        jobs.run_pending()  # 25 recipients in chunks of 10
+        self.assertEqual(
+            set(Notification.objects.filter(target_object_id=self.event.pk).values_list('recipient_id', flat=True)),
+            {s.pk for s in self.students},
+        )
+        progress = self.client.get(reverse('event-notification-fanout', kwargs={'pk': self.event.pk})).data
+        self.assertEqual([(f['status'], f['sent'], f['total']) for f in progress], [('done', 25, 25)])
+        self.assertEqual(notifications.unread_count(self.students[-1]), 1)
+
+        # Publishing again does not re-notify
+        self._confirm()
+        self.assertEqual(jobs.run_pending(), 0)
+        self.assertEqual(Notification.objects.count(), 25)
+
+    def test_interrupted_fanout_resumes_after_cursor(self):
+        self.event.visibility = 'public'
+        self.event.save()
+        fanout = notifications.publish_event(self.event, actor=self.staff)
+        # A previous run committed the first chunk and then died
+        first = self.students[:10]
+        Notification.objects.bulk_create([
+            Notification(recipient=s, verb=fanout.verb, target_object_id=self.event.pk) for s in first
+        ])
+        NotificationFanout.objects.filter(pk=fanout.pk).update(status='running', cursor=first[-1].pk, sent=10)
+
+        jobs.run_pending()
+        fanout.refresh_from_db()
+        self.assertEqual((fanout.status, fanout.sent, fanout.total), ('done', 25, 25))
+        self.assertEqual(Notification.objects.count(), 25)
+
+    def test_targeted_and_staff_only_events(self):
+        self.event.target_all_students = False
+        self.event.save()
+        self.event.target_students.add(self.students[0], self.students[3])
+
+        self._confirm(visibility='staff')
+        self.assertFalse(BackgroundJob.objects.exists())
+
+        self._confirm(visibility='unit')
+        jobs.run_pending()
+        self.assertEqual(
+            set(Notification.objects.values_list('recipient_id', flat=True)),
+            {self.students[0].pk, self.students[3].pk},
+        )
@@ -0,0 +1,70 @@
+"""
+Tests for archiving old read notifications (core/notification_retention.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_notification_retention
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core import notification_retention, notifications
+from src.backend.core.models import Notification, NotificationArchive
+
+User = get_user_model()
+
+
+class NotificationRetentionTests(APITestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(
+            username='ret_student', email='ret_student@test.com', password='pw', user_type='student',
+        )
+        self.old = timezone.now() - timezone.timedelta(days=120)
+
+    def _notify(self, verb, unread=False, created_at=None):
+        notification = Notification.objects.create(recipient=self.student, verb=verb, unread=unread)
+        if created_at:
+            # created_at is auto_now — backdate it afterwards
+            Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        return notification
+
+    def test_only_old_read_notifications_are_archived(self):
+        old_read = [self._notify(f'old read {i}', created_at=self.old) for i in range(5)]
+        old_unread = self._notify('old unread', unread=True, created_at=self.old)
+        recent_read = self._notify('recent read')
+
+        self.assertEqual(notification_retention.archive_read(older_than_days=90, batch_size=2), 5)
+        self.assertEqual(
+            set(Notification.objects.values_list('id', flat=True)), {old_unread.id, recent_read.id},
+        )
+        self.assertEqual(
+            set(NotificationArchive.objects.values_list('original_id', flat=True)), {n.id for n in old_read},
+        )
+        archived = NotificationArchive.objects.get(original_id=old_read[0].id)
+        self.assertEqual((archived.recipient_id, archived.verb, archived.created_at),
+                         (self.student.pk, 'old read 0', self.old))
+        self.assertEqual(notifications.unread_count(self.student), 1)
+
+        # Nothing left to move
+        self.assertEqual(notification_retention.archive_read(older_than_days=90), 0)
+
+    def test_archived_endpoint_lists_own_archive(self):
+        other = User.objects.create_user(username='ret_other', email='ret_other@test.com', password='pw')
+        self._notify('mine', created_at=self.old)
+        Notification.objects.filter(
+            pk=Notification.objects.create(recipient=other, verb='theirs', unread=False).pk,
+        ).update(created_at=self.old)
+        out = StringIO()
+        call_command('archive_notifications', '--days', '30', stdout=out)
+        self.assertIn('Archived 2 read notifications older than 30 days', out.getvalue())
+
+        self.client.force_authenticate(user=self.student)
+        resp = self.client.get(reverse('notification-archived'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([row['verb'] for row in resp.data['results']], ['mine'])
+        self.assertFalse(resp.data['results'][0]['unread'])
+        self.assertEqual(self.client.get(reverse('notification-list')).data['results'], [])
@@ -0,0 +1,175 @@
+"""
+Tests for the transactional outbox (core/outbox.py) that replaced the
+per-save daemon threads for attendance.marked / enrollment.confirmed.
+
+Run with:
+    python manage.py test src.backend.core.tests.test_outbox
+"""
+from unittest.mock import patch, MagicMock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from src.backend.academic.models import Unit, SemesterOffering
+from src.backend.core import outbox
+from src.backend.core.models import AttendanceRecord, OutboxMessage, Session
+from src.backend.enrollment.models import Enrollment
+
+User = get_user_model()
+N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
+
+
+def _response(status_code=200):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = {'ok': True}
+    return resp
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.unit = Unit.objects.create(code='OBX101', name='Outbox', credit_points=12)
+        self.session = Session.objects.create(
+            unit=self.unit, date=timezone.now().date(), start_time='09:00',
+        )
+        self.students = [
+            User.objects.create_user(
+                username=f'obx{i}', email=f'obx{i}@test.com', password='pw', user_type='student',
+            )
+            for i in range(3)
+        ]
+
+    def _workflow(self, name, trigger='attendance.marked'):
+        return N8NWorkflow.objects.create(
+            name=name, trigger_event=trigger,
+            configuration={'webhook_url': f'http://n8n-test/webhook/{name}'}, is_active=True,
+        )
+
+    def _mark(self, student, status='present'):
+        return AttendanceRecord.objects.create(session=self.session, student=student, status=status)
+
+    def test_present_attendance_writes_outbox_row_only(self):
+        with patch('threading.Thread') as thread:
+            record = self._mark(self.students[0])
+            self._mark(self.students[1], status='absent')
+            thread.assert_not_called()
+
+        self.assertEqual(
+            list(OutboxMessage.objects.values_list('topic', 'object_id', 'status')),
+            [('attendance.marked', record.pk, 'pending')],
+        )
+
+    def test_rolled_back_change_leaves_no_message(self):
+        try:
+            with transaction.atomic():
+                self._mark(self.students[0])
+                raise RuntimeError('abort')
+        except RuntimeError:
+            pass
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_drain_delivers_batch(self):
+        wf = self._workflow('attendance')
+        records = [self._mark(s) for s in self.students]
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.return_value = _response()
+            self.assertEqual(outbox.drain(), 3)
+
+        sent = {call.kwargs['json']['payload']['student_id'] for call in mock_req.post.call_args_list}
+        self.assertEqual(sent, {s.id for s in self.students})
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list('status', flat=True)), {'sent'},
+        )
+        self.assertEqual(N8NExecutionLog.objects.filter(workflow=wf, status='completed').count(),
+                         len(records))
+        wf.refresh_from_db()
+        self.assertIsNotNone(wf.last_run)
+
+    def test_retry_only_resends_to_failed_workflow(self):
+        good = self._workflow('good')
+        bad = self._workflow('bad')
+        self._mark(self.students[0])
+
+        def post(url, **kwargs):
+            return _response(500 if url.endswith('/bad') else 200)
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.side_effect = post
+            outbox.drain()
+            msg = OutboxMessage.objects.get()
+            self.assertEqual((msg.status, msg.delivered_to), ('pending', [good.id]))
+
+            mock_req.post.reset_mock()
+            OutboxMessage.objects.update(available_at=timezone.now())
+            outbox.drain()
+
+        urls = [call.args[0] for call in mock_req.post.call_args_list]
+        self.assertEqual(urls, ['http://n8n-test/webhook/bad'])
+        bad.refresh_from_db()
+        self.assertEqual(bad.error_count, 2)  # 5xx counts against the circuit breaker
+
+    @override_settings(N8N_CIRCUIT_COOLDOWN=60, OUTBOX_MAX_ATTEMPTS=1)
+    def test_open_circuit_defers_without_spending_attempts(self):
+        opened_at = timezone.now()
+        self._workflow('down')
+        N8NWorkflow.objects.update(error_count=5, circuit_opened_at=opened_at)
+        self._mark(self.students[0])
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            outbox.drain()
+            mock_req.post.assert_not_called()
+        msg = OutboxMessage.objects.get()
+        self.assertEqual((msg.status, msg.attempts), ('pending', 0))
+        self.assertEqual(msg.available_at, opened_at + timezone.timedelta(seconds=60))
+
+    def test_batch_message_is_one_post_for_batch_workflows(self):
+        records = [self._mark(student) for student in self.students]
+        OutboxMessage.objects.all().delete()
+        outbox.emit_batch('attendance.marked', [record.pk for record in records])
+        batched = self._workflow('batched')
+        N8NWorkflow.objects.filter(pk=batched.pk).update(
+            configuration={'webhook_url': 'http://n8n-test/webhook/batched', 'batch': True},
+        )
+        self._workflow('single')
+
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.return_value = _response()
+            outbox.drain()
+
+        calls = [(c.args[0], c.kwargs['json']['payload']) for c in mock_req.post.call_args_list]
+        batch_calls = [payload for url, payload in calls if url.endswith('/batched')]
+        self.assertEqual(len(batch_calls), 1)
+        self.assertEqual(len(batch_calls[0]['items']), 3)
+        self.assertEqual(len([url for url, _ in calls if url.endswith('/single')]), 3)
+        self.assertEqual(OutboxMessage.objects.get().status, 'sent')
+
+    def test_no_active_workflow_marks_sent_without_calls(self):
+        self._mark(self.students[0])
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            outbox.drain()
+            mock_req.post.assert_not_called()
+        self.assertEqual(OutboxMessage.objects.get().status, 'sent')
+
+    def test_enrollment_confirmed_is_queued(self):
+        offering = SemesterOffering.objects.create(
+            unit=self.unit, year=2025, semester='S1',
+            enrollment_start=timezone.now() - timezone.timedelta(days=1),
+            enrollment_end=timezone.now() + timezone.timedelta(days=30),
+        )
+        enrollment = Enrollment.objects.create(student=self.students[0], offering=offering)
+        enrollment.status = 'ENROLLED'
+        enrollment.save()
+
+        self._workflow('enrol', trigger='enrollment.confirmed')
+        with patch('src.backend.core.n8n_client.http') as mock_req:
+            mock_req.post.return_value = _response()
+            outbox.drain()
+
+        payload = mock_req.post.call_args.kwargs['json']['payload']
+        self.assertEqual(payload['enrollment_id'], enrollment.pk)
+        self.assertEqual(payload['unit_code'], 'OBX101')
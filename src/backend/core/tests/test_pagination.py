@@ -0,0 +1,85 @@
+"""
+Tests for keyset pagination on the event / notification lists (core/pagination.py).
+
+Run with:
+    python manage.py test src.backend.core.tests.test_pagination
+"""
+import base64
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from src.backend.core.models import Event, Notification
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='page_staff', email='page_staff@test.com', password='pw', is_staff=True,
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def _walk(self, url):
+        """Follow ``next`` links and return every row id in order."""
+        ids = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            ids.extend(row['id'] for row in resp.data['results'])
+            url = resp.data['next']
+        return ids
+
+    def test_events_with_identical_start_are_not_skipped_or_repeated(self):
+        start = timezone.now()
+        events = [
+            Event.objects.create(title=f'E{i}', start=start, created_by=self.staff)
+            for i in range(7)
+        ]
+        older = Event.objects.create(
+            title='Older', start=start - timezone.timedelta(days=1), created_by=self.staff,
+        )
+
+        ids = self._walk(reverse('event-list') + '?page_size=3')
+
+        expected = [e.id for e in sorted(events, key=lambda e: e.id, reverse=True)] + [older.id]
+        self.assertEqual(ids, expected)
+
+    def test_page_size_is_capped(self):
+        for i in range(3):
+            Event.objects.create(title=f'E{i}', start=timezone.now(), created_by=self.staff)
+        resp = self.client.get(reverse('event-list') + '?page_size=100000')
+        self.assertEqual(len(resp.data['results']), 3)
+        self.assertIsNone(resp.data['next'])
+
+    def test_invalid_cursor_returns_404(self):
+        resp = self.client.get(reverse('event-list') + '?cursor=not-a-cursor')
+        self.assertEqual(resp.status_code, 404)
+        # Well-formed JSON whose tie-breaker is not an id, or a null tie-breaker
+        for position in ('["2025-01-01T00:00:00", "x"]', '["2025-01-01T00:00:00", null]'):
+            cursor = base64.urlsafe_b64encode(position.encode()).decode()
+            resp = self.client.get(reverse('event-list') + f'?cursor={cursor}')
+            self.assertEqual(resp.status_code, 404)
+
+    def test_notifications_paginate_newest_first(self):
+        created = [
+            Notification.objects.create(recipient=self.staff, verb=f'n{i}')
+            for i in range(5)
+        ]
+        ids = self._walk(reverse('notification-list') + '?page_size=2')
+        self.assertEqual(ids, [n.id for n in reversed(created)])
+
+    def test_rows_without_created_at_do_not_end_the_feed(self):
+        created = [
+            Notification.objects.create(recipient=self.staff, verb=f'n{i}')
+            for i in range(5)
+        ]
+        legacy = [created[1].id, created[3].id]
+        Notification.objects.filter(id__in=legacy).update(created_at=None)
+
+        ids = self._walk(reverse('notification-list') + '?page_size=1')
+        keyed = [n.id for n in reversed(created) if n.id not in legacy]
+        self.assertEqual(ids, sorted(legacy, reverse=True) + keyed)
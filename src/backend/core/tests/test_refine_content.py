@@ -24,6 +24,7 @@ from hypothesis.extra.django import TestCase as HypothesisTestCase
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.backend.core.jobs import run_pending
 from src.backend.core.models import Event
 
 User = get_user_model()
@@ -106,7 +107,7 @@ class TestProperty1ValidStaffReturns202(HypothesisTestCase):
         wf = _make_wf4_record()
 
         try:
-            with patch('src.backend.core.n8n_client.requests') as mock_req:
+            with patch('src.backend.core.n8n_client.http') as mock_req:
                 mock_resp = MagicMock()
                 mock_resp.status_code = 200
                 mock_resp.json.return_value = {}
@@ -232,7 +233,7 @@ class TestProperty4PayloadStructure(HypothesisTestCase):
         captured = {}
 
         try:
-            with patch('src.backend.core.n8n_client.requests') as mock_req:
+            with patch('src.backend.core.n8n_client.http') as mock_req:
                 def capture_post(url, json=None, **kw):
                     if json:
                         captured.update(json)
@@ -248,6 +249,8 @@ class TestProperty4PayloadStructure(HypothesisTestCase):
                     {'refinement_prompt': prompt},
                     format='json',
                 )
+                # The n8n call happens in the background worker
+                run_pending()
 
             if resp.status_code == status.HTTP_202_ACCEPTED:
                 # n8n_client wraps payload under 'payload' key
@@ -0,0 +1,77 @@
+"""
+Tests for TrackedFieldsMixin (core/base_models.py) and the signals that
+compare stored and new values with it.
+
+Run with:
+    python manage.py test src.backend.core.tests.test_tracked_fields
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from src.backend.academic.models import Unit
+from src.backend.core import generation_stream
+from src.backend.core.models import AttendanceRecord, Event, OutboxMessage, Session, Ticket
+
+User = get_user_model()
+
+
+class TrackedFieldsTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='track_staff', email='track_staff@test.com', password='pw', is_staff=True,
+            user_type='staff',
+        )
+        self.student = User.objects.create_user(
+            username='track_student', email='track_student@test.com', password='pw', user_type='student',
+        )
+
+    def test_stored_values_follow_load_save_and_refresh(self):
+        ticket = Ticket.objects.create(title='Broken projector', submitter=self.student)
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        self.assertEqual(ticket.changed_fields(), set())
+
+        ticket.status = 'in_progress'
+        ticket.assigned_to = self.staff
+        self.assertEqual(ticket.changed_fields(), {'status', 'assigned_to'})
+        self.assertEqual(ticket.stored_value('status'), 'open')
+
+        ticket.save(update_fields=['status'])
+        self.assertEqual(ticket.changed_fields(), {'assigned_to'})
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.changed_fields(), set())
+
+        deferred = Ticket.objects.only('title').get(pk=ticket.pk)
+        self.assertFalse(deferred.is_tracked('status'))
+        with self.assertNumQueries(1):  # the UPDATE; untouched deferred fields are not read
+            deferred.save(update_fields=['title'])
+
+    def test_attendance_marked_once_per_change_to_present(self):
+        unit = Unit.objects.create(code='TRK101', name='Tracking', credit_points=6)
+        session = Session.objects.create(unit=unit, date=timezone.now().date(), start_time='09:00')
+        record = AttendanceRecord.objects.create(session=session, student=self.student, status='present')
+        record.notes = 'arrived on time'
+        record.save()
+        self.assertEqual(OutboxMessage.objects.filter(topic='attendance.marked').count(), 1)
+
+        record.status = 'absent'
+        record.save()
+        record.status = 'present'
+        record.save()
+        self.assertEqual(OutboxMessage.objects.filter(topic='attendance.marked').count(), 2)
+
+    def test_event_full_save_publishes_only_generation_changes(self):
+        event = Event.objects.create(title='Open Day', start=timezone.now(), created_by=self.staff)
+        event = Event.objects.get(pk=event.pk)
+        with mock.patch.object(generation_stream, 'publish') as publish:
+            event.title = 'Open Day 2026'
+            event.save()
+            publish.assert_not_called()
+
+            event.generated_content = {'social_post': 'Come along'}
+            event.save()
+            event.generated_content['social_post'] = 'Come along!'  # mutated in place
+            event.save()
+            self.assertEqual(publish.call_count, 2)
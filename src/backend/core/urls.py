@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .calendar_feed import calendar_feed
+from .generation_stream import generation_stream, generation_streams
 from .views_api import (
     EventViewSet, SessionViewSet, AttendanceViewSet,
     TicketViewSet, TicketCommentViewSet,
     FormViewSet, FormSubmissionViewSet,
     NotificationViewSet,
-    ResourceViewSet, PageViewSet, MediaAssetViewSet
+    ResourceViewSet, PageViewSet, MediaAssetViewSet,
+    BackgroundJobViewSet,
 )
 
 router = DefaultRouter()
@@ -20,8 +23,15 @@ router.register('notifications', NotificationViewSet, basename='notification')
 router.register('resources', ResourceViewSet, basename='resource')
 router.register('pages', PageViewSet, basename='page')
 router.register('media', MediaAssetViewSet, basename='media')
+router.register('jobs', BackgroundJobViewSet, basename='job')
 
 urlpatterns = [
+    # Async SSE endpoints — served by the ASGI app (config/asgi.py).  Listed
+    # before the router, whose events/<pk>/ route would match the first one.
+    path('events/generation-stream/', generation_streams, name='event-generation-streams'),
+    path('events/<int:pk>/generation-stream/', generation_stream, name='event-generation-stream'),
     # Mounted at /api/core/ in project urls.py — router routes will be available at /api/core/<resource>/
     path('', include(router.urls)),
+    # Subscribable .ics feed — authenticated by the signed token in the URL
+    path('calendar/<str:token>.ics', calendar_feed, name='calendar-feed'),
 ]
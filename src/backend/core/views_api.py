@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.db.models import Q
 
 from . import models, serializers
+from .pagination import EventStartPagination, CreatedAtPagination
 from .permissions import (
     IsStaff, IsConvenor, IsOwnerOrReadOnly,
     IsConvenorOrStaffOrReadOnly, IsOwnerOrConvenorOrStaff,
@@ -14,6 +15,7 @@ from .permissions import (
 class EventViewSet(viewsets.ModelViewSet):
     serializer_class = serializers.EventSerializer
     permission_classes = [IsConvenorOrStaffOrReadOnly]
+    pagination_class = EventStartPagination
 
     def get_queryset(self):
         """
@@ -27,10 +29,12 @@ class EventViewSet(viewsets.ModelViewSet):
               * OR they are in an intake in target_intakes
               * visibility='staff' events are never shown to students
         - Unauthenticated            → public + target_all_students only
+
+        The three explicit targeting rules are answered by the EventAudience
+        index (one indexed lookup on student) rather than joins + DISTINCT.
         """
-        from django.db.models import Q
         user = self.request.user
-        base = models.Event.objects.order_by('-start')
+        base = models.Event.objects.order_by('-start', '-id')
 
         # Staff / convenors / admins see everything
         if user and user.is_authenticated:
@@ -42,17 +46,14 @@ class EventViewSet(viewsets.ModelViewSet):
                 return base
 
             # Student — filter to events targeted at them
+            audience_event_ids = models.EventAudience.objects.filter(student=user).values('event_id')
             student_q = (
                 # Public broadcast to all students
                 Q(target_all_students=True, visibility__in=('public', 'unit')) |
-                # Directly targeted
-                Q(target_students=user) |
-                # Via their enrolled offerings
-                Q(target_offerings__enrollments__student=user) |
-                # Via their intake
-                Q(target_intakes__offerings__enrollments__student=user)
+                # Directly targeted, or via their enrolled offerings / intake
+                Q(pk__in=audience_event_ids)
             )
-            return base.filter(student_q).exclude(visibility='staff').distinct()
+            return base.filter(student_q).exclude(visibility='staff')
 
         # Unauthenticated — public broadcast only
         return base.filter(target_all_students=True, visibility='public')
@@ -70,12 +71,25 @@ class EventViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def generate_content(self, request, pk=None):
         """
-        Trigger generation of event content (scaffold).
-
-        This is a synchronous mocked implementation that simulates calling
-        an external GenAI workflow (later: n8n/webhook). It updates the
-        event.generated_content and generation_meta and returns the data.
+        Trigger generation of event content.
+
+        When active ``event.generate`` n8n workflows exist, an ``event.generate``
+        background job is enqueued (core/generation.py) and 202 is returned with
+        its id straight away; the event stays ``generation_status='pending'``
+        until n8n calls generation_callback, or until ``generation_timeout_at``.
+        Without workflows (or while all their circuit breakers are open), the
+        local mock generator runs synchronously and the content is returned
+        with 200.
+
+        If n8n already generated content for identical inputs (see
+        core/generation_cache.py) it is reused and returned with 200 and
+        ``cache_hit: true``.  Send ``force: true`` to bypass the cache.
         """
+        from django.apps import apps
+        from django.conf import settings
+        from . import circuit, generation_cache, jobs
+        from .generation import default_prompt, mock_generate
+
         event = self.get_object()
 
         # Only convenors/staff or event owner should be allowed to generate in real setup.
@@ -86,131 +100,49 @@ class EventViewSet(viewsets.ModelViewSet):
         if not (is_staff or is_convenor or is_owner):
             return Response({'detail': 'Insufficient permissions to generate content.'}, status=status.HTTP_403_FORBIDDEN)
 
-        prompt = request.data.get('prompt') or f"Create marketing copy for event: {event.title}\n\n{event.description}"
+        prompt = request.data.get('prompt') or default_prompt(event)
 
-        # Mark as pending (in a real system we'd enqueue a job)
-        event.generation_status = 'pending'
-        event.save()
+        N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+        workflows = list(N8NWorkflow.objects.filter(is_active=True, trigger_event='event.generate'))
+        cache_key = ''
+        if workflows:
+            cache_key = generation_cache.cache_key(event, prompt, [wf.id for wf in workflows])
+            entry = None if request.data.get('force') else generation_cache.lookup(cache_key)
+            if entry is not None:
+                generation_cache.apply(event, entry)
+                return Response({
+                    'generated_content': event.generated_content,
+                    'generation_meta': event.generation_meta,
+                    'cache_hit': True,
+                }, status=status.HTTP_200_OK)
 
-        # If n8n workflows are configured, trigger matching workflows instead of local mock
-        from django.apps import apps
-        try:
-            UsersModels = apps.get_model('users', 'N8NWorkflow')
-            ExecutionLogModel = apps.get_model('users', 'N8NExecutionLog')
-        except Exception:
-            UsersModels = None
-            ExecutionLogModel = None
-
-        triggered_any = False
-        errors = []
-
-        if UsersModels:
-            workflows = UsersModels.objects.filter(is_active=True, trigger_event='event.generate')
-            if workflows.exists():
-                # Build payload once — flat structure so n8n Code nodes can
-                # read fields directly as payload.title, payload.start, etc.
-                import pytz
-                _VN_TZ = pytz.timezone('Asia/Ho_Chi_Minh')
-
-                def _to_rfc3339(dt):
-                    """Return RFC 3339 string; make naive datetimes VN-local."""
-                    if not dt:
-                        return None
-                    if timezone.is_naive(dt):
-                        dt = _VN_TZ.localize(dt)
-                    return dt.isoformat()
-
-                payload = {
-                    # Top-level flat fields — consumed directly by n8n expressions
-                    'event_id':    str(event.id),
-                    'title':       event.title,
-                    'description': event.description or '',
-                    'start':       _to_rfc3339(event.start),
-                    'end':         _to_rfc3339(event.end) if event.end else _to_rfc3339(event.start),
-                    'location':    event.location or '',
-                    'prompt':      prompt,
-                    # Nested copy kept for backward compat
-                    'event': {
-                        'id':          event.id,
-                        'title':       event.title,
-                        'description': event.description or '',
-                        'start':       _to_rfc3339(event.start),
-                        'end':         _to_rfc3339(event.end) if event.end else _to_rfc3339(event.start),
-                        'location':    event.location or '',
-                    },
-                    'triggered_by': getattr(request.user, 'id', None),
-                }
-
-
-                # Lazy import to avoid hard dependency unless used
-                from .n8n_client import trigger_workflow
-                for wf in workflows:
-                    log = None
-                    try:
-                        if ExecutionLogModel:
-                            triggered_by_user = request.user if getattr(request.user, 'is_authenticated', False) else None
-                            log = ExecutionLogModel.objects.create(
-                                workflow=wf,
-                                triggered_by=triggered_by_user,
-                                start_time=timezone.now(),
-                                status='running',
-                                input_data=payload,
-                            )
-
-                        status_code, resp = trigger_workflow(wf, event.id, payload)
-                        triggered_any = True
-
-                        if log:
-                            log.output_data = {'status_code': status_code, 'response': resp}
-                            log.status = 'completed' if 200 <= int(status_code) < 300 else 'failed'
-                            log.end_time = timezone.now()
-                            log.save()
-
-                    except Exception as exc:
-                        errors.append(str(exc))
-                        if log:
-                            log.error_details = {'error': str(exc)}
-                            log.status = 'failed'
-                            log.end_time = timezone.now()
-                            log.save()
-
-        # If any n8n workflow was triggered, return an acceptance response
-        if triggered_any:
+        # Workflows whose circuit is open (n8n down) are skipped — mock instead of queueing
+        if any(not circuit.is_open(wf) for wf in workflows):
+            timeout = getattr(settings, 'N8N_GENERATION_TIMEOUT', 900)
             event.generation_status = 'pending'
-            event.last_generated_at = timezone.now()
-            event.save()
-            return Response({'detail': 'Workflows triggered', 'errors': errors}, status=status.HTTP_202_ACCEPTED)
-
-        # Fallback to local mock generation when no workflows configured or all failed
-        # Mock generation logic: produce simple variants
-        social = f"Join us for {event.title} at {event.location} on {event.start.strftime('%b %d, %Y')}. {event.description[:120]}"
-        email = f"Subject: {event.title}\n\nHello,\n\nWe're excited to invite you to {event.title}. Details:\n{event.description}\n\nWhen: {event.start}\nWhere: {event.location}\n\nBest regards,\nSwinburne VN"
-        article = f"{event.title}\n\n{event.description}\n\nThis event on {event.start.strftime('%A, %d %B %Y')} at {event.location} will cover..."
-        ad = f"{event.title} — {event.location} — {event.start.strftime('%b %d')} — Sign up now!"
-
-        generated = {
-            'social_post': social,
-            'email_newsletter': email,
-            'long_article': article,
-            'recruitment_ad': ad,
-        }
-
-        # Simple validation/meta checks (mocked)
-        meta = {
-            'tone': 'informal',
-            'brand_score': 0.92,
-            'bias_flag': False,
-            'generated_by': 'mock-genai',
-            'prompt_used': prompt,
-        }
-
-        # Save results
-        event.generated_content = generated
-        event.generation_meta = meta
-        event.generation_status = 'ready'
-        event.last_generated_at = timezone.now()
-        event.save()
+            event.generation_timeout_at = timezone.now() + timezone.timedelta(seconds=timeout)
+            event.generation_cache_key = cache_key
+            event.generation_retries = 0
+            event.generation_prompt = prompt
+            event.generation_requested_by_id = getattr(user, 'id', None)
+            event.save(update_fields=[
+                'generation_status', 'generation_timeout_at', 'generation_cache_key',
+                'generation_retries', 'generation_prompt', 'generation_requested_by', 'updated_at',
+            ])
+
+            job = jobs.enqueue(
+                'event.generate',
+                {'event_id': event.id, 'prompt': prompt, 'triggered_by': getattr(user, 'id', None)},
+                created_by=user,
+            )
+            return Response({
+                'detail': 'Generation queued',
+                'job_id': job.id,
+                'generation_status': event.generation_status,
+            }, status=status.HTTP_202_ACCEPTED)
 
+        # No workflows configured — local mock generation
+        generated, meta = mock_generate(event, prompt)
         return Response({'generated_content': generated, 'generation_meta': meta}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.AllowAny])
@@ -302,6 +234,12 @@ class EventViewSet(viewsets.ModelViewSet):
             event.last_generated_at  = timezone.now()
             update_fields += ['generated_content', 'generation_meta',
                                'generation_status', 'last_generated_at']
+            # Remember n8n's output for identical future requests
+            if event.generation_cache_key:
+                from . import generation_cache
+                generation_cache.store(event.generation_cache_key, generated_content, event.generation_meta)
+                event.generation_cache_key = ''
+                update_fields.append('generation_cache_key')
         elif gcal_event_id:
             # Phase-1-only call: mark as pending (only if currently idle/failed)
             if event.generation_status in ('idle', 'failed'):
@@ -386,10 +324,15 @@ class EventViewSet(viewsets.ModelViewSet):
         """
         Staff-only endpoint to upload CSV and forward to n8n webhook.
         Expected CSV columns: title, description, start, end, location, visibility, related_unit_id
+        (or the n8n pipeline columns Event_Title, Event_Date, Start_Time, ...).
+
+        The upload is validated in one streaming pass and forwarded to n8n as
+        a streamed multipart body (core/csv_import.py) — it is never held in
+        memory.  With ``mode=local`` (query param or form field) the rows are
+        imported directly in chunks instead of going through n8n.
         """
-        import csv
-        import io
         from django.conf import settings
+        from . import csv_import, http
 
         # Accept form-data key 'data' to match the external webhook/postman example.
         # Keep backward compatibility with 'file'.
@@ -398,126 +341,67 @@ class EventViewSet(viewsets.ModelViewSet):
             return Response({'error': 'No file provided (expected form field "data" with uploaded file)'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # We still read a subset of the CSV locally to validate it's not empty,
-            # but we forward the original uploaded file to n8n so n8n can parse it.
-            try:
-                stream = io.TextIOWrapper(file.file, encoding='utf-8')
-                reader = csv.DictReader(stream)
-                rows = list(reader)
-            except Exception:
-                raw = file.read()
-                if isinstance(raw, bytes):
-                    text = raw.decode('utf-8')
-                else:
-                    text = str(raw)
-                reader = csv.DictReader(io.StringIO(text))
-                rows = list(reader)
-
-            if not rows:
-                return Response({'error': 'CSV is empty'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Forward original file to n8n webhook as multipart/form-data with field 'data'
-            n8n_webhook = getattr(settings, 'N8N_IMPORT_WEBHOOK', None)
-            if not n8n_webhook:
-                # In dev, return parsed rows for convenience
-                if getattr(settings, 'DEBUG', False):
-                    return Response({'message': f'CSV parsed (dev mode): {len(rows)} events', 'events': rows}, status=status.HTTP_200_OK)
-                else:
-                    return Response({'error': 'n8n webhook not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-            n8n_resp = {}
-            # Try using requests if available (preferred)
-            try:
-                import requests as _requests
-                # Rewind the uploaded file (in case earlier reads consumed it)
-                try:
-                    file.seek(0)
-                except Exception:
-                    pass
-                files = {'data': (getattr(file, 'name', 'upload.csv'), file, getattr(file, 'content_type', 'text/csv'))}
-                data = {'imported_by': request.user.email or '', 'timestamp': timezone.now().isoformat()}
-                resp = _requests.post(n8n_webhook, files=files, data=data, timeout=60)
-                resp.raise_for_status()
-                try:
-                    n8n_resp = resp.json() if resp.content else {}
-                except Exception:
-                    n8n_resp = {'status_text': resp.text}
-            except Exception:
-                # Fallback: build multipart/form-data body manually and use urllib
-                try:
-                    import uuid, json as _json
-                    from urllib.request import Request, urlopen
-                    from urllib.error import HTTPError, URLError
-
-                    boundary = '----WebKitFormBoundary' + uuid.uuid4().hex
-                    crlf = '\r\n'
-                    parts = []
-
-                    # text fields
-                    text_fields = {
-                        'imported_by': request.user.email or '',
-                        'timestamp': timezone.now().isoformat(),
-                    }
-                    for name, value in text_fields.items():
-                        parts.append(f'--{boundary}'.encode('utf-8'))
-                        parts.append(f'Content-Disposition: form-data; name="{name}"'.encode('utf-8'))
-                        parts.append(b'')
-                        parts.append(str(value).encode('utf-8'))
-
-                    # file field
-                    try:
-                        file.seek(0)
-                    except Exception:
-                        pass
-                    file_bytes = file.read()
-                    filename = getattr(file, 'name', 'upload.csv')
-                    content_type = getattr(file, 'content_type', 'text/csv') or 'text/csv'
-
-                    parts.append(f'--{boundary}'.encode('utf-8'))
-                    parts.append(f'Content-Disposition: form-data; name="data"; filename="{filename}"'.encode('utf-8'))
-                    parts.append(f'Content-Type: {content_type}'.encode('utf-8'))
-                    parts.append(b'')
-                    if isinstance(file_bytes, str):
-                        file_bytes = file_bytes.encode('utf-8')
-                    parts.append(file_bytes)
-
-                    parts.append(f'--{boundary}--'.encode('utf-8'))
-
-                    body = crlf.encode('utf-8').join(parts)
-                    req = Request(n8n_webhook, data=body, headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
-                    with urlopen(req, timeout=60) as fh:
-                        resp_bytes = fh.read()
-                        if resp_bytes:
-                            try:
-                                n8n_resp = _json.loads(resp_bytes.decode('utf-8'))
-                            except Exception:
-                                n8n_resp = {'status_text': resp_bytes.decode('utf-8')}
-                        else:
-                            n8n_resp = {}
-                except HTTPError as he:
-                    return Response({'error': f'n8n webhook HTTP error: {str(he)}'}, status=status.HTTP_502_BAD_GATEWAY)
-                except URLError as ue:
-                    return Response({'error': f'n8n webhook connection error: {str(ue)}'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-                except Exception as exc:
-                    return Response({'error': f'n8n webhook unknown error: {str(exc)}'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-            # Successful forward - return a friendly message indicating the schedule was uploaded
+            report = csv_import.validate_csv(file)
+        except csv_import.CsvImportError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if report.errors:
             return Response({
-                'message': f'Successfully uploaded schedule to n8n: {len(rows)} rows',
-                'n8n_response': n8n_resp
-            }, status=status.HTTP_200_OK)
+                'error': f'CSV has invalid rows ({report.row_count} rows checked)',
+                'row_errors': report.errors,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        mode = request.query_params.get('mode') or request.data.get('mode')
+        if mode == 'local':
+            if not (request.user.is_authenticated and request.user.is_staff):
+                return Response({'error': 'Local import is staff-only'}, status=status.HTTP_403_FORBIDDEN)
+            summary = csv_import.import_file(file, created_by=request.user)
+            return Response(summary, status=status.HTTP_201_CREATED)
+
+        n8n_webhook = getattr(settings, 'N8N_IMPORT_WEBHOOK', None)
+        if not n8n_webhook:
+            # In dev, report what was parsed for convenience
+            if getattr(settings, 'DEBUG', False):
+                return Response({
+                    'message': f'CSV parsed (dev mode): {report.row_count} events',
+                    'row_count': report.row_count,
+                }, status=status.HTTP_200_OK)
+            return Response({'error': 'n8n webhook not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # Forward the original file to n8n as multipart/form-data with field 'data'
+        body = csv_import.MultipartStream(file, fields={
+            'imported_by': getattr(request.user, 'email', '') or '',
+            'timestamp': timezone.now().isoformat(),
+        })
+        try:
+            resp = http.post(n8n_webhook, data=body, headers={'Content-Type': body.content_type}, timeout=60)
+            resp.raise_for_status()
+        except http.requests.HTTPError as exc:
+            return Response({'error': f'n8n webhook HTTP error: {exc}'}, status=status.HTTP_502_BAD_GATEWAY)
+        except http.requests.RequestException as exc:
+            return Response({'error': f'n8n webhook connection error: {exc}'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            n8n_resp = resp.json() if resp.content else {}
+        except ValueError:
+            n8n_resp = {'status_text': resp.text}
+
+        # Successful forward - return a friendly message indicating the schedule was uploaded
+        return Response({
+            'message': f'Successfully uploaded schedule to n8n: {report.row_count} rows',
+            'n8n_response': n8n_resp
+        }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsStaff])
     def refine_content(self, request, pk=None):
         """
-        Staff-only: synchronous AI refinement via n8n WF-4 (chat loop friendly).
+        Staff-only: AI refinement via n8n WF-4 (chat loop friendly).
 
-        n8n webhook must be configured with Respond: 'Using Respond to Webhook Node'
-        so that this call blocks until Groq returns, then the refined content is
-        returned directly in the response — no polling needed.
+        With an active ``event.refine`` workflow the n8n round-trip (Groq can
+        take tens of seconds) runs in a ``run_jobs`` worker: an ``event.refine``
+        job is enqueued, the event is set to ``generation_status='pending'`` and
+        202 is returned with the job id.  Poll ``/api/core/jobs/{job_id}/`` —
+        on success ``result`` holds the refined content.  While the workflow's
+        circuit breaker is open the mock refiner answers immediately instead.
 
         POST body:
           refinement_prompt (str, required) — natural-language feedback for Groq
@@ -525,12 +409,14 @@ class EventViewSet(viewsets.ModelViewSet):
           chat_history      (list, optional) — previous turns [{"role": "user"|"assistant", "content": "..."}]
 
         Returns:
-          200 — refined content returned synchronously (n8n path or mock)
+          200 — refined content returned synchronously (mock path, no active workflow)
+          202 — refinement job queued (n8n path)
           400 — refinement_prompt missing or blank
-          502 — n8n call failed or timed out
-          503 — no active workflow registered (use mock path instead)
         """
         from django.apps import apps
+        from django.conf import settings
+        from . import circuit, jobs
+        from .generation import mock_refine
 
         event = self.get_object()
 
@@ -548,137 +434,33 @@ class EventViewSet(viewsets.ModelViewSet):
         current_content = request.data.get('current_content') or event.generated_content or {}
         chat_history = request.data.get('chat_history', [])
 
-        # ── Build audience context ────────────────────────────────────────────
-        audience_context = {
-            'visibility': event.visibility,
-            'target_all_students': event.target_all_students,
-            'target_student_count': event.get_targeted_students().count(),
-            'target_offering_ids': list(event.target_offerings.values_list('id', flat=True)),
-            'target_intake_ids': list(event.target_intakes.values_list('id', flat=True)),
-        }
-
-        # ── Look up active workflow ───────────────────────────────────────────
-        try:
-            N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
-            N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
-        except Exception:
-            N8NWorkflow = None
-            N8NExecutionLog = None
-
-        wf = None
-        if N8NWorkflow:
-            wf = N8NWorkflow.objects.filter(trigger_event='event.refine', is_active=True).first()
-
-        if wf:
-            # ── n8n synchronous path ──────────────────────────────────────────
-            # n8n webhook must use "Respond to Webhook" node so this call blocks
-            # until Groq finishes and returns the refined content directly.
-            from .n8n_client import _resolve_webhook_url
-            import requests as _requests
-
-            config = getattr(wf, 'configuration', {}) or {}
-            webhook_url = _resolve_webhook_url(config)
+        N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+        wf = N8NWorkflow.objects.filter(trigger_event='event.refine', is_active=True).first()
+        if wf and not circuit.is_open(wf):
+            # ── n8n path: hand off to a worker ────────────────────────────────
+            previous_status = event.generation_status
+            timeout = getattr(settings, 'N8N_GENERATION_TIMEOUT', 900)
+            event.generation_status = 'pending'
+            event.generation_timeout_at = timezone.now() + timezone.timedelta(seconds=timeout)
+            event.save(update_fields=['generation_status', 'generation_timeout_at', 'updated_at'])
 
-            payload = {
-                'event_id': str(event.id),
+            job = jobs.enqueue('event.refine', {
+                'event_id': event.id,
                 'current_content': current_content,
                 'refinement_prompt': refinement_prompt,
-                'audience_context': audience_context,
                 'chat_history': chat_history,
                 'triggered_by': getattr(request.user, 'id', None),
-            }
-
-            log = None
-            if N8NExecutionLog:
-                triggered_by_user = request.user if getattr(request.user, 'is_authenticated', False) else None
-                log = N8NExecutionLog.objects.create(
-                    workflow=wf,
-                    triggered_by=triggered_by_user,
-                    start_time=timezone.now(),
-                    status='running',
-                    input_data=payload,
-                )
-
-            try:
-                resp = _requests.post(
-                    webhook_url,
-                    json={'event_id': str(event.id), 'timestamp': timezone.now().isoformat(), 'payload': payload},
-                    headers={'Content-Type': 'application/json'},
-                    timeout=60,  # Groq can take up to ~15s; give plenty of room
-                )
-                resp.raise_for_status()
-
-                try:
-                    n8n_data = resp.json()
-                except Exception:
-                    n8n_data = {}
-
-                # n8n Respond to Webhook node should return:
-                # { generated_content: {...}, generation_meta: {...} }
-                generated_content = n8n_data.get('generated_content') or n8n_data
-                generation_meta = n8n_data.get('generation_meta', {
-                    'generated_by': 'n8n-groq-refine',
-                    'refinement_prompt': refinement_prompt,
-                })
-
-                # Normalise if n8n returned a string
-                if isinstance(generated_content, str):
-                    import json as _json
-                    try:
-                        generated_content = _json.loads(generated_content)
-                    except ValueError:
-                        generated_content = {'social_post': generated_content}
-
-                # Save to event
-                event.generated_content = generated_content
-                event.generation_meta = generation_meta
-                event.generation_status = 'ready'
-                event.last_generated_at = timezone.now()
-                event.save(update_fields=[
-                    'generated_content', 'generation_meta',
-                    'generation_status', 'last_generated_at',
-                ])
-
-                if log:
-                    log.output_data = {'status_code': resp.status_code, 'response': n8n_data}
-                    log.status = 'completed'
-                    log.end_time = timezone.now()
-                    log.save()
-
-                wf.last_run = timezone.now()
-                wf.save(update_fields=['last_run'])
+                'previous_status': previous_status,
+            }, created_by=request.user)
 
-                return Response({
-                    'generated_content': generated_content,
-                    'generation_meta': generation_meta,
-                    'generation_status': 'ready',
-                }, status=status.HTTP_200_OK)
-
-            except Exception as exc:
-                import logging
-                logging.getLogger(__name__).exception('refine_content n8n call failed for event %s', event.id)
-
-                if log:
-                    log.error_details = {'error': str(exc)}
-                    log.status = 'failed'
-                    log.end_time = timezone.now()
-                    log.save()
-
-                return Response(
-                    {'detail': 'Refinement workflow failed', 'error': str(exc)},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
+            return Response({
+                'detail': 'Refinement queued',
+                'job_id': job.id,
+                'generation_status': 'pending',
+            }, status=status.HTTP_202_ACCEPTED)
 
         # ── Mock refiner path (no active workflow) ────────────────────────────
-        mock_content = {}
-        for key, value in current_content.items():
-            prefix = f'[Refinement note: {refinement_prompt}]\n'
-            mock_content[key] = prefix + (str(value) if not isinstance(value, str) else value)
-
-        meta = {
-            'generated_by': 'mock-refine',
-            'refinement_prompt': refinement_prompt,
-        }
+        mock_content, meta = mock_refine(current_content, refinement_prompt)
 
         event.generated_content = mock_content
         event.generation_status = 'ready'
@@ -697,11 +479,15 @@ class EventViewSet(viewsets.ModelViewSet):
         is ready to be sent to students.
 
         Sets visibility to 'public' (or the provided value) and generation_status to 'ready'.
-        This is the "Confirm & Publish" button action.
+        This is the "Confirm & Publish" button action.  Unless the event is
+        staff-only, its audience is notified in the background
+        (core/notifications.py); progress at notification-fanout/.
 
         POST body:
           visibility (str, optional) — 'public' | 'unit' | 'staff' (default: 'public')
         """
+        from . import notifications
+
         event = self.get_object()
 
         if not event.generated_content:
@@ -721,6 +507,7 @@ class EventViewSet(viewsets.ModelViewSet):
         meta['confirmed_at'] = timezone.now().isoformat()
         event.generation_meta = meta
         event.save(update_fields=['visibility', 'generation_status', 'generation_meta'])
+        fanout = notifications.publish_event(event, actor=request.user)
 
         return Response({
             'detail': 'Event confirmed and ready to publish',
@@ -728,8 +515,16 @@ class EventViewSet(viewsets.ModelViewSet):
             'title': event.title,
             'visibility': event.visibility,
             'generation_status': event.generation_status,
+            'notification_fanout_id': fanout.id if fanout else None,
         }, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=['get'], permission_classes=[IsStaff], url_path='notification-fanout')
+    def notification_fanout(self, request, pk=None):
+        """Staff-only: progress of the audience notifications sent for this event."""
+        event = self.get_object()
+        fanouts = models.NotificationFanout.objects.filter(event=event).order_by('id')
+        return Response(serializers.NotificationFanoutSerializer(fanouts, many=True).data)
+
     @action(detail=True, methods=['put'], permission_classes=[IsStaff], url_path='update-content')
     def update_content(self, request, pk=None):
         """
@@ -859,112 +654,24 @@ class EventViewSet(viewsets.ModelViewSet):
 
         Fields are normalised automatically. Unknown extra fields are stored
         in generation_meta.csv_meta for reference.
+
+        Rows are validated up front and inserted with bulk INSERTs (see
+        core/event_import.py); invalid rows are skipped and reported by
+        their index in ``events``.
         """
-        import re
-        from datetime import datetime, date
+        from django.conf import settings
+        from .event_import import import_events
 
         events_data = request.data.get('events', [])
         if not events_data:
             return Response({'error': 'No events provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-        def _normalise(raw: dict) -> dict:
-            """Convert either shape into a dict suitable for EventSerializer."""
-            # Detect rich CSV shape by presence of CSV-specific keys
-            is_csv = 'Event_Title' in raw or 'Event_Date' in raw
-
-            if not is_csv:
-                # Simple shape — pass through with minor cleanup
-                return raw
-
-            # ── Rich CSV → Event field mapping ────────────────────────────
-            title = raw.get('Event_Title', '').strip()
-
-            # Combine Event_Date + Start_Time → ISO datetime
-            event_date = raw.get('Event_Date', '').strip()
-            start_time = raw.get('Start_Time', '08:00').strip() or '08:00'
-            start_dt = None
-            for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y'):
-                try:
-                    d = datetime.strptime(event_date, fmt).date()
-                    start_dt = f"{d.isoformat()}T{start_time}:00"
-                    break
-                except ValueError:
-                    continue
-            if not start_dt:
-                start_dt = f"{event_date}T{start_time}:00"
-
-            location = raw.get('Location', '').strip()
-            if location.lower() in ('n/a', 'na', ''):
-                location = ''
-
-            # Target_Audience → visibility + target_all_students
-            audience_raw = raw.get('Target_Audience', 'students').lower()
-            target_all = True  # default
-            visibility = 'public'
-            if 'parent' in audience_raw:
-                visibility = 'public'
-                target_all = True
-            elif 'staff' in audience_raw:
-                visibility = 'staff'
-                target_all = False
-            else:
-                visibility = 'public'
-                target_all = True
-
-            # Content_Remarks → description (also used as AI generation prompt)
-            content_remarks = raw.get('Content_Remarks', '').strip()
-
-            # Build generation_meta from CSV-specific fields
-            csv_meta = {
-                'notify_rule': raw.get('Notify_Rule', '').strip(),
-                'channels': raw.get('Channels', '').strip(),
-                'target_audience': raw.get('Target_Audience', '').strip(),
-                'dept_filter': raw.get('Dept_Filter', '').strip(),
-                'content_remarks': content_remarks,
-                'assets_url': raw.get('Assets_URL', '').strip(),
-                'source': 'csv_import',
-            }
-
-            return {
-                'title': title,
-                'description': content_remarks,
-                'start': start_dt,
-                'end': None,
-                'location': location,
-                'visibility': visibility,
-                'target_all_students': target_all,
-                'generation_status': 'idle',
-                'generation_meta': {'csv_meta': csv_meta},
-            }
-
-        created_events = []
-        errors = []
-
-        for raw_data in events_data:
-            try:
-                event_data = _normalise(dict(raw_data))
-
-                # Pull out non-serializer fields before passing to serializer
-                target_all = event_data.pop('target_all_students', None)
-
-                serializer = serializers.EventSerializer(data=event_data)
-                if serializer.is_valid():
-                    save_kwargs = {'created_by': request.user}
-                    if target_all is not None:
-                        save_kwargs['target_all_students'] = target_all
-                    event = serializer.save(**save_kwargs)
-                    created_events.append(serializer.data)
-                else:
-                    errors.append({'data': raw_data, 'errors': serializer.errors})
-            except Exception as exc:
-                errors.append({'data': raw_data, 'error': str(exc)})
-
-        return Response({
-            'created_count': len(created_events),
-            'error_count': len(errors),
-            'created_events': created_events,
-            'errors': errors if errors else None,
-        }, status=status.HTTP_201_CREATED)
+        summary = import_events(
+            events_data,
+            created_by=request.user,
+            chunk_size=getattr(settings, 'EVENT_IMPORT_CHUNK_SIZE', 500),
+        )
+        return Response(summary, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['get'], permission_classes=[IsStaff], url_path='pending-refinement')
     def list_pending_refinement(self, request):
@@ -987,18 +694,163 @@ class EventViewSet(viewsets.ModelViewSet):
             cutoff = timezone.now() - timedelta(days=int(days))
             events = events.filter(created_at__gte=cutoff)
 
-        page = self.paginate_queryset(events)
-        if page is not None:
-            serializer = serializers.EventSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        # This list is ordered by creation, not by start — page it accordingly
+        paginator = CreatedAtPagination()
+        page = paginator.paginate_queryset(events, request, view=self)
+        serializer = serializers.EventSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
-        serializer = serializers.EventSerializer(events, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=['post'], permission_classes=[IsStaff], url_path='generate-batch')
+    def generate_batch(self, request):
+        """
+        Staff-only: generate content for many events with one request.
+        Expected payload: {
+          'event_ids': [1, 2, 3, ...],        # or, instead, the filters of
+          'status': ['idle', ...],            # pending-refinement:
+          'unit_id': 7, 'days': 7,            #   status, unit_id, days
+          'prompt': '...',                    # optional, shared by all events
+          'force': false                      # bypass the content cache
+        }
+
+        Cache hits (core/generation_cache.py) are applied straight away; the
+        other events go 'pending' and one ``event.generate_batch`` job
+        (core/generation.py) sends them to n8n in batches.  Returns 202 with
+        the job id; follow per-event progress at generate-batch/{job_id}/.
+        """
+        from django.apps import apps
+        from django.conf import settings
+        from . import generation_cache, generation_stream, jobs
+        from .generation import default_prompt
+
+        params = serializers.GenerateBatchSerializer(data=request.data)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = params.validated_data
+        if params.get('event_ids'):
+            events = models.Event.objects.filter(id__in=params['event_ids'])
+        else:
+            statuses = request.data.get('status') or ['pending', 'idle']
+            if isinstance(statuses, str):
+                statuses = [statuses]
+            events = models.Event.objects.filter(generation_status__in=statuses)
+            if params.get('unit_id'):
+                events = events.filter(related_unit_id=params['unit_id'])
+            if params.get('days'):
+                cutoff = timezone.now() - timezone.timedelta(days=params['days'])
+                events = events.filter(created_at__gte=cutoff)
+        events = list(events.order_by('id'))
+        if not events:
+            return Response({'error': 'No events matched'}, status=status.HTTP_400_BAD_REQUEST)
+
+        prompt = request.data.get('prompt') or ''
+        N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
+        workflow_ids = list(
+            N8NWorkflow.objects.filter(is_active=True, trigger_event='event.generate').values_list('id', flat=True)
+        )
+        keys = {}
+        if workflow_ids:
+            keys = {
+                event.id: generation_cache.cache_key(event, prompt or default_prompt(event), workflow_ids)
+                for event in events
+            }
+        entries = {} if request.data.get('force') else generation_cache.lookup_many(keys.values())
+
+        cached, queued = [], []
+        for event in events:
+            entry = entries.get(keys.get(event.id))
+            if entry is not None:
+                generation_cache.apply(event, entry)
+                cached.append(event)
+            else:
+                queued.append(event)
+
+        job = None
+        if queued:
+            timeout_at = timezone.now() + timezone.timedelta(
+                seconds=getattr(settings, 'N8N_GENERATION_TIMEOUT', 900))
+            for event in queued:
+                event.generation_status = 'pending'
+                event.generation_timeout_at = timeout_at
+                event.generation_cache_key = keys.get(event.id, '')
+                event.generation_retries = 0
+                event.generation_prompt = prompt
+                event.generation_requested_by_id = request.user.id
+                event.updated_at = timezone.now()
+            models.Event.objects.bulk_update(queued, [
+                'generation_status', 'generation_timeout_at', 'generation_cache_key',
+                'generation_retries', 'generation_prompt', 'generation_requested_by', 'updated_at',
+            ])
+            for event in queued:
+                # bulk_update skips post_save — tell stream subscribers directly
+                generation_stream.publish(event.id)
+
+            job = jobs.enqueue(
+                'event.generate_batch',
+                {
+                    'event_ids': [event.id for event in queued],
+                    'cached_ids': [event.id for event in cached],
+                    'prompt': prompt,
+                    'triggered_by': request.user.id,
+                },
+                created_by=request.user,
+            )
+
+        return Response({
+            'detail': 'Generation queued' if job else 'All events served from cache',
+            'job_id': job.id if job else None,
+            'queued_count': len(queued),
+            'cached_count': len(cached),
+            'cached_ids': [event.id for event in cached],
+        }, status=status.HTTP_202_ACCEPTED if job else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsStaff],
+            url_path=r'generate-batch/(?P<job_id>[0-9]+)')
+    def generate_batch_progress(self, request, job_id=None):
+        """
+        Staff-only: per-event progress of a ``generate_batch`` job.
+
+        ``dispatch`` is how far the job got with the event (queued → sent,
+        or failed / mock); ``generation_status`` is the event's own state,
+        which turns 'ready' when n8n calls generation_callback.
+        """
+        job = models.BackgroundJob.objects.filter(pk=job_id, kind='event.generate_batch').first()
+        if job is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        states = (job.result or {}).get('events', {})
+        event_ids = job.payload.get('event_ids', []) + job.payload.get('cached_ids', [])
+        current = dict(
+            models.Event.objects.filter(id__in=event_ids).values_list('id', 'generation_status')
+        )
+        cached_ids = set(job.payload.get('cached_ids', []))
+
+        rows, counts = [], {}
+        for eid in event_ids:
+            state = states.get(str(eid), {})
+            gen_status = current.get(eid)
+            counts[gen_status or 'deleted'] = counts.get(gen_status or 'deleted', 0) + 1
+            rows.append({
+                'id': eid,
+                'generation_status': gen_status,
+                'dispatch': 'cached' if eid in cached_ids else state.get('dispatch', 'queued'),
+                'workflows': state.get('workflows', []),
+                'errors': state.get('errors', []),
+            })
+
+        return Response({
+            'job_id': job.id,
+            'status': job.status,
+            'attempts': job.attempts,
+            'last_error': job.last_error,
+            'counts': counts,
+            'events': rows,
+        })
 
     @action(detail=False, methods=['post'], permission_classes=[IsStaff], url_path='bulk-publish')
     def bulk_publish(self, request):
         """
         Staff-only: publish (set visibility & generation_status) for multiple events at once.
+        Unless staff-only, each event's audience is notified (core/notifications.py).
         Expected payload: {
           'event_ids': [1, 2, 3, ...],
           'visibility': 'public|unit|staff',
@@ -1018,17 +870,26 @@ class EventViewSet(viewsets.ModelViewSet):
         if gen_status not in ['idle', 'pending', 'ready', 'failed']:
             return Response({'error': 'Invalid generation_status value'}, status=status.HTTP_400_BAD_REQUEST)
 
+        from . import notifications
+
         updated = models.Event.objects.filter(id__in=event_ids).update(
             visibility=visibility,
             generation_status=gen_status,
             updated_at=timezone.now()
         )
 
+        # Notify each published event's audience in the background
+        fanouts = [
+            notifications.publish_event(event, actor=request.user)
+            for event in models.Event.objects.filter(id__in=event_ids)
+        ]
+
         return Response({
             'message': f'Updated {updated} events',
             'updated_count': updated,
             'visibility': visibility,
-            'generation_status': gen_status
+            'generation_status': gen_status,
+            'notification_fanout_ids': [f.id for f in fanouts if f],
         }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['get'], permission_classes=[IsStaff])
@@ -1132,8 +993,8 @@ class EventViewSet(viewsets.ModelViewSet):
             }
             
             try:
-                import requests
-                response = requests.post(n8n_webhook, json=payload, timeout=30)
+                from . import http
+                response = http.post(n8n_webhook, json=payload, timeout=30)
                 response.raise_for_status()
                 suggestions = response.json()
                 
@@ -1202,6 +1063,24 @@ class SessionViewSet(viewsets.ModelViewSet):
     # Only convenors or staff may create/edit sessions; others can read
     permission_classes = [IsConvenorOrStaffOrReadOnly]
 
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated],
+            url_path='calendar-feed')
+    def calendar_feed(self, request):
+        """
+        Return the caller's subscribable .ics URL (sessions + targeted events).
+        The URL embeds a signed token — see core/calendar_feed.py.
+        """
+        from .calendar_feed import feed_url
+        return Response({'url': feed_url(request, request.user)})
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated],
+            url_path='calendar-feed/rotate', url_name='calendar-feed-rotate')
+    def rotate_calendar_feed(self, request):
+        """Revoke the caller's current .ics URL (e.g. it leaked) and return a new one."""
+        from .calendar_feed import feed_url, rotate_token
+        rotate_token(request.user)
+        return Response({'url': feed_url(request, request.user)})
+
 
 
 class AttendanceViewSet(viewsets.ModelViewSet):
@@ -1212,8 +1091,9 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
 
 class TicketViewSet(viewsets.ModelViewSet):
-    queryset = models.Ticket.objects.all().order_by('-created_at')
+    queryset = models.Ticket.objects.all().order_by('-created_at', '-id')
     serializer_class = serializers.TicketSerializer
+    pagination_class = CreatedAtPagination
     # Tickets: any authenticated user may create; owner, convenor or staff can edit/manage
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrConvenorOrStaff]
 
@@ -1247,16 +1127,40 @@ class FormSubmissionViewSet(viewsets.ModelViewSet):
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = serializers.NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtPagination
 
     def get_queryset(self):
         # each user only sees notifications addressed to them
         user = self.request.user
-        return models.Notification.objects.filter(recipient=user).order_by('-created_at')
+        return models.Notification.objects.filter(recipient=user).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         # actor defaults to current user unless explicitly provided
         serializer.save(actor=self.request.user)
 
+    @action(detail=False, methods=['get'], url_path='archived')
+    def archived(self, request):
+        """
+        The caller's archived notifications (read and older than the
+        retention window — see core/notification_retention.py), newest first.
+        """
+        archived = models.NotificationArchive.objects.filter(recipient=request.user).order_by('-created_at', '-id')
+        paginator = CreatedAtPagination()
+        page = paginator.paginate_queryset(archived, request, view=self)
+        return paginator.get_paginated_response(serializers.NotificationArchiveSerializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """Badge count — read from the user's NotificationCounter row, no COUNT(*)."""
+        from .notifications import unread_count
+        return Response({'unread': unread_count(request.user)})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        """Mark all of the caller's notifications read with one UPDATE."""
+        from .notifications import mark_all_read
+        return Response({'marked_read': mark_all_read(request.user), 'unread': 0})
+
 
 class ResourceViewSet(viewsets.ModelViewSet):
     queryset = models.Resource.objects.all().order_by('-created_at')
@@ -1275,3 +1179,17 @@ class MediaAssetViewSet(viewsets.ModelViewSet):
     queryset = models.MediaAsset.objects.all().order_by('-created_at')
     serializer_class = serializers.MediaAssetSerializer
     permission_classes = [IsConvenorOrStaffOrReadOnly]
+
+
+class BackgroundJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status of queued background work; users see their own jobs, staff see all."""
+    serializer_class = serializers.BackgroundJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtPagination
+
+    def get_queryset(self):
+        qs = models.BackgroundJob.objects.order_by('-created_at', '-id')
+        user = self.request.user
+        if not user.is_staff:
+            qs = qs.filter(created_by=user)
+        return qs
@@ -0,0 +1,112 @@
+"""
+enrollment/approvals.py — Set-wise enrollment approval.
+
+``EnrollmentViewSet.approve`` approves one enrollment per request, and each
+``save()`` runs the Enrollment signals (the transcript hook, a Notification
+INSERT, an outbox row).  Convenors approve hundreds of pending enrollments
+at once; ``bulk_approve`` does it per offering, in one transaction holding
+the offering row lock (the lock ``SemesterOffering.reserve_seat`` and the
+waitlist promotion take):
+
+  * approves the oldest pending enrollments up to the free seats with one
+    UPDATE, and moves ``current_enrollment`` with another — the rest stay
+    PENDING and are reported as ``full``;
+  * ``record_enrolled`` then does the signals' work in bulk: one
+    Notification INSERT, one unread-counter UPDATE, one batch
+    ``enrollment.confirmed`` outbox message (``outbox.emit_batch`` — a
+    single POST to workflows configured with ``batch: true``, one per
+    enrollment to the others) and the students' dashboard invalidation.
+"""
+import logging
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from src.backend.academic.models import SemesterOffering
+from src.backend.core import notifications, outbox
+from src.backend.core.models import Notification
+
+from . import dashboard
+from .models import Enrollment
+
+logger = logging.getLogger(__name__)
+
+ENROLLED_VERB = 'Enrollment enrolled'
+
+
+def record_enrolled(enrollments, verb=ENROLLED_VERB):
+    """
+    The post-save work of Enrollment rows moved to ENROLLED with bulk
+    writes; ``enrollments`` is a list of (enrollment id, student id).
+    """
+    if not enrollments:
+        return
+    content_type = ContentType.objects.get_for_model(Enrollment)
+    Notification.objects.bulk_create([
+        Notification(
+            recipient_id=student_id, verb=verb,
+            target_content_type=content_type, target_object_id=enrollment_id,
+        )
+        for enrollment_id, student_id in enrollments
+    ])
+    student_ids = [student_id for _, student_id in enrollments]
+    notifications.adjust_unread(student_ids)
+    outbox.emit_batch('enrollment.confirmed', [enrollment_id for enrollment_id, _ in enrollments])
+    dashboard.touch_students(student_ids)
+
+
+def _approve_offering(offering_id, enrollment_ids, now):
+    """Approve the pending ``enrollment_ids`` of one offering; returns (approved ids, full ids)."""
+    with transaction.atomic():
+        offering = SemesterOffering.objects.select_for_update().get(pk=offering_id)
+        pending = list(
+            Enrollment.objects.select_for_update()
+            .filter(pk__in=enrollment_ids, offering_id=offering_id, status='PENDING')
+            .order_by('created_at', 'id')
+            .values_list('id', 'student_id')
+        )
+        if offering.capacity:
+            free = max(offering.capacity - offering.current_enrollment, 0)
+            pending, full = pending[:free], pending[free:]
+        else:
+            full = []
+        if pending:
+            approved_ids = [enrollment_id for enrollment_id, _ in pending]
+            Enrollment.objects.filter(pk__in=approved_ids).update(status='ENROLLED', updated_at=now)
+            SemesterOffering.objects.filter(pk=offering_id).update(
+                current_enrollment=F('current_enrollment') + len(approved_ids),
+            )
+            record_enrolled(pending)
+    return [enrollment_id for enrollment_id, _ in pending], [enrollment_id for enrollment_id, _ in full]
+
+
+def bulk_approve(enrollments, now=None):
+    """
+    Approve every PENDING enrollment in the ``enrollments`` queryset, as far
+    as seats allow.  Returns {'approved': [...], 'full': [...], 'skipped': [...]}
+    (ids; ``skipped`` were not pending).
+    """
+    now = now or timezone.now()
+    by_offering = defaultdict(list)
+    skipped = []
+    for enrollment_id, offering_id, status in enrollments.values_list('id', 'offering_id', 'status'):
+        if status == 'PENDING':
+            by_offering[offering_id].append(enrollment_id)
+        else:
+            skipped.append(enrollment_id)
+
+    approved, full = [], []
+    for offering_id, enrollment_ids in sorted(by_offering.items()):
+        offering_approved, offering_full = _approve_offering(offering_id, enrollment_ids, now)
+        approved += offering_approved
+        full += offering_full
+    # Rows that stopped being pending between the read and the lock
+    claimed = set(approved) | set(full)
+    skipped += [pk for ids in by_offering.values() for pk in ids if pk not in claimed]
+
+    if approved:
+        logger.info('Bulk-approved %s enrollments across %s offerings', len(approved), len(by_offering))
+    return {'approved': approved, 'full': full, 'skipped': sorted(skipped)}
@@ -7,4 +7,5 @@ class EnrollmentConfig(AppConfig):
     verbose_name = 'Course Enrollment'
     
     def ready(self):
-        import src.backend.enrollment.signals  # noqa
\ No newline at end of file
+        import src.backend.enrollment.signals  # noqa
+        import src.backend.enrollment.waitlist  # noqa — registers the waitlist promotion job handler
\ No newline at end of file
@@ -0,0 +1,365 @@
+"""
+enrollment/dashboard.py — Cached per-student enrollment dashboard.
+
+``EnrollmentViewSet.dashboard`` is the student landing page and is hit by
+every student at once when enrollment opens.  Its payload is built by
+``build()`` and cached per student under a versioned key:
+
+    enrollment-dashboard:<student id>:<student version>:<catalogue version>
+
+Versions live in DashboardVersion rows rather than in the cache itself, so
+every gunicorn worker (each with its own local-memory cache) sees a bump the
+moment it commits and never serves a snapshot older than the data:
+
+  * ``student:<id>`` — bumped when that student's Enrollment or
+    AttendanceRecord rows, or their StudentProfile (course), change;
+  * ``catalogue``    — bumped when a SemesterOffering, Session, Unit or
+    CourseUnit changes, since any of them can appear on every student's
+    dashboard (available units, cards, seat counts).
+
+The signal receivers in enrollment/signals.py do the bumping; code that
+changes those tables with ``.update()`` / ``bulk_create`` must call
+``touch_students`` / ``touch_catalogue`` itself.  A repeat load costs one
+query for the two versions plus a cache read.
+
+Seat counts are the exception: ``SemesterOffering.reserve_seat`` changes
+``current_enrollment`` with a bare UPDATE and does not bump the catalogue
+(that would drop every snapshot on each approval during enrollment week),
+so a card's seat count can lag by up to the TTL below.
+
+Enrollment windows open and close with the clock, so a snapshot is kept for
+at most ENROLLMENT_DASHBOARD_CACHE_TTL seconds and never past the next
+enrollment_start / enrollment_end it depends on.
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from src.backend.academic.models import SemesterOffering, CourseUnit
+from src.backend.academic.serializers import SemesterOfferingSerializer
+from src.backend.academic.unit_graph import get_graph
+from src.backend.core.models import Session, AttendanceRecord
+from src.backend.users.models import StudentProfile
+from src.backend.users.serializers import UserSerializer
+
+from .models import Enrollment
+from .serializers import EnrollmentSerializer
+
+CATALOGUE = 'catalogue'
+
+
+def _student_scope(user_id):
+    return f'student:{user_id}'
+
+
+def _bump(scopes):
+    DashboardVersion = apps.get_model('enrollment', 'DashboardVersion')
+    scopes = set(scopes)
+    if not scopes:
+        return
+    updated = DashboardVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1)
+    if updated < len(scopes):
+        # First change for some scopes — create their rows, then bump them
+        DashboardVersion.objects.bulk_create(
+            [DashboardVersion(scope=scope, version=0) for scope in scopes], ignore_conflicts=True,
+        )
+        DashboardVersion.objects.filter(scope__in=scopes, version=0).update(version=F('version') + 1)
+
+
+def touch_students(user_ids):
+    """Invalidate the dashboard snapshot of every student in ``user_ids``."""
+    _bump(_student_scope(user_id) for user_id in user_ids if user_id)
+
+
+def touch_catalogue():
+    """Invalidate every student's dashboard snapshot (offerings/sessions/units changed)."""
+    _bump([CATALOGUE])
+
+
+def _versions(user_id):
+    DashboardVersion = apps.get_model('enrollment', 'DashboardVersion')
+    student_scope = _student_scope(user_id)
+    rows = dict(
+        DashboardVersion.objects.filter(scope__in=[student_scope, CATALOGUE]).values_list('scope', 'version')
+    )
+    return rows.get(student_scope, 0), rows.get(CATALOGUE, 0)
+
+
+def cache_key(user_id):
+    student_version, catalogue_version = _versions(user_id)
+    return f'enrollment-dashboard:{user_id}:{student_version}:{catalogue_version}'
+
+
+def snapshot(user, now=None):
+    """The dashboard payload for ``user``, from the cache when nothing it shows has changed."""
+    key = cache_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        now = now or timezone.now()
+        data, valid_until = build(user, now)
+        ttl = getattr(settings, 'ENROLLMENT_DASHBOARD_CACHE_TTL', 600)
+        if valid_until is not None:
+            ttl = min(ttl, max(int((valid_until - now).total_seconds()), 1))
+        cache.set(key, data, ttl)
+    return data
+
+
+def _serialize_instructor(user):
+    if not user:
+        return None
+    full_name = user.get_full_name().strip()
+    display_name = full_name or user.username or user.email
+    return {
+        'id': user.id,
+        'name': display_name,
+        'email': user.email,
+        'position': getattr(user, 'position', ''),
+    }
+
+
+ATTENDANCE_STATUSES = ('present', 'absent', 'late', 'excused')
+
+HUMAN_STATUS = {
+    'COMPLETED': 'passed',
+    'FAILED': 'failed',
+    'ENROLLED': 'enrolled',
+    'PENDING': 'selected',
+    'WITHDRAWN': 'withdrawn',
+}
+
+
+class _EnrollmentRowSerializer(EnrollmentSerializer):
+    """EnrollmentSerializer minus the nested offering/student, which ``build`` fills in from shared copies."""
+    offering = None
+    student = None
+
+    class Meta(EnrollmentSerializer.Meta):
+        fields = [f for f in EnrollmentSerializer.Meta.fields if f not in ('offering', 'student')]
+
+
+def _course_units(user):
+    """(unit ids of the student's course or None when they have no major, elective unit ids)."""
+    # StudentProfile.course is a users.Course; CourseUnit belongs to the
+    # academic.Course with the same code
+    course_code = StudentProfile.objects.filter(user=user).values_list('course__code', flat=True).first()
+    course_unit_ids = set() if course_code else None
+    elective_unit_ids = set()
+    # One query for both the student's course units and every elective unit
+    electives = Q(is_elective=True)
+    rows = CourseUnit.objects.filter(electives | Q(course__code=course_code) if course_code else electives)
+    for unit_id, unit_course_code, is_elective in rows.values_list('unit_id', 'course__code', 'is_elective'):
+        if course_code and unit_course_code == course_code:
+            course_unit_ids.add(unit_id)
+        if is_elective:
+            elective_unit_ids.add(unit_id)
+    return course_unit_ids, elective_unit_ids
+
+
+def _sessions_and_attendance(user, offering_ids):
+    """Sessions (with instructor) per offering, and the student's attendance counts per offering."""
+    session_map = defaultdict(list)
+    sessions = Session.objects.filter(offering_id__in=offering_ids).select_related('instructor').order_by('date')
+    for session in sessions:
+        session_map[session.offering_id].append(session)
+
+    attendance_map = defaultdict(lambda: dict.fromkeys(ATTENDANCE_STATUSES, 0))
+    records = AttendanceRecord.objects.filter(
+        session__offering_id__in=offering_ids, student=user,
+    ).values_list('session__offering_id', 'status')
+    for offering_id, record_status in records:
+        attendance_map[offering_id][record_status] += 1
+    return session_map, attendance_map
+
+
+def _calc_hours(session_list):
+    if not session_list:
+        return None
+    session = session_list[0]
+    if not session.start_time or not session.end_time:
+        return None
+    start_dt = datetime.combine(session.date, session.start_time)
+    end_dt = datetime.combine(session.date, session.end_time)
+    return round((end_dt - start_dt).total_seconds() / 3600, 1)
+
+
+def build(user, now):
+    """
+    Build the dashboard payload; returns (data, the next enrollment window
+    change it depends on).
+
+    Everything is bulk loaded — a fixed number of queries however many
+    offerings are open — and each offering is serialized once, then shared
+    by ``available_units``, ``offering_cards`` and the enrollment lists.
+    """
+    current_year = now.year
+
+    enrollments = list(
+        Enrollment.objects.filter(student=user)
+        .select_related('offering__unit__convenor')
+        .order_by('-offering__year', 'offering__semester')
+    )
+
+    # Past enrollments: completed/failed/withdrawn OR from previous years OR past semesters
+    past_enrollments = [
+        e for e in enrollments
+        if e.status in ('COMPLETED', 'FAILED', 'WITHDRAWN')
+        or e.offering.year < current_year
+        or (e.offering.year == current_year and e.offering.enrollment_end < now)
+    ]
+    # Current enrollments: pending or enrolled in current/future semesters
+    current_enrollments = [
+        e for e in enrollments
+        if e.status in ('PENDING', 'ENROLLED') and e.offering.enrollment_end >= now
+    ]
+    completed_unit_ids = {e.offering.unit_id for e in enrollments if e.status == 'COMPLETED'}
+    enrolled_unit_ids = {e.offering.unit_id for e in enrollments}
+
+    # ── Major-based filtering ─────────────────────────────────────────────
+    # course_unit_ids  → unit IDs that belong to the student's course (None: no restriction)
+    # elective_unit_ids → unit IDs marked as elective on *any* course
+    course_unit_ids, elective_unit_ids = _course_units(user)
+
+    # Available offerings (not enrolled, active, enrollment period open)
+    available_offerings_qs = SemesterOffering.objects.filter(
+        is_active=True,
+        enrollment_start__lte=now,
+        enrollment_end__gte=now
+    ).exclude(
+        unit_id__in=enrolled_unit_ids
+    ).select_related('unit__convenor').order_by('unit__code')
+
+    if course_unit_ids is not None:
+        # Student has a major: show units in their course OR any elective unit
+        available_offerings_qs = available_offerings_qs.filter(
+            Q(unit_id__in=course_unit_ids) | Q(unit_id__in=elective_unit_ids)
+        )
+    available_offerings = list(available_offerings_qs)
+
+    # Annotate each offering's unit with _is_elective so UnitSerializer can read it,
+    # and check prerequisites against the compiled requisite graph
+    graph = get_graph()
+    prereq_map = {}
+    for offering in available_offerings:
+        unit = offering.unit
+        if course_unit_ids is not None:
+            # True if this unit is NOT in their major's required units
+            # (i.e., it's only here because it's a global elective)
+            unit._is_elective = unit.id in elective_unit_ids and unit.id not in (course_unit_ids - elective_unit_ids)
+        else:
+            unit._is_elective = unit.id in elective_unit_ids
+        missing_prereqs = [
+            {'code': graph.codes[prereq_id], 'name': graph.names[prereq_id]}
+            for prereq_id in graph.missing_prerequisites(unit.id, completed_unit_ids)
+        ]
+        prereq_map[offering.id] = {
+            'prerequisites_met': not missing_prereqs,
+            'missing_prerequisites': missing_prereqs,
+        }
+
+    # Every offering on the dashboard, serialized once
+    offering_lookup = {e.offering_id: e.offering for e in enrollments}
+    for offering in available_offerings:
+        offering_lookup.setdefault(offering.id, offering)
+    offering_data = {
+        offering_id: SemesterOfferingSerializer(offering).data
+        for offering_id, offering in offering_lookup.items()
+    }
+    student_data = UserSerializer(user).data
+
+    def enrollment_rows(rows):
+        serialized = []
+        for enrollment, data in zip(rows, _EnrollmentRowSerializer(rows, many=True).data):
+            data['student'] = student_data
+            data['offering'] = offering_data[enrollment.offering_id]
+            serialized.append({field: data[field] for field in EnrollmentSerializer.Meta.fields})
+        return serialized
+
+    available_data = [
+        {**offering_data[offering.id], **prereq_map[offering.id]} for offering in available_offerings
+    ]
+
+    # Build card view for all known offerings
+    enrollment_map = {enrollment.offering_id: enrollment for enrollment in enrollments}
+    session_map, attendance_map = _sessions_and_attendance(user, list(offering_lookup))
+
+    offering_cards = []
+    for offering_id, offering in offering_lookup.items():
+        enrollment = enrollment_map.get(offering_id)
+        status_label = HUMAN_STATUS.get(enrollment.status, 'available') if enrollment else 'available'
+        prereq_info = prereq_map.get(offering_id)
+        prerequisites_met = True
+        missing_prereqs = []
+        if status_label == 'available' and prereq_info:
+            prerequisites_met = prereq_info['prerequisites_met']
+            missing_prereqs = prereq_info['missing_prerequisites']
+
+        session_list = session_map.get(offering_id, [])
+        hours_per_session = _calc_hours(session_list)
+        total_sessions = len(session_list)
+        attendance_stats = attendance_map.get(offering_id, dict.fromkeys(ATTENDANCE_STATUSES, 0))
+        attended = attendance_stats['present'] + attendance_stats['late'] + attendance_stats['excused']
+        attendance_rate = round((attended / total_sessions) * 100, 1) if total_sessions else None
+
+        instructor_user = None
+        if session_list and session_list[0].instructor:
+            instructor_user = session_list[0].instructor
+        elif offering.unit.convenor:
+            instructor_user = offering.unit.convenor
+
+        offering_cards.append({
+            'offering': offering_data[offering_id],
+            'status_label': status_label,
+            'enrollment_id': enrollment.id if enrollment else None,
+            'grade': enrollment.grade if enrollment else '',
+            'marks': enrollment.marks if enrollment else None,
+            'prerequisites_met': prerequisites_met,
+            'missing_prerequisites': missing_prereqs,
+            'instructor': _serialize_instructor(instructor_user),
+            'attendance_summary': {
+                'total_sessions': total_sessions,
+                'attended_sessions': attended,
+                'present': attendance_stats['present'],
+                'late': attendance_stats['late'],
+                'absent': attendance_stats['absent'],
+                'attendance_rate': attendance_rate,
+            },
+            'schedule_summary': f"{total_sessions} weeks • {hours_per_session or 3}h lecture" if total_sessions else "Schedule to be announced",
+            'can_enroll': status_label == 'available' and prerequisites_met,
+        })
+
+    def count(rows, enrollment_status):
+        return sum(1 for e in rows if e.status == enrollment_status)
+
+    data = {
+        'past_enrollments': enrollment_rows(past_enrollments),
+        'current_enrollments': enrollment_rows(current_enrollments),
+        'available_units': available_data,
+        'offering_cards': offering_cards,
+        'statistics': {
+            'total_completed': count(past_enrollments, 'COMPLETED'),
+            'total_failed': count(past_enrollments, 'FAILED'),
+            'total_withdrawn': count(past_enrollments, 'WITHDRAWN'),
+            'current_enrolled': count(current_enrollments, 'ENROLLED'),
+            'pending_approval': count(current_enrollments, 'PENDING'),
+            'available_count': len([card for card in offering_cards if card['status_label'] == 'available' and card['can_enroll']])
+        }
+    }
+
+    # Next time an offering on this dashboard (or a new one) opens or closes
+    boundaries = [
+        moment
+        for offering in offering_lookup.values()
+        for moment in (offering.enrollment_start, offering.enrollment_end)
+        if moment > now
+    ]
+    next_opening = SemesterOffering.objects.filter(
+        is_active=True, enrollment_start__gt=now,
+    ).aggregate(next_start=Min('enrollment_start'))['next_start']
+    if next_opening:
+        boundaries.append(next_opening)
+    return data, min(boundaries, default=None)
@@ -1,15 +1,19 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from src.backend.users.models import User
 from src.backend.academic.models import Unit, SemesterOffering
-from src.backend.core.base_models import BaseModel
+from src.backend.academic.unit_graph import get_graph
+from src.backend.core.base_models import BaseModel, TrackedFieldsMixin
 
 
-class Enrollment(BaseModel):
+class Enrollment(TrackedFieldsMixin, BaseModel):
     """
     Unit enrollment records for students with prerequisite validation
     """
+    # The Enrollment signals compare the new status with the stored one
+    tracked_fields = ('status',)
+
     STATUS_CHOICES = [
         ('PENDING', 'Pending Approval'),
         ('ENROLLED', 'Enrolled'),
@@ -40,41 +44,36 @@ class Enrollment(BaseModel):
             self._validate_enrollment_period()
             self._validate_capacity()
 
+    def _unit_ids(self, statuses):
+        return set(
+            Enrollment.objects.filter(student=self.student, status__in=statuses)
+            .values_list('offering__unit_id', flat=True)
+        )
+
     def _validate_prerequisites(self):
         """Check if student has completed all prerequisites"""
-        prerequisites = self.offering.unit.prerequisites.all()
-        if not prerequisites:
+        graph = get_graph()
+        unit_id = self.offering.unit_id
+        if not graph.prerequisites.get(unit_id):
             return
 
-        completed_units = set(
-            Enrollment.objects.filter(
-                student=self.student,
-                status='COMPLETED',
-                offering__unit__in=prerequisites
-            ).values_list('offering__unit_id', flat=True)
-        )
-        
-        missing = [p for p in prerequisites if p.id not in completed_units]
+        missing = graph.missing_prerequisites(unit_id, self._unit_ids(['COMPLETED']))
         if missing:
             raise ValidationError(
-                f'Missing prerequisites: {", ".join(str(m) for m in missing)}'
+                f'Missing prerequisites: {", ".join(graph.label(m) for m in missing)}'
             )
 
     def _validate_anti_requisites(self):
         """Check if student has completed or is enrolled in any anti-requisites"""
-        anti_requisites = self.offering.unit.anti_requisites.all()
-        if not anti_requisites:
+        graph = get_graph()
+        unit_id = self.offering.unit_id
+        if not graph.anti.get(unit_id):
             return
 
-        conflicting = Enrollment.objects.filter(
-            student=self.student,
-            offering__unit__in=anti_requisites,
-            status__in=['ENROLLED', 'COMPLETED']
-        ).first()
-
+        conflicting = graph.conflicts(unit_id, self._unit_ids(['ENROLLED', 'COMPLETED']))
         if conflicting:
             raise ValidationError(
-                f'Cannot enroll: Already completed/enrolled in anti-requisite {conflicting.offering.unit}'
+                f'Cannot enroll: Already completed/enrolled in anti-requisite {graph.label(conflicting[0])}'
             )
 
     def _validate_enrollment_period(self):
@@ -90,18 +89,70 @@ class Enrollment(BaseModel):
         if self.offering.is_full():
             raise ValidationError('This offering has reached its maximum capacity.')
 
+    def _lock(self):
+        """Re-read this enrollment's status under a row lock (call inside a transaction)."""
+        status = Enrollment.objects.select_for_update().values_list('status', flat=True).get(pk=self.pk)
+        # What the signals compare against when this instance is saved
+        self.set_stored_value('status', status)
+        return status
+
+    def enroll(self):
+        """Move the enrollment to ENROLLED, taking a seat in the offering."""
+        with transaction.atomic():
+            if self._lock() == 'ENROLLED':
+                self.status = 'ENROLLED'
+                return
+            if not SemesterOffering.reserve_seat(self.offering_id):
+                raise ValidationError('This offering has reached its maximum capacity.')
+            self.status = 'ENROLLED'
+            self.save()
+
     def withdraw(self):
         """Withdraw from the enrollment"""
-        if self.status not in ['PENDING', 'ENROLLED']:
-            raise ValidationError('Can only withdraw from pending or active enrollments.')
-        
-        self.status = 'WITHDRAWN'
-        self.withdrawn_date = timezone.now()
-        self.save()
+        with transaction.atomic():
+            current_status = self._lock()
+            if current_status not in ['PENDING', 'ENROLLED']:
+                raise ValidationError('Can only withdraw from pending or active enrollments.')
+
+            self.status = 'WITHDRAWN'
+            self.withdrawn_date = timezone.now()
+            self.save()
+
+            # Only an enrolled student holds a seat; a freed seat goes to the waitlist
+            if current_status == 'ENROLLED' and SemesterOffering.release_seat(self.offering_id):
+                from .waitlist import schedule_promotion
+                schedule_promotion(self.offering_id)
+
+
+class WaitlistEntry(BaseModel):
+    """
+    A student waiting for a seat in a full offering (enrollment/waitlist.py).
+    Served highest ``priority`` first, then first come first served.
+    """
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('promoted', 'Promoted'),
+        ('cancelled', 'Cancelled'),
+    ]
 
-        # Update current enrollment count
-        self.offering.current_enrollment = models.F('current_enrollment') - 1
-        self.offering.save()
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    offering = models.ForeignKey(SemesterOffering, on_delete=models.CASCADE, related_name='waitlist')
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='waiting')
+    promoted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('student', 'offering')
+        indexes = [
+            # The queue: promotion order and position lookups read only waiting rows
+            models.Index(
+                fields=['offering', '-priority', 'id'], name='enroll_waitlist_queue_idx',
+                condition=models.Q(status='waiting'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student.email} waiting for {self.offering}"
 
 
 class EnrollmentApproval(BaseModel):
@@ -121,18 +172,14 @@ class EnrollmentApproval(BaseModel):
         if self.enrollment.status != 'PENDING':
             raise ValidationError('Can only approve pending enrollments.')
         
-        self.approved_by = approver
-        self.approved_at = timezone.now()
-        self.notes = notes
-        self.save()
-
-        # Update enrollment status
-        self.enrollment.status = 'ENROLLED'
-        self.enrollment.save()
+        with transaction.atomic():
+            # Takes the seat; raises ValidationError when the offering is full
+            self.enrollment.enroll()
 
-        # Update current enrollment count
-        self.enrollment.offering.current_enrollment = models.F('current_enrollment') + 1
-        self.enrollment.offering.save()
+            self.approved_by = approver
+            self.approved_at = timezone.now()
+            self.notes = notes
+            self.save()
 
 
 class Transcript(BaseModel):
@@ -205,4 +252,16 @@ class Transcript(BaseModel):
             if self.grade and not self.grade_point:
                 self.grade_point = self.calculate_grade_point()
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class DashboardVersion(models.Model):
+    """
+    Version counter behind the cached enrollment dashboard
+    (enrollment/dashboard.py): one row per student ('student:<id>') plus a
+    shared 'catalogue' row.  Bumping a row invalidates the snapshots keyed on it.
+    """
+    scope = models.CharField(max_length=40, primary_key=True)
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Enrollment, Transcript
+from .models import Enrollment, Transcript, WaitlistEntry
 from src.backend.academic.serializers import SemesterOfferingSerializer
 from src.backend.users.serializers import UserSerializer
 
@@ -26,6 +26,32 @@ class EnrollmentCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class BulkApproveSerializer(serializers.Serializer):
+    """Body of ``bulk-approve``: enrollment ``ids``, or ``offering`` / ``unit`` filters."""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    offering = serializers.IntegerField(required=False, allow_null=True)
+    unit = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if not (attrs.get('ids') or attrs.get('offering') or attrs.get('unit')):
+            raise serializers.ValidationError('Provide ids, offering or unit')
+        return attrs
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """A waitlist entry; ``position`` is set by the view (see enrollment/waitlist.py)."""
+    unit_code = serializers.CharField(source='offering.unit.code', read_only=True)
+    position = serializers.SerializerMethodField()
+
+    def get_position(self, obj):
+        return getattr(obj, 'position', None)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ['id', 'offering', 'unit_code', 'priority', 'status', 'position', 'created_at', 'promoted_at']
+        read_only_fields = fields
+
+
 class TranscriptSerializer(serializers.ModelSerializer):
     """Serializer for academic transcripts"""
     student = UserSerializer(read_only=True)
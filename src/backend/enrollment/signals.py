@@ -1,11 +1,13 @@
-import threading
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from django.utils import timezone
 
+from . import dashboard
 from .models import Enrollment, Transcript
-from src.backend.core.models import Notification
+from src.backend.academic.models import CourseUnit, SemesterOffering, Unit
+from src.backend.core import outbox
+from src.backend.core.models import AttendanceRecord, Notification, Session
+from src.backend.users.models import StudentProfile
 
 
 @receiver(post_save, sender=Enrollment)
@@ -54,19 +56,6 @@ def create_or_update_transcript(sender, instance, created, **kwargs):
 # Enrollment notifications
 # ---------------------------------------------------------------------------
 
-@receiver(pre_save, sender=Enrollment)
-def enrollment_pre_save(sender, instance, **kwargs):
-    """Capture previous status before it changes."""
-    if instance.pk:
-        try:
-            old = sender.objects.get(pk=instance.pk)
-            instance._old_status = old.status
-        except sender.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
-
-
 @receiver(post_save, sender=Enrollment)
 def enrollment_post_save(sender, instance, created, **kwargs):
     """Notify students and staff about relevant status changes.
@@ -76,7 +65,7 @@ def enrollment_post_save(sender, instance, created, **kwargs):
     * When the status later flips to ENROLLED or WITHDRAWN, notify the student.
     """
     new_status = instance.status
-    old_status = getattr(instance, '_old_status', None)
+    old_status = None if created else instance.stored_value('status')
 
     # first handle newly-created pending enrollments
     if created and new_status == 'PENDING':
@@ -119,46 +108,25 @@ def enrollment_post_save(sender, instance, created, **kwargs):
         )
 
     # ----- n8n outbound trigger -----
-    # When a student's enrollment is newly confirmed (→ ENROLLED), fire any active
-    # n8n workflows registered for trigger_event='enrollment.confirmed'.
+    # When a student's enrollment is newly confirmed (→ ENROLLED), queue an
+    # enrollment.confirmed message for the registered n8n workflows.
     if new_status == 'ENROLLED' and old_status != 'ENROLLED':
-        threading.Thread(
-            target=_fire_n8n_enrollment,
-            args=(instance.pk,),
-            daemon=True,
-        ).start()
+        outbox.emit('enrollment.confirmed', instance.pk)
 
 
 # ---------------------------------------------------------------------------
-# n8n outbound trigger: enrollment.confirmed
+# n8n outbound trigger: enrollment.confirmed (dispatched by core/outbox.py)
 # ---------------------------------------------------------------------------
 
-def _fire_n8n_enrollment(instance_pk):
-    """
-    Dispatch all active n8n workflows for trigger_event='enrollment.confirmed'.
-    Runs in a separate daemon thread so it never blocks the HTTP request cycle.
-    """
-    import logging
-    logger = logging.getLogger(__name__)
-    try:
-        from django.apps import apps
-        N8NWorkflow = apps.get_model('users', 'N8NWorkflow')
-        N8NExecutionLog = apps.get_model('users', 'N8NExecutionLog')
-        from src.backend.core.n8n_client import trigger_workflow
-        from .models import Enrollment
-
-        workflows = N8NWorkflow.objects.filter(
-            trigger_event='enrollment.confirmed', is_active=True
-        )
-        if not workflows.exists():
-            return
-
-        # Fetch a fresh copy to avoid cross-thread lazy-load issues
-        instance = Enrollment.objects.select_related(
-            'student', 'offering', 'offering__unit'
-        ).get(pk=instance_pk)
+@outbox.payload_builder('enrollment.confirmed')
+def _enrollment_confirmed_payloads(enrollment_ids):
+    """Build enrollment.confirmed payloads for a batch of enrollments in one query."""
+    enrollments = Enrollment.objects.select_related(
+        'student', 'offering', 'offering__unit'
+    ).filter(pk__in=enrollment_ids)
 
-        payload = {
+    return {
+        instance.pk: {
             'enrollment_id': instance.pk,
             'student_id': instance.student_id,
             'student_email': instance.student.email,
@@ -168,25 +136,48 @@ def _fire_n8n_enrollment(instance_pk):
             'semester': instance.offering.semester,
             'year': instance.offering.year,
         }
+        for instance in enrollments
+    }
 
-        for wf in workflows:
-            log = N8NExecutionLog.objects.create(
-                workflow=wf,
-                triggered_by=None,
-                start_time=timezone.now(),
-                status='running',
-                input_data=payload,
-            )
-            try:
-                sc, resp = trigger_workflow(wf, instance.pk, payload)
-                log.status = 'completed' if 200 <= sc < 300 else 'failed'
-                log.output_data = {'status_code': sc, 'response': resp}
-            except Exception as exc:
-                log.status = 'failed'
-                log.error_details = {'error': str(exc)}
-            finally:
-                log.end_time = timezone.now()
-                log.save()
-
-    except Exception:
-        logger.exception('_fire_n8n_enrollment error for pk=%s', instance_pk)
+
+# ---------------------------------------------------------------------------
+# Dashboard snapshot invalidation (enrollment/dashboard.py)
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def invalidate_student_dashboard(sender, instance, **kwargs):
+    student_id = getattr(instance, 'student_id', None) or getattr(instance, 'user_id', None)
+    dashboard.touch_students([student_id])
+
+
+@receiver(post_save, sender=SemesterOffering)
+@receiver(post_delete, sender=SemesterOffering)
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+@receiver(post_save, sender=CourseUnit)
+@receiver(post_delete, sender=CourseUnit)
+def invalidate_catalogue_dashboards(sender, instance, **kwargs):
+    dashboard.touch_catalogue()
+
+
+@receiver(post_save, sender=SemesterOffering)
+def promote_waitlist_on_capacity(sender, instance, created, **kwargs):
+    """A capacity increase frees seats — hand them to the waitlist."""
+    if created or not instance.waitlist.filter(status='waiting').exists():
+        return
+    if not instance.capacity or instance.current_enrollment < instance.capacity:
+        from .waitlist import schedule_promotion
+        schedule_promotion(instance.pk)
+
+
+@receiver(m2m_changed, sender=Unit.prerequisites.through)
+def invalidate_dashboards_on_prerequisites(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        dashboard.touch_catalogue()
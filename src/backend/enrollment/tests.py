@@ -1,8 +1,23 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from src.backend.academic.models import Unit, SemesterOffering
-from src.backend.enrollment.models import Enrollment, EnrollmentApproval
-from src.backend.core.models import Notification
+from src.backend.academic.unit_graph import get_graph
+from src.backend.core import jobs, notifications
+from src.backend.core.models import (
+    AttendanceRecord, BackgroundJob, Event, EventAudience, Notification, OutboxMessage, Session,
+)
+from src.backend.enrollment import dashboard, waitlist
+from src.backend.enrollment.models import Enrollment, EnrollmentApproval, WaitlistEntry
 from django.utils import timezone
 
 User = get_user_model()
@@ -83,3 +98,405 @@ class EnrollmentNotificationTests(TestCase):
         self.assertEqual(notif.recipient, self.student)
         self.assertIn('withdrawn', notif.verb.lower())
         self.assertEqual(notif.target_object_id, self.enrollment.pk)
+
+    def test_saving_a_loaded_enrollment_does_not_reread_it(self):
+        enrollment = Enrollment.objects.get(pk=self.enrollment.pk)
+        Notification.objects.all().delete()
+        enrollment.grade = 'HD'
+        with CaptureQueriesContext(connection) as queries:
+            enrollment.save()
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT') and 'enrollment_enrollment' in q['sql']])
+        self.assertFalse(Notification.objects.exists())
+
+        enrollment.status = 'ENROLLED'
+        enrollment.save()
+        enrollment.save()  # unchanged status: no second notification
+        self.assertEqual(Notification.objects.filter(recipient=self.student).count(), 1)
+
+    def test_hand_built_enrollment_reads_stored_status_once(self):
+        Notification.objects.all().delete()
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(status='ENROLLED')
+        Enrollment(pk=self.enrollment.pk, student=self.student, offering=self.offering, status='ENROLLED',
+                   created_at=self.enrollment.created_at).save()
+        self.assertFalse(Notification.objects.exists())
+
+
+class EnrollmentDashboardCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(
+            email='dash@example.com', username='dash', password='pwd', user_type='student',
+        )
+        self.offering = make_offering()
+        self.client.force_authenticate(user=self.student)
+
+    def _dashboard(self):
+        resp = self.client.get(reverse('enrollment-dashboard'))
+        self.assertEqual(resp.status_code, 200)
+        return resp.data
+
+    def test_repeat_load_is_a_cache_read(self):
+        first = self._dashboard()
+        self.assertEqual([u['unit']['code'] for u in first['available_units']], ['TST101'])
+        with self.assertNumQueries(1):  # the two versions
+            self.assertEqual(dashboard.snapshot(self.student), first)
+
+    def test_own_changes_invalidate_snapshot(self):
+        self._dashboard()
+        enrollment = Enrollment.objects.create(student=self.student, offering=self.offering)
+        data = self._dashboard()
+        self.assertEqual([e['id'] for e in data['current_enrollments']], [enrollment.id])
+        self.assertEqual(data['statistics']['pending_approval'], 1)
+
+        session = Session.objects.create(
+            unit=self.offering.unit, offering=self.offering,
+            date=timezone.now().date(), start_time='09:00', end_time='12:00',
+        )
+        self.assertEqual(self._dashboard()['offering_cards'][0]['attendance_summary']['total_sessions'], 1)
+        AttendanceRecord.objects.create(session=session, student=self.student, status='present')
+        self.assertEqual(self._dashboard()['offering_cards'][0]['attendance_summary']['attended_sessions'], 1)
+
+    def test_other_students_changes_keep_snapshot(self):
+        self._dashboard()
+        key = dashboard.cache_key(self.student.pk)
+        other = User.objects.create_user(email='o@example.com', username='o', password='pwd')
+        Enrollment.objects.create(student=other, offering=self.offering)
+        self.assertEqual(dashboard.cache_key(self.student.pk), key)
+
+        # …but an offering change reaches every student
+        self.offering.capacity = 40
+        self.offering.save()
+        self.assertNotEqual(dashboard.cache_key(self.student.pk), key)
+        self.assertEqual(self._dashboard()['available_units'][0]['capacity'], 40)
+
+    def test_build_query_count_does_not_grow_with_offerings(self):
+        convenor = User.objects.create_user(email='conv@example.com', username='conv', password='pwd')
+        base = Unit.objects.create(code='BASE100', name='Base')
+        Enrollment.objects.create(student=self.student, offering=self.offering, status='ENROLLED')
+        now = timezone.now()
+        for i in range(30):
+            unit = Unit.objects.create(code=f'BULK{i:03}', name=f'Bulk {i}', convenor=convenor)
+            unit.prerequisites.add(base)
+            offering = SemesterOffering.objects.create(
+                unit=unit, year=now.year, semester='S2',
+                enrollment_start=now - timezone.timedelta(days=1),
+                enrollment_end=now + timezone.timedelta(days=30),
+            )
+            Session.objects.create(unit=unit, offering=offering, date=now.date(), start_time='09:00',
+                                   instructor=convenor)
+
+        get_graph()  # compiled once per catalogue change, not per request
+        # enrollments, profile, course units, open offerings, graph version,
+        # sessions, attendance, next window opening
+        with self.assertNumQueries(8):
+            data, _ = dashboard.build(self.student, now)
+        self.assertEqual(len(data['available_units']), 30)
+        self.assertEqual(data['available_units'][0]['missing_prerequisites'], [{'code': 'BASE100', 'name': 'Base'}])
+        self.assertEqual(data['offering_cards'][-1]['instructor']['email'], 'conv@example.com')
+        self.assertIs(data['offering_cards'][0]['offering'], data['current_enrollments'][0]['offering'])
+
+
+class UnitGraphTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email='graph@example.com', username='graph', password='pwd', user_type='student',
+        )
+        self.a, self.b, self.c, self.d = [
+            Unit.objects.create(code=f'GRA{i}', name=f'Graph {i}') for i in range(4)
+        ]
+        self.b.prerequisites.add(self.a)
+        self.c.prerequisites.add(self.b)
+        self.d.anti_requisites.add(self.a)
+
+    def test_closure_and_cycle_refusal(self):
+        graph = get_graph()
+        self.assertEqual(graph.closure[self.c.id], {self.a.id, self.b.id})
+        self.assertTrue(graph.would_create_cycle(self.a.id, [self.c.id]))
+        with self.assertRaises(ValidationError), transaction.atomic():
+            self.a.prerequisites.add(self.c)
+        self.assertFalse(self.a.prerequisites.exists())
+
+        # an M2M change recompiles the graph
+        self.c.prerequisites.add(self.d)
+        self.assertEqual(get_graph().missing_prerequisites(self.c.id, [self.b.id]), [self.d.id])
+        self.assertIsNot(get_graph(), graph)
+
+    def test_eligible_units(self):
+        graph = get_graph()
+        self.assertEqual(graph.eligible(completed=[]), {self.a.id, self.d.id})
+        # a completed: b opens up, d clashes with a
+        self.assertEqual(graph.eligible(completed=[self.a.id]), {self.b.id})
+
+    def test_enrollment_validation_uses_graph(self):
+        now = timezone.now()
+        offerings = {
+            unit.code: SemesterOffering.objects.create(
+                unit=unit, year=now.year, semester='S1',
+                enrollment_start=now - timezone.timedelta(days=1),
+                enrollment_end=now + timezone.timedelta(days=30),
+            )
+            for unit in (self.a, self.b, self.d)
+        }
+        with self.assertRaisesMessage(ValidationError, 'Missing prerequisites: GRA0 - Graph 0'):
+            Enrollment(student=self.student, offering=offerings['GRA1']).clean()
+
+        Enrollment.objects.create(student=self.student, offering=offerings['GRA0'], status='COMPLETED')
+        Enrollment(student=self.student, offering=offerings['GRA1']).clean()
+        with self.assertRaisesMessage(ValidationError, 'anti-requisite GRA0 - Graph 0'):
+            Enrollment(student=self.student, offering=offerings['GRA3']).clean()
+
+
+class SeatReservationTests(TestCase):
+    def setUp(self):
+        self.offering = make_offering()
+        self.offering.capacity = 1
+        self.offering.save()
+        self.first, self.second = [
+            Enrollment.objects.create(
+                student=User.objects.create_user(email=f'seat{i}@example.com', username=f'seat{i}', password='pwd'),
+                offering=self.offering,
+            )
+            for i in range(2)
+        ]
+
+    def test_full_offering_refuses_enrollment(self):
+        self.first.enroll()
+        with self.assertRaisesMessage(ValidationError, 'maximum capacity'):
+            self.second.enroll()
+        self.second.refresh_from_db()
+        self.offering.refresh_from_db()
+        self.assertEqual((self.second.status, self.offering.current_enrollment), ('PENDING', 1))
+
+        # Approving twice takes one seat; withdrawing gives it back once
+        self.first.enroll()
+        self.first.withdraw()
+        self.offering.refresh_from_db()
+        self.assertEqual(self.offering.current_enrollment, 0)
+        self.second.enroll()
+
+    def test_withdrawing_pending_keeps_seat_count(self):
+        self.first.enroll()
+        self.second.withdraw()
+        self.offering.refresh_from_db()
+        self.assertEqual(self.offering.current_enrollment, 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs concurrent writers (PostgreSQL)')
+class SeatReservationStressTests(TransactionTestCase):
+    """Hundreds of parallel approvals against a small offering — none may oversell."""
+    requests = 200
+    capacity = 25
+    max_workers = 32
+
+    def _pool_size(self):
+        # Each worker holds its own connection, and the server's limit
+        # (100 on stock PostgreSQL) is shared with the other services —
+        # stay well below what is left.
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW max_connections')
+            limit = int(cursor.fetchone()[0])
+            cursor.execute('SELECT count(*) FROM pg_stat_activity')
+            in_use = cursor.fetchone()[0]
+        return min(self.max_workers, limit - in_use - 10)
+
+    def test_parallel_approvals_never_oversell(self):
+        workers = self._pool_size()
+        if workers < 2:
+            self.skipTest('not enough free PostgreSQL connections')
+        offering = make_offering()
+        SemesterOffering.objects.filter(pk=offering.pk).update(capacity=self.capacity)
+        students = User.objects.bulk_create([
+            User(username=f'stress{i}', email=f'stress{i}@example.com') for i in range(self.requests)
+        ])
+        enrollments = Enrollment.objects.bulk_create([
+            Enrollment(student=student, offering=offering) for student in students
+        ])
+        start = threading.Event()
+
+        def approve(enrollment):
+            start.wait()
+            try:
+                enrollment.enroll()
+                return True
+            except ValidationError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(approve, enrollment) for enrollment in enrollments]
+            start.set()
+            results = [future.result() for future in futures]
+
+        offering.refresh_from_db()
+        self.assertEqual(results.count(True), self.capacity)
+        self.assertEqual(offering.current_enrollment, self.capacity)
+        self.assertEqual(Enrollment.objects.filter(offering=offering, status='ENROLLED').count(), self.capacity)
+
+
+class WaitlistTests(APITestCase):
+    def setUp(self):
+        self.offering = make_offering()
+        SemesterOffering.objects.filter(pk=self.offering.pk).update(capacity=2)
+        self.students = [
+            User.objects.create_user(email=f'wait{i}@example.com', username=f'wait{i}', password='pwd',
+                                     user_type='student')
+            for i in range(5)
+        ]
+        self.held = []
+        for student in self.students[:2]:
+            enrollment = Enrollment.objects.create(student=student, offering=self.offering)
+            enrollment.enroll()
+            self.held.append(enrollment)
+
+    def _enroll(self, student):
+        self.client.force_authenticate(user=student)
+        return self.client.post(reverse('enrollment-list'), {'offering': self.offering.pk}, format='json')
+
+    def test_full_offering_queues_and_promotes_on_withdraw(self):
+        positions = [self._enroll(student).data['position'] for student in self.students[2:]]
+        self.assertEqual(positions, [1, 2, 3])
+        self.assertFalse(Enrollment.objects.filter(student__in=self.students[2:]).exists())
+        # Priority jumps the queue
+        WaitlistEntry.objects.filter(student=self.students[4]).update(priority=5)
+
+        self.held[0].withdraw()
+        self.held[1].withdraw()
+        self.assertEqual(BackgroundJob.objects.filter(kind='offering.promote_waitlist').count(), 1)
+        jobs.run_pending()
+
+        promoted = set(
+            Enrollment.objects.filter(offering=self.offering, status='ENROLLED').values_list('student_id', flat=True)
+        )
+        self.assertEqual(promoted, {self.students[4].pk, self.students[2].pk})
+        self.offering.refresh_from_db()
+        self.assertEqual(self.offering.current_enrollment, 2)
+        self.assertTrue(Notification.objects.filter(recipient=self.students[4], verb=waitlist.PROMOTED_VERB).exists())
+        self.assertEqual(notifications.unread_count(self.students[4]), 1)
+
+        self.client.force_authenticate(user=self.students[3])
+        self.assertEqual(self.client.get(reverse('enrollment-waitlist')).data[0]['position'], 1)
+
+    def test_capacity_increase_promotes_and_leave(self):
+        self._enroll(self.students[2])
+        self._enroll(self.students[3])
+        resp = self.client.post(reverse('enrollment-leave-waitlist'), {'offering': self.offering.pk}, format='json')
+        self.assertEqual(resp.status_code, 200)
+
+        self.offering.refresh_from_db()
+        self.offering.capacity = 5
+        self.offering.save()
+        jobs.run_pending()
+        self.assertEqual(
+            list(Enrollment.objects.filter(status='ENROLLED').exclude(pk__in=[e.pk for e in self.held])
+                 .values_list('student_id', flat=True)),
+            [self.students[2].pk],
+        )
+
+
+    def test_promoted_students_join_event_audience(self):
+        event = Event.objects.create(title='Lab induction', start=timezone.now())
+        event.target_offerings.add(self.offering)
+        self._enroll(self.students[2])
+
+        self.held[0].withdraw()
+        waitlist.promote(self.offering.pk)
+        self.assertEqual(
+            set(EventAudience.objects.filter(event=event).values_list('student_id', flat=True)),
+            {self.held[0].student_id, self.held[1].student_id, self.students[2].pk},
+        )
+
+    def test_promotion_skips_ineligible_entries_and_fills_the_seat(self):
+        for student in self.students[2:]:
+            self._enroll(student)
+        # students[2] now has a pending enrollment, students[3] lacks a new prerequisite
+        Enrollment.objects.create(student=self.students[2], offering=self.offering)
+        prerequisite = Unit.objects.create(code='TST100', name='Intro')
+        self.offering.unit.prerequisites.add(prerequisite)
+        Enrollment.objects.create(
+            student=self.students[4], offering=SemesterOffering.objects.create(
+                unit=prerequisite, year=2024, semester='S1',
+                enrollment_start=timezone.now(), enrollment_end=timezone.now(),
+            ), status='COMPLETED',
+        )
+
+        self.held[0].withdraw()
+        self.assertEqual(waitlist.promote(self.offering.pk, batch_size=1), 1)
+        self.assertEqual(
+            dict(WaitlistEntry.objects.values_list('student_id', 'status')),
+            {self.students[2].pk: 'cancelled', self.students[3].pk: 'cancelled', self.students[4].pk: 'promoted'},
+        )
+        self.offering.refresh_from_db()
+        self.assertEqual(self.offering.current_enrollment, 2)
+
+    def test_closed_offering_keeps_entries_waiting(self):
+        self._enroll(self.students[2])
+        SemesterOffering.objects.filter(pk=self.offering.pk).update(
+            enrollment_end=timezone.now() - timezone.timedelta(minutes=1),
+        )
+        self.held[0].withdraw()
+        self.assertEqual(waitlist.promote(self.offering.pk), 0)
+        self.assertEqual(WaitlistEntry.objects.get(student=self.students[2]).status, 'waiting')
+
+    def test_active_enrollment_cannot_join_waitlist(self):
+        Enrollment.objects.create(student=self.students[2], offering=self.offering)
+        resp = self._enroll(self.students[2])
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        resp = self._enroll(self.held[0].student)
+        self.assertEqual(resp.status_code, 400)
+
+
+class BulkApproveTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email='bulk_staff@example.com', username='bulk_staff', password='pwd', is_staff=True,
+        )
+        self.offering = make_offering()
+        SemesterOffering.objects.filter(pk=self.offering.pk).update(capacity=3)
+        other_unit = Unit.objects.create(code='TST202', name='Other Unit')
+        self.unlimited = SemesterOffering.objects.create(
+            unit=other_unit, year=2025, semester='S1',
+            enrollment_start=timezone.now() - timezone.timedelta(days=1),
+            enrollment_end=timezone.now() + timezone.timedelta(days=30),
+        )
+        self.students = [
+            User.objects.create_user(email=f'bulk{i}@example.com', username=f'bulk{i}', password='pwd')
+            for i in range(5)
+        ]
+        self.pending = [Enrollment.objects.create(student=s, offering=self.offering) for s in self.students]
+        self.other = Enrollment.objects.create(student=self.students[0], offering=self.unlimited)
+        Notification.objects.all().delete()
+        self.client.force_authenticate(user=self.staff)
+
+    def _bulk(self, body):
+        return self.client.post(reverse('enrollment-bulk-approve'), body, format='json')
+
+    def test_ids_are_approved_up_to_capacity(self):
+        ids = [e.pk for e in self.pending] + [self.other.pk]
+        resp = self._bulk({'ids': ids})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['approved'], 4)
+        self.assertEqual(sorted(resp.data['approved_ids']), sorted([e.pk for e in self.pending[:3]] + [self.other.pk]))
+        self.assertEqual(resp.data['full_ids'], [e.pk for e in self.pending[3:]])
+
+        self.offering.refresh_from_db()
+        self.assertEqual(self.offering.current_enrollment, 3)
+        self.assertEqual(Notification.objects.filter(verb='Enrollment enrolled').count(), 4)
+        # One batch message per offering
+        batches = OutboxMessage.objects.filter(topic='enrollment.confirmed').values_list('object_ids', flat=True)
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(sorted(pk for ids in batches for pk in ids), sorted(resp.data['approved_ids']))
+
+        # Approving again skips the already-enrolled rows
+        self.assertEqual(self._bulk({'ids': ids}).data['skipped_ids'], sorted(resp.data['approved_ids']))
+
+    def test_filter_and_staff_only(self):
+        resp = self._bulk({'unit': self.unlimited.unit_id})
+        self.assertEqual(resp.data['approved_ids'], [self.other.pk])
+        self.assertEqual(self._bulk({}).status_code, 400)
+        for body in ({'ids': ['x']}, {'ids': 5}, {'offering': 'abc'}, {'unit': [1]}):
+            self.assertEqual(self._bulk(body).status_code, 400, body)
+
+        self.client.force_authenticate(user=self.students[0])
+        self.assertEqual(self._bulk({'offering': self.offering.pk}).status_code, 403)
@@ -0,0 +1,215 @@
+"""
+enrollment/waitlist.py — Waitlist for full offerings and bulk promotion.
+
+Enrolling in a full offering (``POST /api/enrollment/enrollments/``) puts
+the student on the offering's waitlist instead of failing, and tells them
+their position, so they stop retrying.  The queue is WaitlistEntry rows in
+``status='waiting'``, served highest ``priority`` first and then in arrival
+order; positions and promotion read them through the partial index
+``enroll_waitlist_queue_idx`` on (offering, -priority, id).
+
+When ``Enrollment.withdraw`` gives a seat back (or an offering is saved with
+free seats and people waiting) an ``offering.promote_waitlist`` job is
+queued (core/jobs.py).  The job promotes in batches of
+WAITLIST_PROMOTION_BATCH_SIZE until no seat is free or nobody is waiting;
+each batch is one transaction holding the offering row lock — the same lock
+``SemesterOffering.reserve_seat`` takes — that:
+
+  * claims the next waiting entries, never more than the free seats, and
+    only while the offering's enrollment window is open;
+  * cancels the entries ``Enrollment.clean`` would refuse (missing
+    prerequisites, a held anti-requisite) and those of students already
+    PENDING or ENROLLED in the offering — checked for the whole batch at once;
+  * creates (or re-activates) the others' enrollments as ENROLLED with one
+    INSERT / one UPDATE and moves ``current_enrollment`` by as many;
+  * marks the entries promoted and adds the students to the EventAudience
+    of events targeting the offering or its intake;
+  * writes their notifications, unread counters, ``enrollment.confirmed``
+    outbox message and dashboard invalidations in bulk
+    (``approvals.record_enrolled`` — bulk writes skip the Enrollment signals).
+"""
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from src.backend.academic.models import SemesterOffering
+from src.backend.academic.unit_graph import get_graph
+from src.backend.core import audience, jobs
+from src.backend.core.jobs import job_handler
+
+from .approvals import record_enrolled
+from .models import Enrollment, WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+PROMOTED_VERB = 'Enrolled from waitlist'
+PROMOTE_JOB = 'offering.promote_waitlist'
+# An enrollment in these states already has (or is asking for) the seat
+ACTIVE_STATUSES = ('PENDING', 'ENROLLED')
+
+
+def join(student, offering, priority=0):
+    """
+    Put ``student`` on ``offering``'s waitlist (at the back if they had left
+    it); returns the entry.  Raises ValidationError if they already hold a
+    pending or active enrollment in it.
+    """
+    if Enrollment.objects.filter(student=student, offering=offering, status__in=ACTIVE_STATUSES).exists():
+        raise ValidationError('You already have an enrollment in this offering.')
+    entry, created = WaitlistEntry.objects.get_or_create(
+        student=student, offering=offering, defaults={'priority': priority},
+    )
+    if not created and entry.status != 'waiting':
+        # Re-joining queues behind everyone already waiting: a fresh row, a fresh id
+        WaitlistEntry.objects.filter(pk=entry.pk).delete()
+        entry = WaitlistEntry.objects.create(student=student, offering=offering, priority=priority)
+    return entry
+
+
+def leave(student, offering_id):
+    """Take ``student`` off the waitlist; returns whether they were waiting."""
+    return bool(
+        WaitlistEntry.objects.filter(student=student, offering_id=offering_id, status='waiting')
+        .update(status='cancelled', updated_at=timezone.now())
+    )
+
+
+def position(entry):
+    """1-based place of a waiting ``entry`` in its offering's queue (None once it has left)."""
+    if entry.status != 'waiting':
+        return None
+    return WaitlistEntry.objects.filter(
+        Q(priority__gt=entry.priority) | Q(priority=entry.priority, id__lte=entry.id),
+        offering_id=entry.offering_id, status='waiting',
+    ).count()
+
+
+def schedule_promotion(offering_id):
+    """Queue a promotion job for ``offering_id`` unless one is already queued."""
+    BackgroundJob = apps.get_model('core', 'BackgroundJob')
+    if BackgroundJob.objects.filter(kind=PROMOTE_JOB, status='queued', payload__offering_id=offering_id).exists():
+        return None
+    return jobs.enqueue(PROMOTE_JOB, {'offering_id': offering_id})
+
+
+def _ineligible(offering, student_ids):
+    """
+    The ``student_ids`` that ``Enrollment.clean`` would refuse for
+    ``offering`` — missing prerequisites or holding an anti-requisite — plus
+    those already PENDING or ENROLLED in it.  A handful of queries for the
+    whole batch.
+    """
+    graph = get_graph()
+    unit_id = offering.unit_id
+    refused = set(
+        Enrollment.objects.filter(offering=offering, student_id__in=student_ids, status__in=ACTIVE_STATUSES)
+        .values_list('student_id', flat=True)
+    )
+    if graph.prerequisites.get(unit_id) or graph.anti.get(unit_id):
+        completed, held = defaultdict(set), defaultdict(set)
+        for student_id, held_unit, status in (
+            Enrollment.objects.filter(student_id__in=student_ids, status__in=['ENROLLED', 'COMPLETED'])
+            .values_list('student_id', 'offering__unit_id', 'status')
+        ):
+            held[student_id].add(held_unit)
+            if status == 'COMPLETED':
+                completed[student_id].add(held_unit)
+        refused.update(
+            student_id for student_id in student_ids
+            if graph.missing_prerequisites(unit_id, completed[student_id])
+            or graph.conflicts(unit_id, held[student_id])
+        )
+    return refused
+
+
+def _promote_batch(offering_id, batch_size, now):
+    """
+    Promote one batch; returns ``(promoted, claimed)`` — the students enrolled
+    and the number of waiting entries taken off the queue (0 once there is
+    nothing left to do).
+    """
+    with transaction.atomic():
+        offering = SemesterOffering.objects.select_for_update().filter(pk=offering_id).first()
+        if offering is None or not offering.enrollment_start <= now <= offering.enrollment_end:
+            # Outside the enrollment window entries keep waiting
+            return [], 0
+        free = offering.capacity - offering.current_enrollment if offering.capacity else batch_size
+        if free <= 0:
+            return [], 0
+        entries = list(
+            WaitlistEntry.objects.select_for_update(skip_locked=True)
+            .filter(offering_id=offering_id, status='waiting')
+            .order_by('-priority', 'id')
+            .values_list('id', 'student_id')[:min(free, batch_size)]
+        )
+        if not entries:
+            return [], 0
+
+        # Entries Enrollment.clean would refuse leave the queue without a seat
+        refused = _ineligible(offering, [student_id for _, student_id in entries])
+        if refused:
+            WaitlistEntry.objects.filter(
+                pk__in=[entry_id for entry_id, student_id in entries if student_id in refused],
+            ).update(status='cancelled', updated_at=now)
+        entry_ids = [entry_id for entry_id, student_id in entries if student_id not in refused]
+        promoted = [student_id for _, student_id in entries if student_id not in refused]
+        if not promoted:
+            return [], len(entries)
+
+        # A withdrawn enrollment is re-activated; anyone else gets a new row
+        reactivated = set(
+            Enrollment.objects.filter(offering_id=offering_id, student_id__in=promoted)
+            .values_list('student_id', flat=True)
+        )
+        if reactivated:
+            Enrollment.objects.filter(offering_id=offering_id, student_id__in=reactivated).update(
+                status='ENROLLED', withdrawn_date=None, updated_at=now,
+            )
+        Enrollment.objects.bulk_create([
+            Enrollment(student_id=student_id, offering_id=offering_id, status='ENROLLED')
+            for student_id in promoted if student_id not in reactivated
+        ])
+        SemesterOffering.objects.filter(pk=offering_id).update(
+            current_enrollment=F('current_enrollment') + len(promoted),
+        )
+        WaitlistEntry.objects.filter(pk__in=entry_ids).update(status='promoted', promoted_at=now, updated_at=now)
+        # bulk_create skips enrollment_audience_post_save
+        audience.add_offering_students(offering_id, promoted)
+
+        record_enrolled(
+            list(
+                Enrollment.objects.filter(offering_id=offering_id, student_id__in=promoted)
+                .values_list('id', 'student_id')
+            ),
+            verb=PROMOTED_VERB,
+        )
+    return promoted, len(entries)
+
+
+def promote(offering_id, batch_size=None, now=None):
+    """Fill ``offering_id``'s free seats from its waitlist; returns the number of students promoted."""
+    batch_size = batch_size or getattr(settings, 'WAITLIST_PROMOTION_BATCH_SIZE', 200)
+    now = now or timezone.now()
+    total = 0
+    # Each batch re-reads the free seats; refused entries leave the queue, so
+    # keep going until no seat is free or nobody is left waiting.
+    while True:
+        promoted, claimed = _promote_batch(offering_id, batch_size, now)
+        total += len(promoted)
+        if not claimed:
+            break
+    if total:
+        logger.info('Promoted %s waitlisted students into offering %s', total, offering_id)
+    return total
+
+
+@job_handler(PROMOTE_JOB)
+def promote_waitlist(job):
+    offering_id = job.payload.get('offering_id')
+    return {'offering_id': offering_id, 'promoted': promote(offering_id)}
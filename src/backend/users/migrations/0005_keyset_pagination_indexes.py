@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_remove_auditlog_action_time_auditlog_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='n8nexecutionlog',
+            index=models.Index(fields=['-start_time', '-id'], name='users_n8nlog_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='n8nexecutionlog',
+            index=models.Index(fields=['workflow', '-start_time', '-id'], name='users_n8nlog_wf_start_idx'),
+        ),
+    ]
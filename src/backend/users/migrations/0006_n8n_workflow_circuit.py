@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='n8nworkflow',
+            name='circuit_opened_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='n8nworkflow',
+            name='circuit_probe_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -245,7 +245,11 @@ class N8NWorkflow(BaseModel):
     configuration = models.JSONField(default=dict)
     is_active = models.BooleanField(default=True)
     last_run = models.DateTimeField(null=True, blank=True)
+    # Consecutive failed calls; reset on success. Drives the circuit breaker
+    # in core/circuit.py together with the two fields below.
     error_count = models.IntegerField(default=0)
+    circuit_opened_at = models.DateTimeField(null=True, blank=True)
+    circuit_probe_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.name} ({self.workflow_id})"
@@ -270,5 +274,13 @@ class N8NExecutionLog(BaseModel):
     output_data = models.JSONField(null=True, blank=True)
     error_details = models.JSONField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order for N8NExecutionLogViewSet, with and
+            # without the ?workflow= filter
+            models.Index(fields=['-start_time', '-id'], name='users_n8nlog_start_id_idx'),
+            models.Index(fields=['workflow', '-start_time', '-id'], name='users_n8nlog_wf_start_idx'),
+        ]
+
     def __str__(self):
         return f"{self.workflow.name} - {self.execution_id}"
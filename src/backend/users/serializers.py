@@ -40,15 +40,22 @@ class UserCreateSerializer(serializers.ModelSerializer):
 
 class N8NWorkflowSerializer(serializers.ModelSerializer):
     """Serializer for managing n8n webhook workflow registrations."""
+    circuit_state = serializers.SerializerMethodField()
 
     class Meta:
         model = N8NWorkflow
         fields = [
             'id', 'workflow_id', 'name', 'description', 'trigger_event',
             'configuration', 'is_active', 'last_run', 'error_count',
+            'circuit_state', 'circuit_opened_at',
             'created_at', 'updated_at',
         ]
-        read_only_fields = ['workflow_id', 'last_run', 'error_count', 'created_at', 'updated_at']
+        read_only_fields = ['workflow_id', 'last_run', 'error_count', 'circuit_opened_at',
+                            'created_at', 'updated_at']
+
+    def get_circuit_state(self, obj):
+        from src.backend.core import circuit
+        return circuit.state(obj)
 
 
 class N8NExecutionLogSerializer(serializers.ModelSerializer):
@@ -1,4 +1,5 @@
 from rest_framework import viewsets, filters, permissions, status
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
@@ -6,6 +7,7 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 
 from .models import N8NWorkflow, N8NExecutionLog
+from src.backend.core.pagination import StartTimePagination
 from .serializers import (
     UserSerializer, N8NWorkflowSerializer, N8NExecutionLogSerializer
 )
@@ -63,6 +65,10 @@ class N8NWorkflowViewSet(viewsets.ModelViewSet):
     GET    /api/users/n8n-workflows/{id}/   — retrieve one
     PATCH  /api/users/n8n-workflows/{id}/   — update (e.g. enable/disable, change URL)
     DELETE /api/users/n8n-workflows/{id}/   — deregister
+    POST   /api/users/n8n-workflows/{id}/reset_circuit/ — close the circuit breaker
+
+    Each workflow reports ``circuit_state`` (closed | open | half_open) and
+    ``error_count`` (consecutive failures) — see core/circuit.py.
 
     Example body for POST:
       {
@@ -90,17 +96,27 @@ class N8NWorkflowViewSet(viewsets.ModelViewSet):
             qs = qs.filter(is_active=(active.lower() == 'true'))
         return qs
 
+    @action(detail=True, methods=['post'])
+    def reset_circuit(self, request, pk=None):
+        """Close the workflow's circuit breaker, e.g. once n8n is known to be back."""
+        from src.backend.core import circuit
+        workflow = self.get_object()
+        circuit.reset(workflow)
+        return Response(self.get_serializer(workflow).data)
+
 
 class N8NExecutionLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Staff-only read access to n8n execution history.
 
-    GET /api/users/n8n-logs/               — list all logs (filter by ?workflow=<id>)
+    GET /api/users/n8n-logs/               — list logs, newest first, cursor-paginated
+                                             (filter by ?workflow=<id>, ?status=...)
     GET /api/users/n8n-logs/{id}/          — retrieve one execution log
     """
-    queryset = N8NExecutionLog.objects.all().order_by('-start_time')
+    queryset = N8NExecutionLog.objects.select_related('workflow', 'triggered_by').order_by('-start_time', '-id')
     serializer_class = N8NExecutionLogSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = StartTimePagination
 
     def get_queryset(self):
         qs = super().get_queryset()
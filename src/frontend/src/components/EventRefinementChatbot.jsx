@@ -24,6 +24,23 @@ import { api } from '../services/api';
 import EventTargeting from './EventTargeting';
 
 const CONTENT_KEYS = ['social_post', 'email_newsletter', 'recruitment_ad', 'vietnamese_version'];
+const JOB_POLL_INTERVAL_MS = 1500;
+const JOB_POLL_TIMEOUT_MS = 120000;
+
+// refine_content answers 202 + job_id when the n8n refiner runs in the
+// background worker; poll the job until it finishes.
+async function waitForJob(jobId) {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    const res = await api.get(`/core/jobs/${jobId}/`);
+    if (res.data.status === 'succeeded') return res.data.result || {};
+    if (res.data.status === 'failed') {
+      throw new Error(res.data.last_error || 'Refinement failed.');
+    }
+  }
+  throw new Error('Refinement is taking longer than expected — check back shortly.');
+}
 
 function ContentPreview({ content }) {
   if (!content || Object.keys(content).length === 0) {
@@ -121,7 +138,8 @@ export default function EventRefinementChatbot({ eventId, onClose, onPublish })
         chat_history: chatHistory, // send history before this turn
       });
 
-      const refined = res.data.generated_content || {};
+      const data = res.status === 202 ? await waitForJob(res.data.job_id) : res.data;
+      const refined = data.generated_content || {};
       setCurrentContent(refined);
 
       // Build a short assistant summary for the chat
@@ -131,7 +149,7 @@ export default function EventRefinementChatbot({ eventId, onClose, onPublish })
 
       setChatHistory(prev => [...prev, { role: 'assistant', content: summary }]);
     } catch (err) {
-      const msg = err.response?.data?.detail || err.response?.data?.error || 'Refinement failed.';
+      const msg = err.response?.data?.detail || err.response?.data?.error || err.message || 'Refinement failed.';
       setError(msg);
       // Remove the user turn we optimistically added
       setChatHistory(chatHistory);
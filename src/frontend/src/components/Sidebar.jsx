@@ -10,6 +10,8 @@ import PersonRoundedIcon from "@mui/icons-material/PersonRounded";
 import MenuBookRoundedIcon from "@mui/icons-material/MenuBookRounded";
 import EventNoteRoundedIcon from "@mui/icons-material/EventNoteRounded";
 import LogoutRoundedIcon from "@mui/icons-material/LogoutRounded";
+import Badge from "@mui/material/Badge";
+import { api } from "../services/api";
 
 export default function Sidebar({ user, onLogout }) {
   const [menu, setMenu] = useState([
@@ -36,6 +38,15 @@ export default function Sidebar({ user, onLogout }) {
     }
   }, [user]);
 
+  // Unread badge — one primary-key read on the server (NotificationCounter)
+  const [unread, setUnread] = useState(0);
+  useEffect(() => {
+    if (!user) return;
+    api.get('/core/notifications/unread-count/')
+      .then((res) => setUnread(res.data.unread || 0))
+      .catch(() => setUnread(0));
+  }, [user]);
+
   const navigate = useNavigate();
 
   const handleLogout = (e) => {
@@ -54,7 +65,11 @@ export default function Sidebar({ user, onLogout }) {
         <div className="sidebar-menu">
           {menu.map((item) => (
             <Link to={item.to} className="sidebar-btn" key={item.to}>
-              <div className="sidebar-icon">{item.icon}</div>
+              <div className="sidebar-icon">
+                {item.to === "/notifications" ? (
+                  <Badge badgeContent={unread} color="error" max={99}>{item.icon}</Badge>
+                ) : item.icon}
+              </div>
               <div className="sidebar-label">{item.label}</div>
             </Link>
           ))}
@@ -80,7 +80,16 @@ export default function EnrollSelect() {
   const doEnroll = async (offeringId) => {
     setActionMessage(null);
     try {
-      await api.post('/enrollment/enrollments/', { offering: offeringId });
+      const response = await api.post('/enrollment/enrollments/', { offering: offeringId });
+      if (response.data?.waitlisted) {
+        // Offering is full: the student was queued and is promoted when a seat frees up
+        setActionMessage({
+          type: 'success',
+          text: `This unit is full — you are #${response.data.position} on the waitlist and will be enrolled automatically when a seat opens.`,
+        });
+        setConfirmOffering(null);
+        return;
+      }
       setActionMessage({ type: 'success', text: 'Enrollment request submitted successfully!' });
       setConfirmOffering(null);
       await loadDashboard();
@@ -1,18 +1,20 @@
 import React, { useEffect, useState } from 'react';
-import { api } from '../services/api';
+import { getPage } from '../services/api';
 
 export default function Events() {
   const [events, setEvents] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     (async () => {
       try {
         // Backend filters events to only those targeted at the logged-in user
-        const resp = await api.get('/core/events/');
-        const data = resp.data;
-        setEvents(Array.isArray(data) ? data : (data.results || []));
+        const page = await getPage('/core/events/');
+        setEvents(page.results);
+        setNext(page.next);
       } catch (err) {
         console.error('Failed to load events', err);
         setError('Failed to load events');
@@ -22,6 +24,20 @@ export default function Events() {
     })();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await getPage(next);
+      setEvents((prev) => [...prev, ...page.results]);
+      setNext(page.next);
+    } catch (err) {
+      console.error('Failed to load more events', err);
+      setError('Failed to load events');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return <section className="stack"><p className="lead">Loading events...</p></section>;
   }
@@ -64,6 +80,11 @@ export default function Events() {
           ))}
         </div>
       )}
+      {next && (
+        <button className="btn" onClick={loadMore} disabled={loadingMore}>
+          {loadingMore ? 'Loading...' : 'Load more events'}
+        </button>
+      )}
     </section>
   );
 }
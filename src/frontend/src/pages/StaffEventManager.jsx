@@ -11,7 +11,9 @@ import ExpandLessIcon from '@mui/icons-material/ExpandLess';
 import PeopleAltIcon from '@mui/icons-material/PeopleAlt';
 import AutoFixHighIcon from '@mui/icons-material/AutoFixHigh';
 import SearchIcon from '@mui/icons-material/Search';
-import { api, authService } from '../services/api';
+import {
+  api, authService, getAll, MAX_WATCHED_EVENTS, watchGenerationStatus,
+} from '../services/api';
 import EventRefinementChatbot from '../components/EventRefinementChatbot';
 import EventTargeting from '../components/EventTargeting';
 
@@ -39,7 +41,7 @@ const VISIBILITY_COLORS = {
 const CONTENT_KEYS = ['social_post', 'email_newsletter', 'recruitment_ad', 'vietnamese_version'];
 
 // Single expandable event row — loads detail lazily on expand
-function EventRow({ event: initialEvent, onRefine, onAudience, onGenerate, onRefresh }) {
+function EventRow({ event: initialEvent, live, onRefine, onAudience, onGenerate, onRefresh }) {
   const [open, setOpen] = useState(false);
   const [event, setEvent] = useState(initialEvent);
   const [detail, setDetail] = useState(null);
@@ -48,6 +50,13 @@ function EventRow({ event: initialEvent, onRefine, onAudience, onGenerate, onRef
   // Sync if parent refreshes
   useEffect(() => { setEvent(initialEvent); }, [initialEvent]);
 
+  // Status pushed by the page's generation stream (see StaffEventManager)
+  useEffect(() => {
+    if (!live) return;
+    setEvent(prev => ({ ...prev, generation_status: live.generation_status }));
+    setDetail(prev => (prev ? { ...prev, ...live } : prev));
+  }, [live]);
+
   const handleExpand = async () => {
     const next = !open;
     setOpen(next);
@@ -221,6 +230,25 @@ export default function StaffEventManager() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // While generation is in flight, one stream pushes status changes for
+  // every pending event on the page (capped at MAX_WATCHED_EVENTS)
+  const [liveStatus, setLiveStatus] = useState({});
+  const pendingKey = events
+    .filter(ev => ev.generation_status === 'pending')
+    .slice(0, MAX_WATCHED_EVENTS)
+    .map(ev => ev.id)
+    .join(',');
+  useEffect(() => {
+    if (!pendingKey) return undefined;
+    return watchGenerationStatus(pendingKey.split(','), (data) => {
+      setLiveStatus(prev => ({ ...prev, [data.id]: data }));
+      // Finished rows drop out of pendingKey, so the stream is reopened without them
+      setEvents(prev => prev.map(ev => (
+        ev.id === data.id ? { ...ev, generation_status: data.generation_status } : ev
+      )));
+    });
+  }, [pendingKey]);
+
   const checkAccess = async () => {
     try {
       const user = await authService.getCurrentUser();
@@ -233,9 +261,8 @@ export default function StaffEventManager() {
   const loadEvents = async () => {
     try {
       setLoading(true);
-      const res = await api.get('/core/events/');
-      const data = res.data;
-      setEvents(Array.isArray(data) ? data : (data.results || []));
+      // Search and filters work on the whole list, so follow every page
+      setEvents(await getAll('/core/events/'));
       setError(null);
     } catch { setError('Failed to load events'); }
     finally { setLoading(false); }
@@ -354,6 +381,7 @@ export default function StaffEventManager() {
               <EventRow
                 key={ev.id}
                 event={ev}
+                live={liveStatus[ev.id]}
                 onRefine={(id) => { setChatbotEventId(id); setChatbotOpen(true); }}
                 onAudience={(id) => { setAudienceEventId(id); setAudienceOpen(true); }}
                 onGenerate={handleGenerateContent}
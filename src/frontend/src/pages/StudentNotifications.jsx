@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { api } from '../services/api';
+import { api, getPage } from '../services/api';
 
 const notificationTypeIcons = {
   attendance: '✅',
@@ -17,6 +17,10 @@ export default function StudentNotifications() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [filterType, setFilterType] = useState('all');
+  // `next` cursors of the two paginated lists (null once fully loaded)
+  const [eventsNext, setEventsNext] = useState(null);
+  const [notificationsNext, setNotificationsNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadData();
@@ -26,14 +30,14 @@ export default function StudentNotifications() {
     try {
       setLoading(true);
       // Backend now filters events to only those targeted at the logged-in student
-      const eventsResponse = await api.get('/core/events/');
-      const data = eventsResponse.data;
-      setEvents(Array.isArray(data) ? data : (data.results || []));
+      const eventsPage = await getPage('/core/events/');
+      setEvents(eventsPage.results);
+      setEventsNext(eventsPage.next);
 
       try {
-        const notifResponse = await api.get('/core/notifications/');
-        const notifData = notifResponse.data;
-        setNotifications(Array.isArray(notifData) ? notifData : (notifData.results || []));
+        const notifPage = await getPage('/core/notifications/');
+        setNotifications(notifPage.results);
+        setNotificationsNext(notifPage.next);
       } catch (e) {
         console.log('Notifications endpoint not available');
       }
@@ -71,6 +75,15 @@ export default function StudentNotifications() {
     }
   };
 
+  const markAllAsRead = async () => {
+    try {
+      await api.post('/core/notifications/mark-all-read/');
+      setNotifications(notifications.map((n) => ({ ...n, unread: false })));
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   const dismissEvent = async (eventId) => {
     try {
       await api.patch(`/core/events/${eventId}/`, { dismissed: true });
@@ -80,6 +93,29 @@ export default function StudentNotifications() {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const [eventsPage, notifPage] = await Promise.all([
+        eventsNext ? getPage(eventsNext) : null,
+        notificationsNext ? getPage(notificationsNext) : null,
+      ]);
+      if (eventsPage) {
+        setEvents((prev) => [...prev, ...eventsPage.results]);
+        setEventsNext(eventsPage.next);
+      }
+      if (notifPage) {
+        setNotifications((prev) => [...prev, ...notifPage.results]);
+        setNotificationsNext(notifPage.next);
+      }
+    } catch (err) {
+      console.error(err);
+      setError('Failed to load more notifications');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const allItems = [
     ...notifications.map((n) => ({
       id: `notif-${n.id}`,
@@ -196,6 +232,11 @@ export default function StudentNotifications() {
         >
           Unread ({unreadCount})
         </button>
+        {unreadCount > 0 && (
+          <button className="chip" onClick={markAllAsRead}>
+            Mark all read
+          </button>
+        )}
         <button
           className={`chip ${filterType === 'events' ? 'active' : ''}`}
           onClick={() => setFilterType('events')}
@@ -277,6 +318,11 @@ export default function StudentNotifications() {
           })}
         </div>
       )}
+      {(eventsNext || notificationsNext) && (
+        <button className="btn" onClick={loadMore} disabled={loadingMore}>
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </section>
   );
 }
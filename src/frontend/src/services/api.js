@@ -52,6 +52,82 @@ api.interceptors.response.use(
     }
 );
 
+// List endpoints are cursor-paginated and answer {results, next}.  getPage
+// reads one page (pass the previous page's `next` to continue); getAll
+// follows `next` to the end, for pages that filter or count client-side.
+export async function getPage(url) {
+    const { data } = await api.get(url);
+    if (Array.isArray(data)) return { results: data, next: null };
+    return { results: data.results || [], next: data.next || null };
+}
+
+export async function getAll(url) {
+    const items = [];
+    let next = url;
+    while (next) {
+        const page = await getPage(next);
+        items.push(...page.results);
+        next = page.next;
+    }
+    return items;
+}
+
+// Generation status push (server-sent events over fetch, so the JWT header
+// can be sent) for several events over ONE connection — browsers allow only
+// six HTTP/1.1 connections per host, so never open one stream per row.
+// Calls onStatus(data) for every change (data.id says which event); returns
+// a cancel function.  The server closes the stream periodically (or at once
+// when it cannot stream, e.g. under runserver) and sends `retry:` — wait
+// that long, then reconnect.
+const STREAM_URL = process.env.REACT_APP_STREAM_URL || API_URL;
+export const MAX_WATCHED_EVENTS = 100;
+
+export function watchGenerationStatus(eventIds, onStatus) {
+    const controller = new AbortController();
+    const ids = eventIds.slice(0, MAX_WATCHED_EVENTS).join(",");
+    const url = `${STREAM_URL}/core/events/generation-stream/?ids=${ids}`;
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+    const run = async () => {
+        let retryMs = 3000;
+        while (!controller.signal.aborted) {
+            try {
+                const token = localStorage.getItem("token");
+                const res = await fetch(url, {
+                    headers: token ? { Authorization: `Bearer ${token}` } : {},
+                    signal: controller.signal,
+                });
+                if (!res.ok || !res.body) return;
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = "";
+                for (;;) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let sep;
+                    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                        const message = buffer.slice(0, sep);
+                        buffer = buffer.slice(sep + 2);
+                        const lines = message.split("\n");
+                        const retry = lines.find((l) => l.startsWith("retry: "));
+                        if (retry) retryMs = parseInt(retry.slice(7), 10) || retryMs;
+                        const data = lines.filter((l) => l.startsWith("data: "));
+                        if (data.length && message.includes("event: status")) {
+                            onStatus(JSON.parse(data.map((l) => l.slice(6)).join("\n")));
+                        }
+                    }
+                }
+            } catch (err) {
+                if (controller.signal.aborted) return;
+            }
+            await sleep(retryMs);
+        }
+    };
+    run();
+    return () => controller.abort();
+}
+
 // Auth services
 export const authService = {
     login: async (email, password) => {
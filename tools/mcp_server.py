@@ -167,6 +167,7 @@ def get_notifications(email: str) -> dict:
     Returns the most recent 20 unread notifications.
     """
     from src.backend.core.models import Notification
+    from src.backend.core.notifications import unread_count
     usr = User.objects.filter(email=email).first()
     if not usr:
         return {"found": False, "message": f"No student found with email '{email}'."}
@@ -178,7 +179,7 @@ def get_notifications(email: str) -> dict:
     for n in notifs:
         if n.get('created_at'):
             n['created_at'] = n['created_at'].isoformat()
-    return {"found": True, "notifications": notifs, "unread_count": len(notifs)}
+    return {"found": True, "notifications": notifs, "unread_count": unread_count(usr)}
 
 
 @mcp.tool()
@@ -205,19 +206,22 @@ def recommend_courses(email: str) -> dict:
     taken = completed_codes | enrolled_codes
 
     try:
+        from src.backend.academic.unit_graph import get_graph
         from src.backend.users.models import StudentProfile
+        graph = get_graph()
+        completed_ids = {graph.ids_by_code[code] for code in completed_codes if code in graph.ids_by_code}
+        taken_ids = {graph.ids_by_code[code] for code in taken if code in graph.ids_by_code}
         profile = StudentProfile.objects.filter(user=usr).select_related('course').first()
+        candidates = None
         if profile and profile.course:
-            suggestions = list(
-                Unit.objects.filter(course_units__course=profile.course)
-                .exclude(code__in=taken)
-                .values('code', 'name', 'credit_points', 'description')[:5]
-            )
-        else:
-            suggestions = list(
-                Unit.objects.exclude(code__in=taken)
-                .values('code', 'name', 'credit_points', 'description')[:5]
+            candidates = set(
+                Unit.objects.filter(course_units__course__code=profile.course.code).values_list('pk', flat=True)
             )
+        # Only units whose prerequisites are completed and that clash with nothing taken
+        eligible = sorted(graph.eligible(completed_ids, taken_ids, candidates), key=graph.codes.get)[:5]
+        suggestions = list(
+            Unit.objects.filter(pk__in=eligible).values('code', 'name', 'credit_points', 'description')
+        )
     except Exception:
         suggestions = []
 